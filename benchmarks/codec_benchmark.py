@@ -0,0 +1,69 @@
+"""Compare les codecs JSON et binaire : octets sur le fil et temps d'encodage/décodage.
+
+Usage : python benchmarks/codec_benchmark.py [--iterations N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.protocol import BINARY_CODEC, JSON_CODEC, encode_message, FRAME_HEADER
+
+CONNECT4_BOARD = [[0] * 7 for _ in range(3)] + [
+    [0, 0, 0, 2, 0, 0, 0],
+    [0, 0, 1, 2, 1, 0, 0],
+    [0, 1, 1, 2, 1, 2, 0],
+]
+
+MESSAGES = {
+    'make_move': {'type': 'make_move', 'player_id': 1042, 'game_name': 'connect4', 'move': 3},
+    'move_received': {'type': 'move_received', 'message': 'Coup traité par le serveur'},
+    'game_update (Puissance 4)': {
+        'type': 'game_update', 'match_id': 5310, 'seq': 9, 'board': CONNECT4_BOARD, 'current_turn_player_id': 1043
+    },
+    'game_update (Morpion)': {
+        'type': 'game_update', 'match_id': 5311, 'seq': 4, 'board': [[1, 0, 2], [0, 1, 0], [0, 0, 2]],
+        'current_turn_player_id': 1044
+    },
+    'game_over (Puissance 4)': {
+        'type': 'game_over', 'match_id': 5310, 'seq': 11, 'winner_id': 1042, 'winner_symbol': 'X',
+        'board': CONNECT4_BOARD
+    },
+    'game_delta': {
+        'type': 'game_delta', 'match_id': 5310, 'seq': 10, 'row': 2, 'col': 3, 'player': 1,
+        'current_turn_player_id': 1043
+    },
+    'pong': {'type': 'pong', 'timestamp': '2024-05-01T12:00:00.000000'},
+}
+
+
+def bench(codec, message, iterations):
+    """Retourne (octets sur le fil, µs d'encodage, µs de décodage) pour un message"""
+    payload = codec.encode(message)
+    assert codec.decode(payload) == message
+    encode_us = timeit.timeit(lambda: codec.encode(message), number=iterations) / iterations * 1e6
+    decode_us = timeit.timeit(lambda: codec.decode(payload), number=iterations) / iterations * 1e6
+    return len(encode_message(message, codec)), encode_us, decode_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des codecs de messages")
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"📏 Trames avec en-tête de {FRAME_HEADER.size} octets, {args.iterations} itérations par mesure\n")
+    print(f"{'Message':<26} {'Codec':<7} {'Octets':>7} {'Encodage µs':>12} {'Décodage µs':>12}")
+    print('-' * 68)
+    for name, message in MESSAGES.items():
+        results = {codec.name: bench(codec, message, args.iterations) for codec in (JSON_CODEC, BINARY_CODEC)}
+        for codec_name, (size, encode_us, decode_us) in results.items():
+            print(f"{name:<26} {codec_name:<7} {size:>7} {encode_us:>12.2f} {decode_us:>12.2f}")
+        ratio = results['json'][0] / results['binary'][0]
+        print(f"{'':<26} {'gain':<7} {ratio:>6.1f}x\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Mesure le coût d'enregistrement des métriques (objectif : bien moins d'une microseconde par événement).
+
+Usage : python benchmarks/metrics_benchmark.py [--events N]
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.metrics import MetricsRegistry
+
+
+def measure(label: str, statement: str, namespace: dict, events: int):
+    # Meilleure de 5 séries, coût d'une instruction vide retranché
+    elapsed = min(timeit.repeat(statement, globals=namespace, number=events, repeat=5))
+    empty = min(timeit.repeat('pass', number=events, repeat=5))
+    print(f"{label:<40} {(elapsed - empty) / events * 1e9:8.0f} ns/événement")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter('evenements_total', "Événements")
+    histogram = registry.histogram('latence_seconds', "Latence", ('type',)).labels('ping')
+    namespace = {'counter': counter, 'histogram': histogram, 'perf_counter': time.perf_counter}
+
+    measure("Counter.inc", "counter.inc()", namespace, args.events)
+    measure("Histogram.observe", "histogram.observe(0.000123)", namespace, args.events)
+    # Ce que coûte une requête instrumentée : deux lectures d'horloge et un enregistrement
+    measure("perf_counter x2 + observe (requête)",
+            "start = perf_counter(); histogram.observe(perf_counter() - start)", namespace, args.events)
+
+
+if __name__ == "__main__":
+    main()
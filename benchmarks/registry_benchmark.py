@@ -0,0 +1,100 @@
+"""Compare le registre des clients à verrou unique et le registre compartimenté sous contention.
+
+Plusieurs threads simulent le trafic du mode threadé : surtout des envois
+(lecture de la connexion d'un joueur), plus des connexions et déconnexions.
+
+Usage : python benchmarks/registry_benchmark.py [--threads N] [--operations N] [--shards N]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.server.client_registry import ClientRegistry
+
+
+class SingleLockRegistry:
+    """Registre d'origine : un dict protégé par un seul verrou, y compris en lecture"""
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def register(self, player_id, connection):
+        with self._lock:
+            previous = self._clients.get(player_id)
+            self._clients[player_id] = connection
+            return previous
+
+    def unregister(self, player_id, connection=None):
+        with self._lock:
+            if player_id in self._clients and connection in (None, self._clients[player_id]):
+                del self._clients[player_id]
+                return True
+            return False
+
+    def get(self, player_id):
+        with self._lock:
+            return self._clients.get(player_id)
+
+
+def worker(registry, connections, operations, write_ratio, seed, barrier):
+    rng = random.Random(seed)
+    player_ids = list(connections)
+    barrier.wait()
+    for _ in range(operations):
+        player_id = rng.choice(player_ids)
+        if rng.random() < write_ratio:
+            # Déconnexion puis reconnexion du même joueur
+            registry.unregister(player_id, connections[player_id])
+            registry.register(player_id, connections[player_id])
+        else:
+            registry.get(player_id)
+
+
+def bench(registry, clients, threads, operations, write_ratio):
+    """Retourne le débit (opérations/s) de `threads` threads sur `clients` connexions"""
+    connections = {player_id: object() for player_id in range(1, clients + 1)}
+    for player_id, connection in connections.items():
+        registry.register(player_id, connection)
+
+    barrier = threading.Barrier(threads + 1)
+    pool = [
+        threading.Thread(target=worker, args=(registry, connections, operations, write_ratio, seed, barrier))
+        for seed in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return threads * operations / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du registre des clients connectés")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--operations', type=int, default=50000, help="Opérations par thread")
+    parser.add_argument('--shards', type=int, default=16)
+    parser.add_argument('--write-ratio', type=float, default=0.1, help="Part de connexions/déconnexions")
+    args = parser.parse_args()
+
+    print(f"🧵 {args.threads} threads, {args.operations} opérations chacun, "
+          f"{args.write_ratio:.0%} d'écritures, {args.shards} compartiments\n")
+    print(f"{'Clients':>8} {'Verrou unique op/s':>20} {'Compartimenté op/s':>20} {'Gain':>6}")
+    print('-' * 58)
+    for clients in (1000, 2500, 5000, 10000):
+        single = bench(SingleLockRegistry(), clients, args.threads, args.operations, args.write_ratio)
+        sharded = bench(ClientRegistry(args.shards), clients, args.threads, args.operations, args.write_ratio)
+        print(f"{clients:>8} {single:>20,.0f} {sharded:>20,.0f} {sharded / single:>5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
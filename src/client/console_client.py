@@ -9,18 +9,24 @@ from typing import Dict, List, Any
 import os
 from colorama import init, Fore, Back, Style
 from src.common.chat import ChatMessage, ChatSystem, NotificationSystem, ChatManager
+from src.common.protocol import CODECS, JSON_CODEC, FrameDecoder, encode_message, decode_message
 
 # Initialisation de colorama
 init()
 
 class MatchmakingClient:
-    def __init__(self, host: str = "localhost", port: int = 8080):
+    def __init__(self, host: str = "localhost", port: int = 8080, codecs: List[str] = None):
         self.host = host
         self.port = port
         self.socket = None
         self.connected = False
         self.running = False
         
+        # Codecs proposés au serveur, par ordre de préférence ; JSON jusqu'à la réponse
+        self.codecs = codecs if codecs is not None else ['binary', 'json']
+        self.codec = JSON_CODEC
+        self.capabilities = ['delta']  # Mises à jour de partie incrémentales
+        
         # Données de session
         self.player_id = None
         self.account_info = None
@@ -34,6 +40,12 @@ class MatchmakingClient:
         # Thread pour recevoir les messages
         self.receive_thread = None
         
+        # Battement de cœur : le serveur ferme les connexions silencieuses
+        self.heartbeat_interval = 10.0  # Ajusté au tiers du délai annoncé dans `hello_ack`
+        self.heartbeat_thread = None
+        self._heartbeat_stop = threading.Event()
+        self._send_lock = threading.Lock()  # Envois depuis l'interface et le battement de cœur
+        
         # Nettoyer l'écran au démarrage
         self._clear_screen()
         
@@ -84,6 +96,13 @@ class MatchmakingClient:
             self.receive_thread = threading.Thread(target=self._receive_messages, daemon=True)
             self.receive_thread.start()
             
+            self._heartbeat_stop.clear()
+            self.heartbeat_thread = threading.Thread(target=self._send_heartbeats, daemon=True)
+            self.heartbeat_thread.start()
+            
+            # Négocier le codec avant toute authentification
+            self._send_message({'type': 'hello', 'codecs': self.codecs, 'capabilities': self.capabilities})
+            
             self._print_success(f"✅ Connecté au serveur {self.host}:{self.port}")
             return True
             
@@ -95,6 +114,7 @@ class MatchmakingClient:
         """Se déconnecte du serveur"""
         self.running = False
         self.connected = False
+        self._heartbeat_stop.set()
         
         if self.socket:
             try:
@@ -111,26 +131,38 @@ class MatchmakingClient:
             return False
         
         try:
-            message_json = json.dumps(message)
-            self.socket.send(message_json.encode('utf-8'))
+            data = encode_message(message, self.codec)
+            with self._send_lock:
+                self.socket.sendall(data)
             return True
         except Exception as e:
             self._print_error(f"❌ Erreur envoi message: {e}")
             return False
     
+    def _send_heartbeats(self):
+        """Thread qui signale périodiquement au serveur que le client est actif"""
+        while not self._heartbeat_stop.wait(self.heartbeat_interval):
+            if not self.connected:
+                break
+            self._send_message({'type': 'heartbeat'})
+    
     def _receive_messages(self):
         """Thread pour recevoir les messages du serveur"""
+        decoder = FrameDecoder()
+        
         while self.running and self.connected:
             try:
-                data = self.socket.recv(4096)
+                data = self.socket.recv(65536)
                 if not data:
                     break
                 
-                try:
-                    message = json.loads(data.decode('utf-8'))
-                    self._handle_server_message(message)
-                except json.JSONDecodeError:
-                    self._print_error("❌ Message JSON invalide reçu")
+                # Plusieurs messages peuvent arriver dans une même lecture
+                for payload in decoder.feed(data):
+                    try:
+                        message = decode_message(payload)
+                        self._handle_server_message(message)
+                    except ValueError:
+                        self._print_error("❌ Message invalide reçu")
                     
             except socket.timeout:
                 continue
@@ -145,7 +177,12 @@ class MatchmakingClient:
         """Traite les messages reçus du serveur"""
         msg_type = message.get('type')
         
-        if msg_type == 'register_success':
+        if msg_type == 'hello_ack':
+            self.codec = CODECS.get(message.get('codec'), JSON_CODEC)
+            if message.get('idle_timeout'):
+                self.heartbeat_interval = min(self.heartbeat_interval, message['idle_timeout'] / 3)
+            
+        elif msg_type == 'register_success':
             self._print_success(message.get('message'))
             
         elif msg_type == 'register_error':
@@ -171,6 +208,9 @@ class MatchmakingClient:
             self._print_error(f"❌ Erreur connexion invité: {message.get('message')}")
             
         elif msg_type == 'queue_joined':
+            # Le serveur peut avoir déjà envoyé `match_found` (appariement par une autre passe) : rien à attendre
+            if self.current_match and self.current_match['game_name'] == message.get('game_name'):
+                return
             queue_pos = message.get('queue_position')
             game_name = message.get('game_name')
             ranked = message.get('ranked')
@@ -221,10 +261,27 @@ class MatchmakingClient:
             
         elif msg_type == 'error':
             self._print_error(f"❌ Erreur: {message.get('message')}")
-            
+
+        elif msg_type == 'server_full':
+            # Le serveur ferme la connexion juste après ce message
+            self._print_error(f"🚦 {message.get('message')} (réessayer dans {message.get('retry_after_ms')} ms)")
+
+        elif msg_type == 'rate_limited':
+            self._print_error(f"🚦 {message.get('message')}")
+
         elif msg_type == 'pong':
             self._print_success(f"🏓 Pong reçu: {message.get('timestamp')}")
             
+        elif msg_type == 'game_update':
+            self._handle_game_update(message)
+            
+        elif msg_type == 'game_delta':
+            if self._apply_game_delta(message):
+                self._display_current_board()
+                
+        elif msg_type == 'game_over':
+            self._handle_game_over(message)
+            
         elif msg_type == 'make_move':
             self._handle_make_move(message)
             
@@ -240,15 +297,77 @@ class MatchmakingClient:
         else:
             self._print_info("Mode: Non classé")
         
-        # Décodage du plateau
+        # Décodage du plateau (configuration initiale du jeu)
         board = json.loads(data['board']) if isinstance(data['board'], str) else data['board']
-        self._display_board(board, data['game_name'])
+        if isinstance(board, dict):
+            board = board.get('board')
+        self.in_match = True
+        self.current_match = {
+            'match_id': data['match_id'],
+            'game_name': data['game_name'],
+            'game_display_name': data['game_display_name'],
+            'board': board,
+            'seq': data.get('seq', 0)
+        }
+        self._display_current_board()
         
         if data['your_turn']:
             self._print_info("\nC'est votre tour!")
         else:
             self._print_info("\nC'est au tour de votre adversaire")
     
+    def _handle_game_update(self, data: Dict):
+        """Instantané complet du plateau (début de match, resynchronisation ou client sans delta)"""
+        if not self.current_match or self.current_match['match_id'] != data['match_id']:
+            return
+        self.current_match['board'] = data['board']
+        self.current_match['seq'] = data.get('seq', self.current_match['seq'])
+        self._display_current_board()
+    
+    def _apply_game_delta(self, data: Dict) -> bool:
+        """Applique le coup d'une mise à jour incrémentale ; demande un instantané en cas de trou"""
+        match = self.current_match
+        if not match or match['match_id'] != data['match_id'] or data['seq'] <= match['seq']:
+            return False  # Autre match ou mise à jour déjà appliquée
+        
+        if data['seq'] != match['seq'] + 1:
+            self._print_warning("Mise à jour manquée, resynchronisation du plateau...")
+            self._send_message({'type': 'resync', 'player_id': self.player_id, 'game_name': match['game_name']})
+            return False
+        
+        match['board'][data['row']][data['col']] = data['player']
+        match['seq'] = data['seq']
+        return True
+    
+    def _handle_game_over(self, data: Dict):
+        """Affiche le plateau final et le résultat"""
+        if self.current_match and self.current_match['match_id'] == data['match_id']:
+            if 'board' in data:
+                self.current_match['board'] = data['board']
+                self._display_current_board()
+            elif self._apply_game_delta(data):
+                self._display_current_board()
+        
+        if data.get('reason') == 'forfeit':
+            self._print_info("🏳️ Un joueur a quitté la partie")
+        elif data.get('reason') == 'timeout':
+            self._print_info("⏱️ Temps de jeu dépassé")
+        
+        if data.get('winner_id') is None:
+            self._print_info("🤝 Match nul!")
+        elif data['winner_id'] == self.player_id:
+            self._print_success("🏆 Vous avez gagné!")
+        else:
+            self._print_warning("Vous avez perdu.")
+        
+        self.in_match = False
+        self.current_match = None
+    
+    def _display_current_board(self):
+        """Affiche le plateau du match en cours"""
+        if self.current_match and self.current_match['board']:
+            self._display_board(self.current_match['board'], self.current_match['game_display_name'])
+    
     def _display_board(self, board: str, game_name: str):
         """Affiche le plateau de jeu"""
         if game_name == "Puissance 4":
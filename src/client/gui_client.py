@@ -15,8 +15,8 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from src.common.chat import ChatMessage, ChatSystem, NotificationSystem, ChatManager
-from src.common.games.connect4 import Connect4
-from src.common.games.tictactoe import TicTacToe
+from src.common.protocol import FrameDecoder, decode_message
+from src.common.games import Connect4, TicTacToe
 
 class MatchmakingThread(QThread):
     message_received = pyqtSignal(dict)
@@ -26,13 +26,14 @@ class MatchmakingThread(QThread):
         self.client = client
         
     def run(self):
+        decoder = FrameDecoder()
         while self.client.running and self.client.connected:
             try:
-                data = self.client.socket.recv(4096)
+                data = self.client.socket.recv(65536)
                 if not data:
                     break
-                message = json.loads(data.decode('utf-8'))
-                self.message_received.emit(message)
+                for payload in decoder.feed(data):
+                    self.message_received.emit(decode_message(payload))
             except:
                 break
 
@@ -0,0 +1,111 @@
+from typing import List, Tuple
+
+
+class BitBoard:
+    """Plateau représenté par un masque d'entiers par joueur.
+
+    Les cases sont numérotées colonne par colonne, de bas en haut, avec une
+    ligne sentinelle (toujours vide) au-dessus de chaque colonne : un
+    alignement se détecte alors par décalages et ET binaires, sans
+    débordement d'une colonne sur la suivante. Dans la liste de listes
+    (`to_board`/`from_board`), la ligne 0 est celle du haut et les joueurs
+    valent 1 et 2.
+    """
+
+    def __init__(self, rows: int, cols: int, win_length: int, gravity: bool = False):
+        self.rows = rows
+        self.cols = cols
+        self.win_length = win_length
+        self.gravity = gravity  # Les jetons tombent en bas de la colonne (Puissance 4)
+
+        self.height = rows + 1  # Bits par colonne, sentinelle comprise
+        # Décalages : vertical, horizontal, diagonale montante, diagonale descendante
+        self.shifts = (1, self.height, self.height + 1, self.height - 1)
+
+        self.masks = [0, 0]  # Masque des jetons des joueurs 1 et 2
+        self.heights = [0] * cols  # Nombre de jetons par colonne
+        self.move_count = 0
+
+    def bit(self, row: int, col: int) -> int:
+        """Bit d'une case (ligne 0 = haut du plateau)"""
+        return 1 << (col * self.height + (self.rows - 1 - row))
+
+    @property
+    def occupied(self) -> int:
+        return self.masks[0] | self.masks[1]
+
+    def cell(self, row: int, col: int) -> int:
+        """Joueur occupant une case (0 si vide)"""
+        bit = self.bit(row, col)
+        if self.masks[0] & bit:
+            return 1
+        if self.masks[1] & bit:
+            return 2
+        return 0
+
+    def can_drop(self, col: int) -> bool:
+        """Vérifie qu'une colonne n'est pas pleine"""
+        return 0 <= col < self.cols and self.heights[col] < self.rows
+
+    def can_place(self, row: int, col: int) -> bool:
+        """Vérifie qu'une case existe et est vide"""
+        return 0 <= row < self.rows and 0 <= col < self.cols and not self.occupied & self.bit(row, col)
+
+    def drop(self, player: int, col: int) -> Tuple[int, int]:
+        """Fait tomber un jeton dans une colonne ; retourne la case (ligne, colonne) occupée"""
+        if not self.can_drop(col):
+            raise ValueError(f"Colonne {col} invalide ou pleine")
+        row = self.rows - 1 - self.heights[col]
+        self.masks[player - 1] |= self.bit(row, col)
+        self.heights[col] += 1
+        self.move_count += 1
+        return row, col
+
+    def place(self, player: int, row: int, col: int) -> Tuple[int, int]:
+        """Pose un jeton sur une case libre"""
+        if not self.can_place(row, col):
+            raise ValueError(f"Case ({row}, {col}) invalide ou occupée")
+        self.masks[player - 1] |= self.bit(row, col)
+        self.heights[col] += 1
+        self.move_count += 1
+        return row, col
+
+    def has_line(self, mask: int) -> bool:
+        """Vérifie si un masque contient un alignement de `win_length` jetons"""
+        for shift in self.shifts:
+            line = mask
+            for step in range(1, self.win_length):
+                line &= mask >> (shift * step)
+                if not line:
+                    break
+            if line:
+                return True
+        return False
+
+    def is_win(self, player: int) -> bool:
+        """Vérifie si un joueur a aligné `win_length` jetons"""
+        return self.has_line(self.masks[player - 1])
+
+    def would_win(self, player: int, row: int, col: int) -> bool:
+        """Vérifie si poser un jeton sur une case ferait gagner un joueur"""
+        return self.has_line(self.masks[player - 1] | self.bit(row, col))
+
+    def is_full(self) -> bool:
+        """Vérifie si toutes les cases sont occupées"""
+        return self.move_count == self.rows * self.cols
+
+    def to_board(self) -> List[List[int]]:
+        """Convertit en liste de listes (0 vide, 1 ou 2 pour les joueurs)"""
+        return [[self.cell(row, col) for col in range(self.cols)] for row in range(self.rows)]
+
+    @classmethod
+    def from_board(cls, board: List[List[int]], win_length: int, gravity: bool = False) -> 'BitBoard':
+        """Construit un plateau à partir d'une liste de listes"""
+        bitboard = cls(len(board), len(board[0]) if board else 0, win_length, gravity)
+        for row, cells in enumerate(board):
+            for col, value in enumerate(cells):
+                if value in (1, 2):
+                    bitboard.masks[value - 1] |= bitboard.bit(row, col)
+                    bitboard.heights[col] += 1
+                    bitboard.move_count += 1
+        return bitboard
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Type
 import json
 from datetime import datetime
 
+from src.common.bitboard import BitBoard
+
 @dataclass
 class GameState:
     """État d'une partie"""
@@ -35,6 +37,19 @@ class BaseGame(ABC):
             current_player=1
         )
 
+    def load_board(self, board: List[List[int]], current_player: int = 1):
+        """Reprend une partie à partir d'un plateau existant (la liste est partagée, pas copiée)"""
+        self.state = GameState(board=board, current_player=current_player)
+        self._on_board_loaded()
+
+    def _on_board_loaded(self):
+        """Reconstruit les structures dérivées du plateau après un chargement"""
+        pass
+
+    def parse_move(self, move: Any) -> Optional[Any]:
+        """Convertit un coup reçu du réseau au format du jeu (None si mal formé)"""
+        return move
+
     @abstractmethod
     def _create_empty_board(self) -> List[List[int]]:
         """Crée un plateau vide"""
@@ -104,98 +119,106 @@ class BaseGame(ABC):
             winner=state_dict['winner'],
             is_draw=state_dict['is_draw']
         )
+        self._on_board_loaded()
 
 class Connect4(BaseGame):
     """Jeu du Puissance 4"""
+    ROWS, COLS, WIN_LENGTH = 6, 7, 4
+
+    def reset(self):
+        super().reset()
+        self._on_board_loaded()
+
+    def _on_board_loaded(self):
+        win_length = self.config.get('win_length', self.WIN_LENGTH)
+        self.bitboard = BitBoard.from_board(self.state.board, win_length, gravity=True)
+
+    def parse_move(self, move: Any) -> Optional[int]:
+        """Un coup est un numéro de colonne"""
+        return move if isinstance(move, int) and not isinstance(move, bool) else None
+
     def _create_empty_board(self) -> List[List[int]]:
-        return [[0 for _ in range(7)] for _ in range(6)]
+        return [[0 for _ in range(self.COLS)] for _ in range(self.ROWS)]
 
     def is_valid_move(self, column: int) -> bool:
-        if not 0 <= column < 7:
-            return False
-        return self.state.board[0][column] == 0
+        return self.bitboard.can_drop(column)
 
     def apply_move(self, column: int) -> bool:
         if not self.is_valid_move(column):
             return False
 
-        # Trouver la première case vide dans la colonne
-        for row in range(5, -1, -1):
-            if self.state.board[row][column] == 0:
-                self.state.board[row][column] = self.state.current_player
-                self.state.last_move = (row, column)
-                self.state.last_move_time = datetime.now()
-                self.state.moves_history.append({
-                    'player': self.state.current_player,
-                    'move': column,
-                    'time': self.state.last_move_time.isoformat()
-                })
-
-                if self.check_win():
-                    self.state.game_over = True
-                    self.state.winner = self.state.current_player
-                elif self.check_draw():
-                    self.state.game_over = True
-                    self.state.is_draw = True
-                else:
-                    self.state.current_player = 3 - self.state.current_player
-                return True
-        return False
+        # La hauteur de la colonne donne directement la case occupée
+        row, col = self.bitboard.drop(self.state.current_player, column)
+        self.state.board[row][col] = self.state.current_player
+        self.state.last_move = (row, col)
+        self.state.last_move_time = datetime.now()
+        self.state.moves_history.append({
+            'player': self.state.current_player,
+            'move': column,
+            'time': self.state.last_move_time.isoformat()
+        })
+
+        if self.check_win():
+            self.state.game_over = True
+            self.state.winner = self.state.current_player
+        elif self.check_draw():
+            self.state.game_over = True
+            self.state.is_draw = True
+        else:
+            self.state.current_player = 3 - self.state.current_player
+        return True
 
     def check_win(self) -> bool:
         if not self.state.last_move:
             return False
         row, col = self.state.last_move
-        player = self.state.board[row][col]
-
-        # Vérifier horizontalement
-        for c in range(max(0, col-3), min(4, col+1)):
-            if all(self.state.board[row][c+i] == player for i in range(4)):
-                return True
-
-        # Vérifier verticalement
-        for r in range(max(0, row-3), min(3, row+1)):
-            if all(self.state.board[r+i][col] == player for i in range(4)):
-                return True
-
-        # Vérifier diagonales
-        for r in range(max(0, row-3), min(3, row+1)):
-            for c in range(max(0, col-3), min(4, col+1)):
-                if all(self.state.board[r+i][c+i] == player for i in range(4)):
-                    return True
-                if all(self.state.board[r+i][c+3-i] == player for i in range(4)):
-                    return True
-        return False
+        return self.bitboard.is_win(self.state.board[row][col])
 
     def check_draw(self) -> bool:
-        return all(self.state.board[0][col] != 0 for col in range(7))
+        return self.bitboard.is_full()
 
     def _get_all_possible_moves(self) -> List[int]:
-        return list(range(7))
+        return list(range(self.bitboard.cols))
 
     def get_column_height(self, column: int) -> int:
         """Retourne la hauteur d'une colonne"""
-        for row in range(6):
-            if self.state.board[row][column] != 0:
-                return 6 - row
-        return 0
+        return self.bitboard.heights[column]
 
 class TicTacToe(BaseGame):
     """Jeu du Morpion"""
+    SIZE, WIN_LENGTH = 3, 3
+
+    def reset(self):
+        super().reset()
+        self._on_board_loaded()
+
+    def _on_board_loaded(self):
+        win_length = self.config.get('win_length', self.WIN_LENGTH)
+        self.bitboard = BitBoard.from_board(self.state.board, win_length)
+
+    def parse_move(self, move: Any) -> Optional[tuple]:
+        """Un coup est un index de case (0 à 8, ligne par ligne) ou un couple [ligne, colonne]"""
+        if isinstance(move, int) and not isinstance(move, bool):
+            if not 0 <= move < self.bitboard.rows * self.bitboard.cols:
+                return None
+            return divmod(move, self.bitboard.cols)
+        if isinstance(move, (list, tuple)) and len(move) == 2 and all(isinstance(v, int) for v in move):
+            return tuple(move)
+        return None
+
     def _create_empty_board(self) -> List[List[int]]:
-        return [[0 for _ in range(3)] for _ in range(3)]
+        return [[0 for _ in range(self.SIZE)] for _ in range(self.SIZE)]
 
     def is_valid_move(self, move: tuple) -> bool:
         row, col = move
-        if not (0 <= row < 3 and 0 <= col < 3):
-            return False
-        return self.state.board[row][col] == 0
+        return self.bitboard.can_place(row, col)
 
     def apply_move(self, move: tuple) -> bool:
         if not self.is_valid_move(move):
             return False
 
         row, col = move
+        self.bitboard.place(self.state.current_player, row, col)
         self.state.board[row][col] = self.state.current_player
         self.state.last_move = move
         self.state.last_move_time = datetime.now()
@@ -219,41 +242,38 @@ class TicTacToe(BaseGame):
         if not self.state.last_move:
             return False
         row, col = self.state.last_move
-        player = self.state.board[row][col]
-
-        # Vérifier la ligne
-        if all(self.state.board[row][c] == player for c in range(3)):
-            return True
-
-        # Vérifier la colonne
-        if all(self.state.board[r][col] == player for r in range(3)):
-            return True
-
-        # Vérifier les diagonales
-        if row == col and all(self.state.board[i][i] == player for i in range(3)):
-            return True
-        if row + col == 2 and all(self.state.board[i][2-i] == player for i in range(3)):
-            return True
-
-        return False
+        return self.bitboard.is_win(self.state.board[row][col])
 
     def check_draw(self) -> bool:
-        return all(self.state.board[r][c] != 0 for r in range(3) for c in range(3))
+        return self.bitboard.is_full()
 
     def _get_all_possible_moves(self) -> List[tuple]:
-        return [(r, c) for r in range(3) for c in range(3)]
+        return [(r, c) for r in range(self.SIZE) for c in range(self.SIZE)]
 
     def get_empty_cells(self) -> List[tuple]:
         """Retourne la liste des cases vides"""
-        return [(r, c) for r in range(3) for c in range(3) if self.state.board[r][c] == 0]
+        return [move for move in self._get_all_possible_moves() if self.bitboard.can_place(*move)]
 
     def get_winning_moves(self) -> List[tuple]:
         """Retourne la liste des coups gagnants possibles"""
-        winning_moves = []
-        for move in self.get_empty_cells():
-            row, col = move
-            self.state.board[row][col] = self.state.current_player
-            if self.check_win():
-                winning_moves.append(move)
-            self.state.board[row][col] = 0
-        return winning_moves 
\ No newline at end of file
+        player = self.state.current_player
+        return [(row, col) for row, col in self.get_empty_cells() if self.bitboard.would_win(player, row, col)]
+
+
+# Moteurs de jeu indexés par `games.name`
+GAME_ENGINES: Dict[str, Type[BaseGame]] = {
+    'connect4': Connect4,
+    'tictactoe': TicTacToe,
+}
+
+
+def create_game(game_name: str, config: Optional[Dict[str, Any]] = None) -> Optional[BaseGame]:
+    """Instancie le moteur d'un jeu ; le plateau de `config['board']` est repris s'il est fourni"""
+    engine_class = GAME_ENGINES.get(game_name)
+    if engine_class is None:
+        return None
+    config = config or {}
+    game = engine_class(config)
+    if config.get('board'):
+        game.load_board(config['board'])
+    return game
@@ -0,0 +1,231 @@
+"""Métriques internes : compteurs, jauges et histogrammes de latence, exposés au format Prometheus.
+
+L'enregistrement d'un événement se limite à quelques opérations sur des
+entiers, sans verrou ni allocation : sous le GIL, deux incrémentations
+simultanées peuvent exceptionnellement n'en compter qu'une, ce qui est
+sans conséquence pour des métriques.
+"""
+import functools
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Bornes des histogrammes : puissances de 2 depuis 1 µs (1 µs, 2 µs, 4 µs ... ~33 s), puis +Inf
+HISTOGRAM_BUCKETS = 26
+BUCKET_BOUNDS = [2 ** i / 1_000_000 for i in range(HISTOGRAM_BUCKETS)]
+
+
+class Counter:
+    """Compteur monotone"""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Gauge:
+    """Valeur instantanée"""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class Histogram:
+    """Histogramme à seaux logarithmiques : l'indice du seau est la taille en bits de la durée en µs"""
+
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (HISTOGRAM_BUCKETS + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        index = int(seconds * 1_000_000).bit_length()
+        self.counts[index if index < HISTOGRAM_BUCKETS else HISTOGRAM_BUCKETS] += 1
+        self.sum += seconds
+
+
+class MetricFamily:
+    """Métrique nommée, éventuellement déclinée par valeurs d'étiquettes"""
+
+    def __init__(self, name: str, help_text: str, kind: str, factory, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.label_names = labels
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        self.callback: Optional[Callable] = None
+
+    def labels(self, *values: str):
+        """Retourne la métrique d'une combinaison d'étiquettes (à garder de côté sur les chemins chauds)"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], object]]:
+        """Valeurs courantes : (étiquettes, métrique ou valeur lue par le callback)"""
+        if self.callback is not None:
+            value = self.callback()
+            if isinstance(value, dict):
+                return [(key if isinstance(key, tuple) else (key,), item) for key, item in value.items()]
+            return [((), value)]
+        return list(self._children.items())
+
+
+class MetricsRegistry:
+    """Ensemble des métriques d'un processus, rendu au format texte de Prometheus"""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _family(self, name: str, help_text: str, kind: str, factory, labels: Tuple[str, ...]) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = MetricFamily(name, help_text, kind, factory, tuple(labels))
+                self._families[name] = family
+            elif family.kind != kind:
+                raise ValueError(f"Métrique {name} déjà déclarée comme {family.kind}")
+            return family
+
+    def _metric(self, family: MetricFamily):
+        # Sans étiquettes, la métrique elle-même ; sinon la famille (voir `labels`)
+        return family if family.label_names else family.labels()
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        return self._metric(self._family(name, help_text, 'counter', Counter, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        return self._metric(self._family(name, help_text, 'gauge', Gauge, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        return self._metric(self._family(name, help_text, 'histogram', Histogram, labels))
+
+    def gauge_callback(self, name: str, help_text: str, callback: Callable, labels: Tuple[str, ...] = ()):
+        """Jauge lue à la demande : `callback` retourne une valeur, ou un dict {étiquettes: valeur}.
+
+        Un nouvel enregistrement sous le même nom remplace le callback précédent.
+        """
+        family = self._family(name, help_text, 'gauge', Gauge, labels)
+        family.callback = callback
+
+    def render(self) -> str:
+        """Format d'exposition texte de Prometheus (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            families = list(self._families.values())
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, metric in family.samples():
+                labels = list(zip(family.label_names, values))
+                if family.kind == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(BUCKET_BOUNDS + ['+Inf'], metric.counts):
+                        cumulative += count
+                        le = bound if isinstance(bound, str) else repr(bound)
+                        lines.append(f"{family.name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{family.name}_sum{_format_labels(labels)} {metric.sum!r}")
+                    lines.append(f"{family.name}_count{_format_labels(labels)} {cumulative}")
+                else:
+                    value = metric.value if isinstance(metric, (Counter, Gauge)) else metric
+                    lines.append(f"{family.name}{_format_labels(labels)} {float(value)!r}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def instrument_methods(cls, family: MetricFamily):
+    """Mesure la durée de chaque méthode publique de `cls`, étiquetée par nom de méthode"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith('_') or not isinstance(method, types.FunctionType):
+            continue
+        setattr(cls, name, _timed(method, family.labels(name)))
+    return cls
+
+
+def _timed(method, histogram: Histogram):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return wrapper
+
+
+class MetricsServer:
+    """Point de collecte HTTP local : GET /metrics retourne le registre au format Prometheus"""
+
+    def __init__(self, registry: 'MetricsRegistry', host: str = '127.0.0.1', port: int = 9100):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Pas de ligne par collecte
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+        self.thread.start()
+        print(f"📈 Métriques exposées sur http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+# Registre du processus
+metrics = MetricsRegistry()
@@ -0,0 +1,288 @@
+import json
+import struct
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Chaque message est précédé de sa longueur sur 4 octets (big-endian)
+FRAME_HEADER = struct.Struct('!I')
+MAX_FRAME_SIZE = 1024 * 1024  # 1 Mo
+
+
+class ProtocolError(ValueError):
+    """Trame invalide (taille annoncée hors limites)"""
+
+
+def encode_frame(payload: bytes) -> bytes:
+    """Préfixe une charge utile par sa longueur"""
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Trame trop grande: {len(payload)} octets")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class JsonCodec:
+    """Codec par défaut : un objet JSON UTF-8 par trame"""
+    name = 'json'
+
+    def encode(self, message: Dict) -> bytes:
+        return json.dumps(message).encode('utf-8')
+
+    def decode(self, payload: bytes) -> Dict:
+        return json.loads(payload.decode('utf-8'))
+
+
+# Codec binaire : en-tête (marqueur 0x00, étiquette du type) puis les champs du
+# type dans un ordre fixe. Une charge JSON commence toujours par '{' : le
+# marqueur suffit à distinguer les deux formats à la lecture.
+BINARY_MARKER = 0
+BINARY_HEADER = struct.Struct('!BB')
+_U8 = struct.Struct('!B')
+_U16 = struct.Struct('!H')
+_U32 = struct.Struct('!I')
+_I32 = struct.Struct('!i')
+_BOARD_SHAPE = struct.Struct('!BB')  # lignes, colonnes
+
+
+def _require_int(value) -> int:
+    if type(value) is not int:
+        raise TypeError(f"Entier attendu: {value!r}")
+    return value
+
+
+def _pack_u8(out: bytearray, value):
+    out += _U8.pack(_require_int(value))
+
+
+def _unpack_u8(data: bytes, offset: int) -> Tuple[int, int]:
+    return _U8.unpack_from(data, offset)[0], offset + _U8.size
+
+
+def _pack_u32(out: bytearray, value):
+    out += _U32.pack(_require_int(value))
+
+
+def _unpack_u32(data: bytes, offset: int) -> Tuple[int, int]:
+    return _U32.unpack_from(data, offset)[0], offset + _U32.size
+
+
+def _pack_i32(out: bytearray, value):
+    out += _I32.pack(_require_int(value))
+
+
+def _unpack_i32(data: bytes, offset: int) -> Tuple[int, int]:
+    return _I32.unpack_from(data, offset)[0], offset + _I32.size
+
+
+def _pack_str(out: bytearray, value):
+    if not isinstance(value, str):
+        raise TypeError(f"Chaîne attendue: {value!r}")
+    encoded = value.encode('utf-8')
+    out += _U16.pack(len(encoded))
+    out += encoded
+
+
+def _unpack_str(data: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = _U16.unpack_from(data, offset)
+    offset += _U16.size
+    if offset + length > len(data):
+        raise ProtocolError("Chaîne tronquée")
+    return data[offset:offset + length].decode('utf-8'), offset + length
+
+
+_CELL_VALUES = frozenset((0, 1, 2, 3))
+_CELLS_BY_BYTE = [tuple((byte >> shift) & 3 for shift in (0, 2, 4, 6)) for byte in range(256)]
+
+
+def _pack_board(out: bytearray, board):
+    """Plateau : lignes, colonnes, puis 4 cases de 2 bits par octet"""
+    rows, cols = len(board), len(board[0]) if board else 0
+    if any(len(row) != cols for row in board):
+        raise ValueError("Plateau irrégulier")
+    cells = [cell for row in board for cell in row]
+    if not _CELL_VALUES.issuperset(cells):
+        raise ValueError("Plateau hors format")
+    cells += [0] * (-len(cells) % 4)
+    out += _BOARD_SHAPE.pack(rows, cols)
+    out += bytes(a | b << 2 | c << 4 | d << 6 for a, b, c, d in zip(*[iter(cells)] * 4))
+
+
+def _unpack_board(data: bytes, offset: int) -> Tuple[List[List[int]], int]:
+    rows, cols = _BOARD_SHAPE.unpack_from(data, offset)
+    offset += _BOARD_SHAPE.size
+    end = offset + (rows * cols + 3) // 4
+    if end > len(data):
+        raise ProtocolError("Plateau tronqué")
+    cells = [cell for byte in data[offset:end] for cell in _CELLS_BY_BYTE[byte]]
+    return [cells[r * cols:(r + 1) * cols] for r in range(rows)], end
+
+
+def _optional(pack: Callable, unpack: Callable) -> Tuple[Callable, Callable]:
+    """Champ pouvant valoir None : un octet de présence puis la valeur"""
+    def pack_optional(out: bytearray, value):
+        if value is None:
+            out.append(0)
+        else:
+            out.append(1)
+            pack(out, value)
+
+    def unpack_optional(data: bytes, offset: int):
+        (present,) = _U8.unpack_from(data, offset)
+        if not present:
+            return None, offset + 1
+        return unpack(data, offset + 1)
+
+    return pack_optional, unpack_optional
+
+
+U8 = (_pack_u8, _unpack_u8)
+U32 = (_pack_u32, _unpack_u32)
+I32 = (_pack_i32, _unpack_i32)
+STR = (_pack_str, _unpack_str)
+BOARD = (_pack_board, _unpack_board)
+OPT_U32 = _optional(*U32)
+OPT_STR = _optional(*STR)
+
+# Formes de messages encodables en binaire : étiquette -> (type, champs dans un
+# ordre fixe). Un même type peut avoir plusieurs formes (instantané complet ou
+# delta) ; un message dont les champs ne correspondent à aucune forme reste en JSON.
+BINARY_SCHEMAS: Dict[int, Tuple[str, Tuple[Tuple[str, Tuple[Callable, Callable]], ...]]] = {
+    1: ('ping', ()),
+    2: ('pong', (('timestamp', STR),)),
+    3: ('make_move', (('player_id', U32), ('game_name', STR), ('move', I32))),
+    4: ('move_received', (('message', STR),)),
+    5: ('game_update', (('match_id', U32), ('seq', U32), ('board', BOARD), ('current_turn_player_id', OPT_U32))),
+    6: ('game_over', (('match_id', U32), ('seq', U32), ('winner_id', OPT_U32), ('winner_symbol', OPT_STR),
+                      ('board', BOARD))),
+    7: ('error', (('message', STR),)),
+    8: ('game_delta', (('match_id', U32), ('seq', U32), ('row', U8), ('col', U8), ('player', U8),
+                       ('current_turn_player_id', OPT_U32))),
+    9: ('game_over', (('match_id', U32), ('seq', U32), ('row', U8), ('col', U8), ('player', U8),
+                      ('winner_id', OPT_U32), ('winner_symbol', OPT_STR))),
+    10: ('resync', (('player_id', U32), ('game_name', STR))),
+    11: ('heartbeat', ()),
+}
+
+
+class BinaryCodec:
+    """Codec compact pour les messages fréquents, JSON pour tous les autres"""
+    name = 'binary'
+
+    def __init__(self, schemas: Dict = BINARY_SCHEMAS):
+        self.by_tag = schemas
+        # Forme d'un message : son type et l'ensemble de ses clés
+        self.by_shape = {
+            (msg_type, frozenset(key for key, _ in fields) | {'type'}): (tag, fields)
+            for tag, (msg_type, fields) in schemas.items()
+        }
+        self.fallback = JsonCodec()
+
+    def encode(self, message: Dict) -> bytes:
+        schema = self.by_shape.get((message.get('type'), frozenset(message)))
+        if schema is None:
+            return self.fallback.encode(message)
+
+        tag, fields = schema
+        out = bytearray(BINARY_HEADER.pack(BINARY_MARKER, tag))
+        try:
+            for key, (pack, _) in fields:
+                pack(out, message[key])
+        except (KeyError, TypeError, ValueError, OverflowError, struct.error):
+            return self.fallback.encode(message)
+        return bytes(out)
+
+    def decode(self, payload: bytes) -> Dict:
+        if not payload or payload[0] != BINARY_MARKER:
+            return self.fallback.decode(payload)
+
+        try:
+            _, tag = BINARY_HEADER.unpack_from(payload)
+            msg_type, fields = self.by_tag[tag]
+            message = {'type': msg_type}
+            offset = BINARY_HEADER.size
+            for key, (_, unpack) in fields:
+                message[key], offset = unpack(payload, offset)
+        except (KeyError, IndexError, UnicodeDecodeError, struct.error) as e:
+            raise ProtocolError(f"Message binaire invalide: {e}")
+        return message
+
+
+JSON_CODEC = JsonCodec()
+BINARY_CODEC = BinaryCodec()
+CODECS = {codec.name: codec for codec in (BINARY_CODEC, JSON_CODEC)}
+
+
+def negotiate_codec(offered: Iterable[str]):
+    """Premier codec proposé par le client que l'on sait gérer (JSON par défaut)"""
+    for name in offered or ():
+        if name in CODECS:
+            return CODECS[name]
+    return JSON_CODEC
+
+
+class PreEncodedMessage(dict):
+    """Message constant dont la trame n'est encodée qu'une seule fois par codec"""
+    __slots__ = ('_frames',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._frames = {}
+
+    def frame(self, codec=JSON_CODEC) -> bytes:
+        frame = self._frames.get(codec.name)
+        if frame is None:
+            frame = self._frames[codec.name] = encode_frame(codec.encode(self))
+        return frame
+
+
+def encode_message(message: Dict, codec=JSON_CODEC) -> bytes:
+    """Encode un message en une trame prête à être envoyée"""
+    if isinstance(message, PreEncodedMessage):
+        return message.frame(codec)
+    return encode_frame(codec.encode(message))
+
+
+def decode_message(payload: bytes) -> Dict:
+    """Décode la charge utile d'une trame, JSON ou binaire"""
+    return BINARY_CODEC.decode(payload)
+
+
+class FrameDecoder:
+    """Tampon de lecture incrémental : reconstitue les trames d'un flux TCP.
+
+    Les données reçues peuvent contenir plusieurs trames collées ou une trame
+    partielle ; `feed` retourne toutes les trames complètes et conserve le reste.
+    """
+
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Ajoute des octets reçus et retourne les trames complètes"""
+        self.buffer += data
+        frames = []
+        offset = 0
+        header_size = FRAME_HEADER.size
+
+        while len(self.buffer) - offset >= header_size:
+            (length,) = FRAME_HEADER.unpack_from(self.buffer, offset)
+            if length > self.max_frame_size:
+                raise ProtocolError(f"Trame trop grande: {length} octets")
+
+            end = offset + header_size + length
+            if len(self.buffer) < end:
+                break
+
+            frames.append(bytes(self.buffer[offset + header_size:end]))
+            offset = end
+
+        if offset:
+            del self.buffer[:offset]
+        return frames
+
+
+async def read_frame(reader, max_frame_size: int = MAX_FRAME_SIZE) -> bytes:
+    """Lit une trame complète depuis un asyncio.StreamReader"""
+    header = await reader.readexactly(FRAME_HEADER.size)
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > max_frame_size:
+        raise ProtocolError(f"Trame trop grande: {length} octets")
+    return await reader.readexactly(length)
@@ -0,0 +1,196 @@
+"""Traçage des requêtes : spans au format Zipkin v2 (JSON), un par ligne, dans un fichier tournant.
+
+Chaque message entrant tiré au sort ouvre une trace ; les spans enfants
+(appels à la base, envois) s'y rattachent via un `ContextVar`, propre à
+chaque thread. Hors trace, ouvrir un span ne coûte qu'une lecture du
+`ContextVar` : aucun objet n'est créé. L'encodage JSON et l'écriture se
+font dans le thread du `QueueListener`, pas dans celui de la requête.
+"""
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+import types
+from contextvars import ContextVar
+from typing import Optional
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+
+
+class Span:
+    """Span actif ; utilisé comme gestionnaire de contexte"""
+
+    __slots__ = ('tracer', 'trace_id', 'span_id', 'parent_id', 'name', 'kind', 'tags',
+                 'timestamp', 'start', '_token')
+
+    def __init__(self, tracer: 'Tracer', name: str, trace_id: str, parent_id: Optional[str], kind: Optional[str]):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.tags = {}
+
+    def tag(self, key: str, value):
+        if value is not None:
+            self.tags[key] = str(value)
+
+    def __enter__(self) -> 'Span':
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.tags['error'] = exc_type.__name__
+        self.tracer._export(self, duration)
+
+
+class _NoopSpan:
+    """Span d'une requête non échantillonnée : ne fait rien"""
+
+    __slots__ = ()
+
+    def tag(self, key: str, value):
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanQueueHandler(logging.handlers.QueueHandler):
+    """Met le span brut en file : le formatage se fait dans le thread d'écriture"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _ZipkinFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, ensure_ascii=False, separators=(',', ':'))
+
+
+class Tracer:
+    """Échantillonnage des traces et export des spans"""
+
+    def __init__(self, service_name: str = 'matchmaking-server'):
+        self.service_name = service_name
+        self.sample_rate = 0.0
+        self.path: Optional[str] = None
+        self.exported = 0
+        self._logger = logging.getLogger('matchmaking.tracing')
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._handler: Optional[logging.Handler] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._lock = threading.Lock()
+
+    def start(self, path: str, sample_rate: float, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+              service_name: Optional[str] = None):
+        """Active l'export vers `path` (fichier tournant) ; `sample_rate` : proportion des requêtes tracées"""
+        with self._lock:
+            if self._listener is not None:
+                if os.path.abspath(path) == os.path.abspath(self.path):
+                    self.sample_rate = sample_rate
+                    return
+                self._stop_locked()
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                                encoding='utf-8')
+            file_handler.setFormatter(_ZipkinFormatter())
+            self._handler = _SpanQueueHandler(queue.SimpleQueue())
+            self._listener = logging.handlers.QueueListener(self._handler.queue, file_handler)
+            self._logger.addHandler(self._handler)
+            self._listener.start()
+            self.path = path
+            self.sample_rate = sample_rate
+            if service_name:
+                self.service_name = service_name
+        print(f"🔎 Traçage actif (échantillonnage {sample_rate:g}) vers {path}")
+
+    def stop(self):
+        """Écrit les spans en attente et ferme le fichier"""
+        with self._lock:
+            self._stop_locked()
+
+    def _stop_locked(self):
+        if self._listener is None:
+            return
+        self.sample_rate = 0.0
+        self._logger.removeHandler(self._handler)
+        self._listener.stop()  # Vide la file avant de rendre la main
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+        self._handler = None
+
+    def trace(self, name: str):
+        """Ouvre la trace d'une requête entrante, si elle est tirée au sort"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return NOOP_SPAN
+        return Span(self, name, f"{random.getrandbits(128):032x}", None, 'SERVER')
+
+    def span(self, name: str, kind: Optional[str] = None):
+        """Ouvre un span enfant du span courant (sans effet hors trace)"""
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, kind)
+
+    def _export(self, span: Span, duration: float):
+        record = {
+            'traceId': span.trace_id,
+            'id': span.span_id,
+            'name': span.name,
+            'timestamp': int(span.timestamp * 1_000_000),
+            'duration': max(1, int(duration * 1_000_000)),  # Microsecondes
+            'localEndpoint': {'serviceName': self.service_name},
+            'tags': span.tags
+        }
+        if span.parent_id:
+            record['parentId'] = span.parent_id
+        if span.kind:
+            record['kind'] = span.kind
+        self._logger.info(record)
+        self.exported += 1
+
+
+def trace_methods(cls, tracer: 'Tracer', prefix: str):
+    """Ouvre un span `prefix + nom` autour de chaque méthode publique de `cls`"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith('_') or not isinstance(method, types.FunctionType):
+            continue
+        setattr(cls, name, _traced(method, tracer, prefix + name))
+    return cls
+
+
+def _traced(method, tracer: 'Tracer', span_name: str):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        parent = _current_span.get()
+        if parent is None:
+            return method(*args, **kwargs)
+        with Span(tracer, span_name, parent.trace_id, parent.span_id, 'CLIENT'):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+# Traceur du processus
+tracer = Tracer()
@@ -1,6 +1,6 @@
 import os
-from dataclasses import dataclass
-from typing import Dict, Any
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
 import json
 
 @dataclass
@@ -13,13 +13,83 @@ class GameConfig:
     board_size: tuple
     rules: Dict[str, Any]
 
+def _default_message_limits() -> Dict[str, List[float]]:
+    """Limites par défaut par type de message : [débit soutenu (requêtes/s), rafale]"""
+    return {
+        'register': [0.2, 3],
+        'login': [0.5, 5],
+        'guest_login': [0.5, 5],
+        'join_queue': [1, 5],
+        'leave_queue': [1, 5],
+        'get_games': [1, 5],
+        'get_stats': [1, 5],
+        'resync': [2, 10],
+        'make_move': [10, 20],
+        'ping': [1, 5],
+        'admin': [0.5, 5],
+    }
+
+@dataclass
+class RateLimitConfig:
+    enabled: bool = True
+    # Seaux à jetons par connexion et par type de message (types absents : non limités)
+    per_message_type: Dict[str, List[float]] = field(default_factory=_default_message_limits)
+    # Seau commun à toutes les connexions d'une même adresse IP, tous types confondus
+    per_ip_rate: float = 50.0
+    per_ip_burst: float = 100.0
+
+    def __post_init__(self):
+        # Un seau à jetons divise par son débit : un débit nul ou négatif est une erreur de configuration
+        rates = {'per_ip_rate': self.per_ip_rate}
+        rates.update({f"per_message_type.{msg_type}": rate for msg_type, (rate, _) in self.per_message_type.items()})
+        for name, rate in rates.items():
+            if not rate > 0:
+                raise ValueError(f"Débit de limitation invalide pour {name}: {rate} (doit être > 0)")
+
 @dataclass
 class ServerConfig:
     host: str
     port: int
-    max_connections: int
-    timeout: int
+    max_connections: int  # Connexions simultanées admises (0 : pas de plafond)
+    timeout: int  # Secondes sans message avant fermeture d'une connexion (0 : jamais)
     debug: bool
+    # File d'envoi de chaque connexion (octets) et politique au-delà du seuil haut
+    send_queue_high_watermark: int = 256 * 1024
+    send_queue_low_watermark: int = 64 * 1024
+    send_queue_policy: str = 'drop'  # 'drop' ou 'disconnect'
+    # Nombre de compartiments (verrous) du registre des clients connectés
+    client_registry_shards: int = 16
+    # Pas (secondes) de la roue qui détecte les connexions inactives
+    idle_check_interval: float = 1.0
+    # Secondes sans coup avant qu'un match soit perdu par le joueur dont c'est le tour (0 : jamais)
+    match_inactivity_timeout: float = 300.0
+    # Contrôle d'admission : file d'attente du noyau, plafond par adresse (0 : aucun)
+    # et délai conseillé aux clients refusés
+    accept_backlog: int = 128
+    max_connections_per_ip: int = 16
+    admission_retry_after_ms: int = 1000
+    # Point de collecte des métriques au format Prometheus (port 0 : désactivé)
+    metrics_host: str = '127.0.0.1'
+    metrics_port: int = 0
+    # Traçage des requêtes (proportion échantillonnée, 0 : désactivé) vers un fichier tournant
+    trace_sample_rate: float = 0.0
+    trace_file: str = 'logs/traces.jsonl'
+    trace_file_max_bytes: int = 10 * 1024 * 1024
+    trace_file_backups: int = 5
+    # Enregistreur de vol : derniers messages gardés par connexion et par match, seuil
+    # de durée qui déclenche un vidage automatique (0 : jamais) et dossier des vidages
+    flight_recorder_size: int = 64
+    flight_recorder_slow_ms: float = 500.0
+    flight_recorder_dir: str = 'logs/flight'
+    # Commandes d'administration (message `admin`) : refusées tant qu'aucun jeton n'est défini
+    admin_token: Optional[str] = None
+    # Canal d'administration local (socket Unix réservé au propriétaire du processus, None : aucun)
+    admin_socket: Optional[str] = None
+    # Profilage à chaud : dossier des profils et durée maximale d'un relevé (secondes)
+    profile_dir: str = 'logs/profiles'
+    profile_max_duration: float = 300.0
+    # Limitation de débit des requêtes (section `rate_limits` du fichier de configuration)
+    rate_limits: RateLimitConfig = field(default_factory=RateLimitConfig)
 
 @dataclass
 class DatabaseConfig:
@@ -88,8 +158,10 @@ class Config:
     
     def save(self, path: str = "config.json"):
         """Sauvegarde la configuration dans un fichier JSON"""
+        server = dict(self.server.__dict__)
         config_dict = {
-            "server": self.server.__dict__,
+            "server": server,
+            "rate_limits": server.pop("rate_limits").__dict__,
             "database": self.database.__dict__,
             "client": self.client.__dict__,
             "games": {name: game.__dict__ for name, game in self.games.items()}
@@ -109,6 +181,8 @@ class Config:
             
         config = cls()
         config.server = ServerConfig(**config_dict["server"])
+        if "rate_limits" in config_dict:
+            config.server.rate_limits = RateLimitConfig(**config_dict["rate_limits"])
         config.database = DatabaseConfig(**config_dict["database"])
         config.client = ClientConfig(**config_dict["client"])
         config.games = {
@@ -1,18 +1,109 @@
 import sqlite3
 import json
 import hashlib
+import threading
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Tuple
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Tuple, Mapping
+
+from src.common.metrics import instrument_methods, metrics
+from src.common.tracing import trace_methods, tracer
+from src.database.pool import ConnectionPool
+
+# Migrations du schéma : (version, description, instructions), appliquées dans l'ordre.
+# La version courante est conservée dans PRAGMA user_version.
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (1, "Index des files d'attente", [
+        # Couvrant pour get_queue_for_game (file d'un jeu triée par ancienneté)
+        "CREATE INDEX IF NOT EXISTS idx_queues_game_ranked_joined ON queues(game_id, ranked, joined_at, player_id)",
+        # Vérification de doublon (add_to_queue) et remove_from_queue
+        "CREATE INDEX IF NOT EXISTS idx_queues_player_game ON queues(player_id, game_id)",
+    ]),
+    (2, "Index des matchs", [
+        "CREATE INDEX IF NOT EXISTS idx_matches_status_player1 ON matches(status, player1_id)",
+        "CREATE INDEX IF NOT EXISTS idx_matches_status_player2 ON matches(status, player2_id)",
+        # Index partiels : seuls les matchs actifs, une petite fraction de l'historique
+        "CREATE INDEX IF NOT EXISTS idx_matches_active_player1 ON matches(player1_id, game_id) WHERE status = 'active'",
+        "CREATE INDEX IF NOT EXISTS idx_matches_active_player2 ON matches(player2_id, game_id) WHERE status = 'active'",
+    ]),
+    (3, "Index des sessions", [
+        "CREATE INDEX IF NOT EXISTS idx_player_sessions_account ON player_sessions(account_id)",
+    ]),
+    (4, "Classement ELO par jeu", [
+        # rating_key : 'account:<id>' pour un compte, 'session:<id>' pour un invité
+        """CREATE TABLE IF NOT EXISTS ratings (
+            rating_key TEXT NOT NULL,
+            game_name TEXT NOT NULL,
+            pseudo TEXT NOT NULL,
+            elo_rating REAL NOT NULL,
+            games_played INTEGER DEFAULT 0,
+            wins INTEGER DEFAULT 0,
+            losses INTEGER DEFAULT 0,
+            draws INTEGER DEFAULT 0,
+            win_streak INTEGER DEFAULT 0,
+            best_win_streak INTEGER DEFAULT 0,
+            last_game TIMESTAMP,
+            PRIMARY KEY (rating_key, game_name)
+        )""",
+    ]),
+]
+
+RATING_FIELDS = ('elo_rating', 'games_played', 'wins', 'losses', 'draws', 'win_streak', 'best_win_streak', 'last_game')
+
+def _freeze(value):
+    """Copie en lecture seule : dictionnaires en MappingProxyType, listes en tuples, récursivement"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Copie modifiable (et sérialisable en JSON ou en binaire) d'une valeur gelée du catalogue"""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class GameCatalog:
+    """Catalogue des jeux chargé une fois en mémoire, partagé par tous les threads : entièrement en lecture seule"""
+    version: int
+    games: Tuple[Mapping[str, Any], ...]
+    by_name: Mapping[str, Mapping[str, Any]]
+    by_id: Mapping[int, Mapping[str, Any]]
+    initial_board_json: Mapping[str, str]  # nom du jeu -> configuration initiale pré-sérialisée
 
 class MatchmakingDatabase:
-    def __init__(self, db_path: str = "matchmaking.db"):
+    def __init__(self, db_path: str = "matchmaking.db", pool_size: int = 8):
         self.db_path = db_path
+        # Connexions persistantes partagées par toutes les méthodes
+        self.pool = ConnectionPool(db_path, max_size=pool_size)
+        
+        # Catalogue des jeux, rechargé uniquement après une écriture dans `games`
+        self._catalog: Optional[GameCatalog] = None
+        self._catalog_version = 0
+        self._catalog_lock = threading.Lock()
+        
         self._init_db()
+        self._apply_migrations()
         self._add_default_games()
     
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Retourne les statistiques du pool de connexions"""
+        return self.pool.stats()
+    
+    def close(self):
+        """Ferme les connexions du pool"""
+        self.pool.close()
+    
     def _init_db(self):
         """Initialise la base de données avec les tables nécessaires"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # Table des comptes
@@ -89,9 +180,30 @@ class MatchmakingDatabase:
             
             conn.commit()
     
+    def get_schema_version(self) -> int:
+        """Retourne la version du schéma (dernière migration appliquée)"""
+        with self.pool.connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    def _apply_migrations(self):
+        """Applique les migrations manquantes, chacune dans sa propre transaction"""
+        current_version = self.get_schema_version()
+        
+        for version, description, statements in MIGRATIONS:
+            if version <= current_version:
+                continue
+            
+            with self.pool.connection() as conn:
+                conn.execute("BEGIN")
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+            
+            print(f"🗃️ Migration {version} appliquée: {description}")
+    
     def _add_default_games(self):
         """Ajoute les jeux par défaut s'ils n'existent pas"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # Vérifier si des jeux existent déjà
@@ -125,11 +237,66 @@ class MatchmakingDatabase:
             """, games)
             
             conn.commit()
+        
+        self.invalidate_catalog()
+    
+    def add_game(self, name: str, display_name: str, description: str, initial_board_config: Dict) -> int:
+        """Ajoute un jeu au catalogue"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO games (name, display_name, description, initial_board_config)
+                VALUES (?, ?, ?, ?)
+            """, (name, display_name, description, json.dumps(initial_board_config)))
+            game_id = cursor.lastrowid
+        
+        self.invalidate_catalog()
+        return game_id
+    
+    def invalidate_catalog(self):
+        """Force le rechargement du catalogue des jeux au prochain accès"""
+        with self._catalog_lock:
+            self._catalog = None
+    
+    def get_catalog(self) -> GameCatalog:
+        """Retourne le catalogue des jeux (chargé depuis la base au premier accès)"""
+        catalog = self._catalog
+        if catalog is not None:
+            return catalog
+        
+        with self._catalog_lock:
+            if self._catalog is None:
+                self._catalog = self._load_catalog()
+            return self._catalog
+    
+    def _load_catalog(self) -> GameCatalog:
+        """Lit la table `games` et construit les index du catalogue"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name, display_name, description, initial_board_config FROM games")
+            rows = cursor.fetchall()
+        
+        games = tuple(_freeze({
+            'id': row[0],
+            'name': row[1],
+            'display_name': row[2],
+            'description': row[3],
+            'initial_board_config': json.loads(row[4])
+        }) for row in rows)
+        
+        self._catalog_version += 1
+        return GameCatalog(
+            version=self._catalog_version,
+            games=games,
+            by_name=MappingProxyType({game['name']: game for game in games}),
+            by_id=MappingProxyType({game['id']: game for game in games}),
+            initial_board_json=MappingProxyType({row[1]: row[4] for row in rows})
+        )
     
     def register_account(self, username: str, password: str, display_name: str, email: Optional[str] = None) -> Optional[int]:
         """Enregistre un nouveau compte"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO accounts (username, password, display_name, email)
@@ -141,7 +308,7 @@ class MatchmakingDatabase:
     
     def login_account(self, username: str, password: str) -> Optional[Dict]:
         """Vérifie les identifiants et retourne les informations du compte"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, username, display_name, email
@@ -162,7 +329,7 @@ class MatchmakingDatabase:
     def create_player_session(self, ip_address: str, port: int, account_id: Optional[int] = None, 
                             session_pseudo: Optional[str] = None) -> int:
         """Crée une nouvelle session joueur"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO player_sessions (account_id, session_pseudo, ip_address, port)
@@ -172,7 +339,7 @@ class MatchmakingDatabase:
     
     def get_player_info(self, player_id: int) -> Optional[Dict]:
         """Récupère les informations d'un joueur"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT ps.id, ps.session_pseudo, a.display_name as account_display_name,
@@ -195,7 +362,7 @@ class MatchmakingDatabase:
     
     def add_to_queue(self, player_id: int, game_name: str, ranked: bool) -> int:
         """Ajoute un joueur à la file d'attente"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # Vérifier si le joueur est déjà en file
@@ -225,16 +392,31 @@ class MatchmakingDatabase:
     
     def remove_from_queue(self, player_id: int, game_id: int):
         """Retire un joueur de la file d'attente"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 DELETE FROM queues
                 WHERE player_id = ? AND game_id = ?
             """, (player_id, game_id))
     
+    def reserve_id_range(self, first_id: int):
+        """Fait démarrer les identifiants de comptes, de sessions et de matchs à `first_id` au moins (nœud de cluster)"""
+        with self.pool.connection() as conn:
+            for table in ('accounts', 'player_sessions', 'matches'):
+                row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+                if row is None:
+                    conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, first_id - 1))
+                elif row[0] < first_id - 1:
+                    conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (first_id - 1, table))
+    
+    def clear_queues(self):
+        """Vide les files d'attente (sessions d'une exécution précédente du serveur)"""
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM queues")
+    
     def get_queue_for_game(self, game_name: str, ranked: bool) -> List[Dict]:
         """Récupère la file d'attente pour un jeu"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT q.id, q.player_id, ps.session_pseudo, a.display_name, q.joined_at
@@ -262,17 +444,16 @@ class MatchmakingDatabase:
     
     def create_match(self, game_name: str, player1: Dict, player2: Dict, ranked: bool) -> int:
         """Crée un nouveau match dans la base de données"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
-            game_info = self.get_game_by_name(game_name)
+            catalog = self.get_catalog()
+            game_info = catalog.by_name.get(game_name)
             if not game_info:
                 raise ValueError(f"Jeu '{game_name}' introuvable")
 
-            # Le initial_board_config est déjà un dictionnaire Python (décodé par get_game_by_name)
-            # Il faut l'encoder en JSON pour le stocker dans la base de données des matchs
-            initial_board_config_dict = game_info['initial_board_config']
-            initial_board_config_json = json.dumps(initial_board_config_dict)
+            # Configuration initiale déjà sérialisée en JSON dans le catalogue
+            initial_board_config_json = catalog.initial_board_json[game_name]
             
             cursor.execute("""
                 INSERT INTO matches (game_id, player1_id, player2_id, ranked, status, board_state, current_turn_player_id)
@@ -291,17 +472,22 @@ class MatchmakingDatabase:
     
     def get_player_current_match(self, player_id: int, game_name: str) -> Optional[Dict]:
         """Récupère le match actif d'un joueur pour un jeu donné"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
+            # UNION ALL plutôt que OR : chaque branche utilise son index
             cursor.execute("""
                 SELECT m.id, m.game_id, m.player1_id, m.player2_id, m.ranked, m.status,
                        m.board_state, m.current_turn_player_id, m.winner_id, g.name as game_name
                 FROM matches m
                 JOIN games g ON m.game_id = g.id
-                WHERE (m.player1_id = ? OR m.player2_id = ?)
-                  AND g.name = ?
-                  AND m.status = 'active'
-            """, (player_id, player_id, game_name))
+                WHERE m.player1_id = ? AND g.name = ? AND m.status = 'active'
+                UNION ALL
+                SELECT m.id, m.game_id, m.player1_id, m.player2_id, m.ranked, m.status,
+                       m.board_state, m.current_turn_player_id, m.winner_id, g.name as game_name
+                FROM matches m
+                JOIN games g ON m.game_id = g.id
+                WHERE m.player2_id = ? AND g.name = ? AND m.status = 'active'
+            """, (player_id, game_name, player_id, game_name))
             
             row = cursor.fetchone()
             
@@ -325,7 +511,7 @@ class MatchmakingDatabase:
     def update_match_state(self, match_id: int, board_state: List[int], current_turn_player_id: Optional[int], 
                            winner_id: Optional[int] = None, is_draw: bool = False):
         """Met à jour l'état d'un match"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             status = 'active'
@@ -346,44 +532,47 @@ class MatchmakingDatabase:
             
             conn.commit()
     
-    def get_all_games(self) -> List[Dict]:
+    def get_all_games(self) -> List[Mapping[str, Any]]:
         """Retourne la liste de tous les jeux disponibles"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, name, display_name, description, initial_board_config FROM games")
-            games = []
-            for row in cursor.fetchall():
-                games.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'display_name': row[2],
-                    'description': row[3],
-                    'initial_board_config': json.loads(row[4])
-                })
-            return games
+        return list(self.get_catalog().games)
     
-    def get_game_by_name(self, name: str) -> Optional[Dict]:
+    def get_game_by_name(self, name: str) -> Optional[Mapping[str, Any]]:
         """Retourne les informations d'un jeu par son nom"""
-        with sqlite3.connect(self.db_path) as conn:
+        return self.get_catalog().by_name.get(name)
+    
+    def get_game_by_id(self, game_id: int) -> Optional[Mapping[str, Any]]:
+        """Retourne les informations d'un jeu par son identifiant"""
+        return self.get_catalog().by_id.get(game_id)
+    
+    def get_rating(self, rating_key: str, game_name: str) -> Optional[Dict]:
+        """Classement d'un joueur pour un jeu, None s'il n'a jamais joué en classé"""
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, name, display_name, description, initial_board_config 
-                FROM games WHERE name = ?
-            """, (name,))
+            cursor.execute(f"""
+                SELECT pseudo, {', '.join(RATING_FIELDS)} FROM ratings
+                WHERE rating_key = ? AND game_name = ?
+            """, (rating_key, game_name))
             row = cursor.fetchone()
             if row:
-                return {
-                    'id': row[0],
-                    'name': row[1],
-                    'display_name': row[2],
-                    'description': row[3],
-                    'initial_board_config': json.loads(row[4])
-                }
+                return {'pseudo': row[0], **dict(zip(RATING_FIELDS, row[1:]))}
             return None
     
+    def save_ratings(self, game_name: str, ratings: List[Dict]):
+        """Enregistre les classements des joueurs d'une partie (une seule transaction)"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(f"""
+                INSERT INTO ratings (rating_key, game_name, pseudo, {', '.join(RATING_FIELDS)})
+                VALUES (?, ?, ?, {', '.join('?' * len(RATING_FIELDS))})
+                ON CONFLICT(rating_key, game_name) DO UPDATE SET
+                    pseudo = excluded.pseudo, {', '.join(f'{name} = excluded.{name}' for name in RATING_FIELDS)}
+            """, [(rating['rating_key'], game_name, rating['pseudo'], *(rating[name] for name in RATING_FIELDS))
+                  for rating in ratings])
+            conn.commit()
+    
     def get_player_stats(self, pseudo: str, game_name: str) -> Dict:
         """Récupère les statistiques d'un joueur pour un jeu"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # TODO: Implémenter la logique des statistiques
@@ -395,6 +584,13 @@ class MatchmakingDatabase:
             }
 
 
+# Durée de chaque méthode publique, par nom de méthode (point de collecte des métriques)
+instrument_methods(MatchmakingDatabase, metrics.histogram(
+    'matchmaking_db_call_seconds', "Durée des appels à la base, par méthode", ('method',)
+))
+# Un span `db.<méthode>` par appel fait pendant une requête tracée
+trace_methods(MatchmakingDatabase, tracer, 'db.')
+
 # =================== TESTS ===================
 if __name__ == "__main__":
     print("=== Test système d'authentification et matchmaking ===")
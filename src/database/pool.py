@@ -0,0 +1,132 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class ConnectionPool:
+    """Pool borné de connexions SQLite persistantes.
+
+    Les connexions sont ouvertes à la demande (jusqu'à `max_size`), configurées
+    une seule fois (WAL, synchronous=NORMAL, cache, mmap) puis réutilisées ;
+    le cache de requêtes préparées de sqlite3 reste ainsi chaud d'un appel à l'autre.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 8, timeout: float = 5.0,
+                 cache_size_kib: int = 16384, mmap_size: int = 64 * 1024 * 1024,
+                 cached_statements: int = 256):
+        self.db_path = db_path
+        # Une base en mémoire n'existe que dans sa propre connexion
+        self.max_size = 1 if db_path == ':memory:' else max(1, max_size)
+        self.timeout = timeout
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+
+        self._idle: queue.LifoQueue = queue.LifoQueue()  # LIFO : réutiliser les connexions les plus chaudes
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+
+        # Statistiques
+        self.open_connections = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.in_use = 0
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Ouvre et configure une nouvelle connexion"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,  # Une connexion n'est utilisée que par un thread à la fois
+            cached_statements=self.cached_statements
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Emprunte une connexion libre, en ouvre une nouvelle ou attend"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self.open_connections < self.max_size
+                if can_open:
+                    self.open_connections += 1
+
+            if can_open:
+                try:
+                    conn = self._open_connection()
+                except Exception:
+                    with self._lock:
+                        self.open_connections -= 1
+                    raise
+                with self._lock:
+                    self._connections.append(conn)
+            else:
+                with self._lock:
+                    self.waits += 1
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"Aucune connexion SQLite disponible après {self.timeout}s")
+
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+        return conn
+
+    def _release(self, conn: sqlite3.Connection):
+        """Rend une connexion au pool"""
+        with self._lock:
+            self.in_use -= 1
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Emprunte une connexion pour la durée d'une transaction (commit ou rollback en sortie)"""
+        # Appel imbriqué dans le même thread : réutiliser la connexion déjà empruntée
+        current = getattr(self._local, 'conn', None)
+        if current is not None:
+            yield current
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def stats(self) -> Dict[str, int]:
+        """Retourne l'état du pool"""
+        with self._lock:
+            return {
+                'max_size': self.max_size,
+                'open_connections': self.open_connections,
+                'in_use': self.in_use,
+                'idle': self._idle.qsize(),
+                'checkouts': self.checkouts,
+                'waits': self.waits
+            }
+
+    def close(self):
+        """Ferme toutes les connexions ouvertes"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self.open_connections = 0
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
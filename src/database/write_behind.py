@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class WriteBehindWriter:
+    """Écritures différées vers la base : un thread dédié applique les opérations.
+
+    Les opérations sont indexées par une clé ; une nouvelle opération sur la même
+    clé remplace celle qui n'a pas encore été écrite (seul le dernier état compte).
+    """
+
+    def __init__(self, name: str = "write-behind"):
+        self.name = name
+        self._pending: 'OrderedDict[Hashable, Tuple[Callable, tuple]]' = OrderedDict()
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # Sérialise les lots (thread dédié et flush)
+        self._thread = None
+        self._running = False
+
+        # Statistiques
+        self.written = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def start(self):
+        """Démarre le thread d'écriture"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête le thread et écrit les opérations restantes"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def submit(self, key: Hashable, func: Callable, *args: Any):
+        """Planifie une écriture (remplace l'écriture en attente de même clé)"""
+        with self._condition:
+            if key in self._pending:
+                del self._pending[key]
+                self.coalesced += 1
+            self._pending[key] = (func, args)
+            self._condition.notify()
+
+    def flush(self):
+        """Écrit immédiatement toutes les opérations en attente"""
+        with self._condition:
+            batch, self._pending = self._pending, OrderedDict()
+        self._apply(batch)
+
+    def pending_count(self) -> int:
+        """Nombre d'opérations en attente d'écriture"""
+        with self._condition:
+            return len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        """Retourne les statistiques d'écriture"""
+        return {
+            'pending': self.pending_count(),
+            'written': self.written,
+            'coalesced': self.coalesced,
+            'errors': self.errors
+        }
+
+    def _run(self):
+        """Boucle du thread d'écriture"""
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                batch, self._pending = self._pending, OrderedDict()
+            self._apply(batch)
+
+    def _apply(self, batch: 'OrderedDict[Hashable, Tuple[Callable, tuple]]'):
+        """Applique un lot d'opérations dans l'ordre de soumission"""
+        with self._write_lock:
+            for key, (func, args) in batch.items():
+                try:
+                    func(*args)
+                    self.written += 1
+                except Exception as e:
+                    self.errors += 1
+                    print(f"❌ Erreur d'écriture différée ({key}): {e}")
@@ -0,0 +1,117 @@
+"""Canal d'administration local : socket Unix, trames JSON comme le protocole client.
+
+Une requête est un dict `{'command': ..., **paramètres}` ; la réponse est
+celle de `MatchmakingServer.handle_admin_command`. Le socket est réservé au
+propriétaire du processus (mode 0600) : c'est le système de fichiers qui
+authentifie, aucun jeton n'est demandé. Les réponses sont lues sur l'état
+en mémoire du serveur, jamais par des requêtes sur les tables.
+"""
+import os
+import socket
+import stat
+import threading
+from typing import Dict, Optional
+
+from src.common.protocol import FrameDecoder, decode_message, encode_message
+
+REQUEST_TIMEOUT = 30.0  # Secondes d'attente d'une réponse côté client (un rapport mémoire peut être long)
+
+
+class AdminServer:
+    """Écoute sur le socket d'administration ; un thread par connexion (trafic d'opérateur, très faible)"""
+
+    def __init__(self, server, path: str):
+        self.server = server
+        self.path = path
+        self._listener: Optional[socket.socket] = None
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._remove_stale_socket()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        os.chmod(self.path, 0o600)  # Avant `listen` : aucune connexion n'est acceptée entre les deux
+        listener.listen(8)
+        self._listener = listener
+        threading.Thread(target=self._accept_loop, args=(listener,), name="admin-accept", daemon=True).start()
+        print(f"🛠️ Canal d'administration sur {self.path}")
+
+    def _remove_stale_socket(self):
+        """Supprime le socket laissé par un serveur arrêté brutalement (mais pas celui d'un serveur actif)"""
+        try:
+            mode = os.stat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise RuntimeError(f"{self.path} existe et n'est pas un socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.unlink(self.path)
+        else:
+            raise RuntimeError(f"Un serveur écoute déjà sur {self.path}")
+        finally:
+            probe.close()
+
+    def _accept_loop(self, listener: socket.socket):
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(sock,), name="admin", daemon=True).start()
+
+    def _serve(self, sock: socket.socket):
+        decoder = FrameDecoder()
+        try:
+            with sock:
+                while True:
+                    data = sock.recv(65536)
+                    if not data:
+                        break
+                    for payload in decoder.feed(data):
+                        sock.sendall(encode_message(self._execute(payload)))
+        except (OSError, ValueError) as e:
+            print(f"❌ Connexion d'administration interrompue: {e}")
+
+    def _execute(self, payload: bytes) -> Dict:
+        try:
+            message = decode_message(payload)
+        except ValueError as e:
+            return {'type': 'error', 'message': f'Requête illisible: {e}'}
+        if not isinstance(message, dict):
+            return {'type': 'error', 'message': 'Requête attendue sous forme de dictionnaire'}
+        return self.server.handle_admin_command(message.get('command'), message)
+
+    def stop(self):
+        """Cesse d'écouter et supprime le socket"""
+        if self._listener is None:
+            return
+        try:
+            self._listener.shutdown(socket.SHUT_RDWR)  # Débloque `accept`
+        except OSError:
+            pass
+        self._listener.close()
+        self._listener = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def admin_request(path: str, command: str, timeout: float = REQUEST_TIMEOUT, **params) -> Dict:
+    """Envoie une commande sur le socket d'administration et retourne la réponse"""
+    decoder = FrameDecoder()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(encode_message({'command': command, **params}))
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                raise ConnectionError("Connexion fermée par le serveur avant la réponse")
+            for payload in decoder.feed(data):
+                return decode_message(payload)
@@ -0,0 +1,120 @@
+"""Console d'administration : interroge un serveur en cours par son socket d'administration local.
+
+Usage : python src/server/admin_cli.py [--socket CHEMIN] [--json] COMMANDE ...
+  players | queues | matches | pool | stats
+  kick PLAYER_ID | drain JEU [--ranked | --casual] | matchmake
+  call COMMANDE [clé=valeur ...]   (profilage, mémoire, enregistreurs de vol...)
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+# Ajouter le chemin pour importer les modules du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.config.settings import config
+from src.server.admin import admin_request
+
+
+def _print_table(rows: List[Dict], columns: List[str]):
+    if not rows:
+        print("(aucun)")
+        return
+    cells = [[str(row[column]) for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[index]) for line in cells)) for index, column in enumerate(columns)]
+    print('  '.join(column.ljust(width) for column, width in zip(columns, widths)))
+    for line in cells:
+        print('  '.join(cell.ljust(width) for cell, width in zip(line, widths)))
+
+
+def _parse_value(text: str):
+    """Valeur d'un paramètre `clé=valeur` : JSON si possible (nombres, booléens), texte sinon"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _display(command: str, response: Dict):
+    if command == 'players':
+        _print_table(response['players'], ['player_id', 'address', 'last_seen_s', 'codec', 'pending_bytes',
+                                           'congested'])
+    elif command == 'queues':
+        _print_table(response['queues'], ['game_name', 'ranked', 'depth', 'oldest_wait_s'])
+    elif command == 'matches':
+        _print_table(response['matches'], ['match_id', 'game_name', 'ranked', 'players',
+                                           'current_turn_player_id', 'moves'])
+    elif command == 'pool':
+        for section in ('pool', 'write_behind'):
+            print(f"{section}: " + ', '.join(f"{key}={value}" for key, value in response[section].items()))
+    elif command == 'kick':
+        print("✅ Joueur déconnecté" if response['kicked'] else "⚠️ Joueur non connecté")
+    elif command == 'drain_queue':
+        print(f"🧹 {response['removed']} joueur(s) retiré(s) de la file")
+    elif command == 'matchmaking_pass':
+        print(f"🤝 {response['matches_started']} match(s) créé(s)")
+    else:
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--socket', default=config.server.admin_socket,
+                        help="Socket d'administration du serveur (défaut : config.server.admin_socket)")
+    parser.add_argument('--json', action='store_true', help="Affiche la réponse brute en JSON")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, description in (('players', "Joueurs connectés et dernière activité"),
+                              ('queues', "Files d'attente : profondeur et plus longue attente"),
+                              ('matches', "Matchs en cours"),
+                              ('pool', "Pool de connexions SQLite et écritures différées"),
+                              ('stats', "Statistiques générales du serveur")):
+        commands.add_parser(name, help=description)
+    kick = commands.add_parser('kick', help="Déconnecte un joueur")
+    kick.add_argument('player_id', type=int)
+    drain = commands.add_parser('drain', help="Vide la file d'un jeu (classée et non classée par défaut)")
+    drain.add_argument('game_name')
+    mode = drain.add_mutually_exclusive_group()
+    mode.add_argument('--ranked', dest='ranked', action='store_const', const=True, default=None)
+    mode.add_argument('--casual', dest='ranked', action='store_const', const=False)
+    commands.add_parser('matchmake', help="Lance immédiatement une passe de matchmaking")
+    call = commands.add_parser('call', help="Commande d'administration quelconque")
+    call.add_argument('name')
+    call.add_argument('params', nargs='*', metavar='clé=valeur')
+    args = parser.parse_args()
+
+    if not args.socket:
+        parser.error("aucun socket d'administration : --socket ou config.server.admin_socket")
+
+    command, params = args.command, {}
+    if command == 'kick':
+        params = {'player_id': args.player_id}
+    elif command == 'drain':
+        command, params = 'drain_queue', {'game_name': args.game_name, 'ranked': args.ranked}
+    elif command == 'matchmake':
+        command = 'matchmaking_pass'
+    elif command == 'call':
+        command = args.name
+        for param in args.params:
+            key, separator, value = param.partition('=')
+            if not separator:
+                parser.error(f"paramètre attendu sous la forme clé=valeur : {param}")
+            params[key] = _parse_value(value)
+
+    try:
+        response = admin_request(args.socket, command, **params)
+    except OSError as e:
+        print(f"❌ Serveur injoignable sur {args.socket}: {e}")
+        sys.exit(1)
+
+    if response.get('type') == 'error':
+        print(f"❌ {response['message']}")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+    else:
+        _display(command, response)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import socket
+import threading
+from typing import Dict, Optional
+
+from src.common.protocol import encode_message
+
+# Motifs de refus d'une connexion
+REJECT_CAPACITY = 'capacity'  # Nombre total de connexions atteint
+REJECT_PER_IP = 'per_ip'      # Nombre de connexions de l'adresse atteint
+
+
+class AdmissionController:
+    """Contrôle d'admission des connexions entrantes.
+
+    Une connexion est admise tant que le total et le nombre de connexions de
+    son adresse restent sous leurs plafonds (0 : pas de plafond). Une
+    connexion refusée reçoit une trame `server_full` pré-encodée, envoyée
+    depuis la boucle d'acceptation sans créer de thread, puis est fermée.
+    """
+
+    def __init__(self, max_connections: int = 0, max_per_ip: int = 0, retry_after_ms: int = 1000):
+        self.max_connections = max_connections
+        self.max_per_ip = max_per_ip
+        self.retry_after_ms = retry_after_ms
+
+        self.active = 0
+        self._per_ip: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # Trames de refus, encodées une fois (avant toute négociation : JSON)
+        self._frames = {
+            REJECT_CAPACITY: encode_message({
+                'type': 'server_full', 'reason': REJECT_CAPACITY, 'retry_after_ms': retry_after_ms,
+                'message': f'Serveur complet, réessayez dans {retry_after_ms} ms'
+            }),
+            REJECT_PER_IP: encode_message({
+                'type': 'server_full', 'reason': REJECT_PER_IP, 'retry_after_ms': retry_after_ms,
+                'message': 'Trop de connexions depuis votre adresse'
+            }),
+        }
+
+        # Statistiques
+        self.admitted = 0
+        self.rejected = {REJECT_CAPACITY: 0, REJECT_PER_IP: 0}
+        self.max_active = 0
+
+    def try_admit(self, ip: str) -> Optional[str]:
+        """Réserve une place pour une connexion ; retourne le motif du refus, ou None si admise"""
+        with self._lock:
+            if self.max_connections and self.active >= self.max_connections:
+                reason = REJECT_CAPACITY
+            elif self.max_per_ip and self._per_ip.get(ip, 0) >= self.max_per_ip:
+                reason = REJECT_PER_IP
+            else:
+                self.active += 1
+                self._per_ip[ip] = self._per_ip.get(ip, 0) + 1
+                self.admitted += 1
+                self.max_active = max(self.max_active, self.active)
+                return None
+            self.rejected[reason] += 1
+            return reason
+
+    def release(self, ip: str):
+        """Libère la place d'une connexion admise qui se ferme"""
+        with self._lock:
+            count = self._per_ip.get(ip, 0)
+            if count <= 0:
+                return
+            self.active -= 1
+            if count == 1:
+                del self._per_ip[ip]
+            else:
+                self._per_ip[ip] = count - 1
+
+    def rejection_frame(self, reason: str) -> bytes:
+        """Trame `server_full` pour un motif de refus"""
+        return self._frames[reason]
+
+    def reject(self, sock: socket.socket, reason: str):
+        """Envoie la trame de refus sans bloquer puis ferme le socket"""
+        try:
+            sock.setblocking(False)
+            sock.send(self._frames[reason])
+            # Vider ce que le client a déjà envoyé : sinon la fermeture provoque un RST
+            # qui peut lui faire perdre la trame de refus
+            while sock.recv(4096):
+                pass
+        except OSError:
+            pass
+        finally:
+            sock.close()
+
+    def stats(self) -> Dict:
+        """Retourne l'état du contrôle d'admission"""
+        with self._lock:
+            return {
+                'active_connections': self.active,
+                'max_active_connections': self.max_active,
+                'max_connections': self.max_connections,
+                'max_connections_per_ip': self.max_per_ip,
+                'admitted': self.admitted,
+                'rejected_capacity': self.rejected[REJECT_CAPACITY],
+                'rejected_per_ip': self.rejected[REJECT_PER_IP]
+            }
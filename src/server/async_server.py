@@ -0,0 +1,171 @@
+import asyncio
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, TYPE_CHECKING
+
+from src.common.protocol import read_frame
+from src.server.connection import AsyncClientConnection
+
+if TYPE_CHECKING:
+    from src.server.matchmaking_server import MatchmakingServer
+
+
+class AsyncMatchmakingServer:
+    """Mode de service asyncio : une boucle d'événements par cœur.
+
+    Réutilise le dispatch `_process_message` du MatchmakingServer ; les appels
+    bloquants (base de données) sont exécutés dans un pool de threads pour ne
+    jamais bloquer les boucles d'événements.
+    """
+
+    def __init__(self, server: 'MatchmakingServer', loops: Optional[int] = None, db_workers: Optional[int] = None):
+        self.server = server
+        self.loops = loops or os.cpu_count() or 1
+
+        # Sans SO_REUSEPORT, plusieurs boucles ne peuvent pas écouter sur le même port
+        if not hasattr(socket, 'SO_REUSEPORT'):
+            self.loops = 1
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=db_workers or min(32, self.loops * 4),
+            thread_name_prefix='matchmaking-db'
+        )
+        self.loop_threads: List[threading.Thread] = []
+        self._event_loops: List[asyncio.AbstractEventLoop] = []
+        self._stop_events: List[asyncio.Event] = []
+        self._loops_lock = threading.Lock()
+
+    def start(self):
+        """Démarre les boucles d'événements (bloquant jusqu'à l'arrêt)"""
+        self.server.running = True
+        print(f"🚀 Serveur asyncio démarré sur {self.server.host}:{self.server.port} ({self.loops} boucle(s))")
+
+        # Démarrer le matchmaking automatique et les écritures différées
+        self.server._start_background_tasks()
+
+        # Une boucle par thread supplémentaire, la première tourne dans le thread courant
+        for index in range(1, self.loops):
+            thread = threading.Thread(target=self._run_loop, args=(index,), name=f"asyncio-loop-{index}", daemon=True)
+            self.loop_threads.append(thread)
+            thread.start()
+
+        try:
+            self._run_loop(0)
+        finally:
+            self.stop()
+            for thread in self.loop_threads:
+                thread.join(timeout=1)
+            self.executor.shutdown(wait=False)
+
+    def stop(self):
+        """Arrête toutes les boucles d'événements puis le serveur"""
+        with self._loops_lock:
+            for loop, stop_event in zip(self._event_loops, self._stop_events):
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(stop_event.set)
+
+        if self.server.running:
+            self.server.stop()
+
+    def _run_loop(self, index: int):
+        """Exécute une boucle d'événements dans le thread courant"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._serve(index))
+        except Exception as e:
+            print(f"❌ Erreur dans la boucle asyncio {index}: {e}")
+        finally:
+            loop.close()
+
+    async def _serve(self, index: int):
+        """Écoute sur le port du serveur jusqu'à la demande d'arrêt"""
+        stop_event = asyncio.Event()
+        with self._loops_lock:
+            self._event_loops.append(asyncio.get_running_loop())
+            self._stop_events.append(stop_event)
+
+        listener = await asyncio.start_server(
+            self._handle_connection,
+            self.server.host,
+            self.server.port,
+            backlog=self.server.config.accept_backlog,
+            reuse_address=True,
+            reuse_port=self.loops > 1 or self.server.reuse_port
+        )
+
+        async with listener:
+            await stop_event.wait()
+
+        # Annuler les connexions encore ouvertes sur cette boucle
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Gère un client connecté (équivalent asyncio de `_handle_client`)"""
+        loop = asyncio.get_running_loop()
+        client_address = writer.get_extra_info('peername')
+        client_socket = writer.get_extra_info('socket')
+        player_id = None
+
+        # Serveur plein : trame de refus mise en tampon puis fermeture, sans passer par l'exécuteur
+        admission = self.server.admission
+        reason = admission.try_admit(client_address[0])
+        if reason:
+            writer.write(admission.rejection_frame(reason))
+            writer.close()
+            return
+        print(f"🔗 Nouvelle connexion de {client_address}")
+
+        # File d'envoi vidée par une tâche de la boucle ; les notifications peuvent
+        # y être déposées depuis d'autres threads (matchmaking, pool DB)
+        connection = AsyncClientConnection(writer, loop, client_address, **self.server._connection_settings())
+        rate_limits = self.server.rate_limiter.open(client_address[0])
+        self.server.idle_reaper.watch(connection)
+
+        try:
+            while self.server.running and not connection.closed:
+                try:
+                    payload = await read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                connection.touch()
+
+                response = await loop.run_in_executor(
+                    self.executor, self.server._handle_request, payload, client_socket, client_address, rate_limits,
+                    connection
+                )
+
+                # Si c'est une connexion réussie, enregistrer le client
+                if response and response.get('type') in ['login_success', 'guest_success'] and response.get('player_id'):
+                    player_id = response['player_id']
+                    self.server._register_client(player_id, connection)
+
+                if response:
+                    self.server._send_to_connection(connection, response)
+
+                # L'accusé `hello_ack` part encore dans l'ancien codec, la suite dans le nouveau
+                self.server._apply_hello_ack(response, connection)
+                self.server._after_response(response)
+
+        except ConnectionResetError:
+            print(f"🔌 Connexion fermée par le client {client_address}")
+        except Exception as e:
+            print(f"❌ Erreur avec le client {client_address}: {e}")
+            # Écriture du fichier hors de la boucle : elle ne doit pas bloquer les autres connexions
+            await loop.run_in_executor(self.executor, self.server.dump_flight_recorder, connection,
+                                       f"exception: {e!r}")
+        finally:
+            # Nettoyer lors de la déconnexion (accès DB hors de la boucle)
+            if player_id:
+                await loop.run_in_executor(self.executor, self.server._handle_client_disconnect, player_id, connection)
+
+            self.server.idle_reaper.unwatch(connection)
+            connection.close()
+            self.server.rate_limiter.close(rate_limits)
+            admission.release(client_address[0])
+            print(f"👋 Client {client_address} déconnecté")
@@ -0,0 +1,68 @@
+import threading
+from typing import Dict, List, Optional
+
+from src.server.connection import ClientConnection
+
+
+class ClientRegistry:
+    """Clients connectés, répartis en compartiments indexés par `player_id`.
+
+    Chaque compartiment a son propre verrou, pris uniquement pour modifier son
+    contenu : deux connexions ou déconnexions simultanées ne se bloquent que
+    si elles tombent dans le même compartiment. Les lectures (`get`) ne
+    prennent aucun verrou : une connexion est un objet dont la référence ne
+    change pas, et la lecture d'un dict est atomique.
+    """
+
+    def __init__(self, shards: int = 16):
+        self.shard_count = max(1, shards)
+        self._shards: List[Dict[int, ClientConnection]] = [{} for _ in range(self.shard_count)]
+        self._locks = [threading.Lock() for _ in range(self.shard_count)]
+
+    def _index(self, player_id: int) -> int:
+        return hash(player_id) % self.shard_count
+
+    def register(self, player_id: int, connection: ClientConnection) -> Optional[ClientConnection]:
+        """Enregistre la connexion d'un joueur ; retourne celle qu'elle remplace"""
+        index = self._index(player_id)
+        with self._locks[index]:
+            previous = self._shards[index].get(player_id)
+            self._shards[index][player_id] = connection
+            return previous
+
+    def unregister(self, player_id: int, connection: Optional[ClientConnection] = None) -> bool:
+        """Retire un joueur ; si `connection` est donnée, seulement si c'est encore la sienne"""
+        index = self._index(player_id)
+        with self._locks[index]:
+            current = self._shards[index].get(player_id)
+            if current is None or (connection is not None and current is not connection):
+                return False
+            del self._shards[index][player_id]
+            return True
+
+    def get(self, player_id: int) -> Optional[ClientConnection]:
+        """Connexion d'un joueur (sans verrou)"""
+        return self._shards[self._index(player_id)].get(player_id)
+
+    def __contains__(self, player_id: int) -> bool:
+        return self.get(player_id) is not None
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def connections(self) -> List[ClientConnection]:
+        """Copie de toutes les connexions, compartiment par compartiment"""
+        connections = []
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                connections.extend(shard.values())
+        return connections
+
+    def clear(self) -> List[ClientConnection]:
+        """Vide le registre et retourne les connexions retirées"""
+        connections = []
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                connections.extend(shard.values())
+                shard.clear()
+        return connections
@@ -0,0 +1,723 @@
+import dataclasses
+import itertools
+import os
+import socket
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.common.protocol import FrameDecoder, decode_message, encode_message
+from src.common.ranking import RankingSystem
+from src.common.tracing import tracer
+from src.database.database import MatchmakingDatabase
+from src.database.write_behind import WriteBehindWriter
+from src.server.connection import POLICY_DISCONNECT, ThreadedClientConnection
+from src.server.matchmaking_queue import QueueEntry, QueueIndex
+from src.server.matchmaking_server import MatchmakingServer
+from src.server.ratings import record_ranked_result
+
+CHANNEL_QUEUE_BYTES = 64 * 1024 * 1024  # Messages en attente d'envoi sur un canal avant fermeture
+REQUEST_TIMEOUT = 5.0  # Secondes d'attente d'une réponse du coordinateur
+
+# Identifiants de comptes, de sessions et de matchs réservés à chaque nœud (index * CLUSTER_ID_RANGE + 1, ...) :
+# ils restent uniques dans le cluster alors que chaque nœud a sa propre base
+CLUSTER_ID_RANGE = 1 << 24
+
+
+class ClusterChannel:
+    """Canal entre un nœud et le coordinateur.
+
+    Les messages sont des dicts en trames JSON, comme pour les clients. Les
+    envois passent par une file et un thread écrivain (ils ne bloquent jamais
+    l'appelant) ; un thread lecteur passe chaque message reçu à `on_message`,
+    sauf les réponses (`op` = 'reply') qui débloquent `request`.
+    """
+
+    def __init__(self, sock: socket.socket, name: str, on_message: Callable[['ClusterChannel', Dict], None],
+                 on_close: Optional[Callable[['ClusterChannel'], None]] = None):
+        self.sock = sock
+        self.name = name
+        self.on_message = on_message
+        self.on_close = on_close
+        self.node: Optional[str] = None  # Nom du nœud à l'autre bout (côté coordinateur)
+        self._writer = ThreadedClientConnection(sock, (name,), high_watermark=CHANNEL_QUEUE_BYTES,
+                                                low_watermark=CHANNEL_QUEUE_BYTES, policy=POLICY_DISCONNECT)
+        self._pending: Dict[int, Future] = {}
+        self._request_ids = itertools.count(1)
+        self._reader = threading.Thread(target=self._read_loop, name=f"cluster-{name}", daemon=True)
+
+    @property
+    def closed(self) -> bool:
+        return self._writer.closed
+
+    def start(self):
+        """Démarre la lecture"""
+        self._reader.start()
+
+    def send(self, message: Dict) -> bool:
+        """Met un message en file d'envoi"""
+        return self._writer.send(encode_message(message))
+
+    def request(self, message: Dict, timeout: float = REQUEST_TIMEOUT) -> Optional[Dict]:
+        """Envoie un message et attend sa réponse (None si le canal est fermé ou muet).
+
+        Ne jamais appeler depuis `on_message` : la réponse serait lue par ce même thread.
+        """
+        request_id = next(self._request_ids)
+        future = Future()
+        self._pending[request_id] = future
+        try:
+            if not self.send(dict(message, rid=request_id)):
+                return None
+            return future.result(timeout)
+        except TimeoutError:
+            return None
+        finally:
+            self._pending.pop(request_id, None)
+
+    def reply(self, request: Dict, **fields):
+        """Répond à un message envoyé par `request`"""
+        self.send({'op': 'reply', 'rid': request['rid'], **fields})
+
+    def close(self):
+        """Ferme le canal (le lecteur s'arrête et appelle `on_close`)"""
+        self._writer.close()
+
+    def _read_loop(self):
+        decoder = FrameDecoder()
+        try:
+            while True:
+                data = self.sock.recv(65536)
+                if not data:
+                    break
+                for payload in decoder.feed(data):
+                    self._dispatch(decode_message(payload))
+        except (OSError, ValueError) as e:
+            if not self.closed:
+                print(f"❌ Canal {self.name} interrompu: {e}")
+        finally:
+            self._writer.close()
+            for future in list(self._pending.values()):
+                if not future.done():
+                    future.set_result(None)
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            if self.on_close:
+                self.on_close(self)
+
+    def _dispatch(self, message: Dict):
+        if message.get('op') == 'reply':
+            future = self._pending.get(message.get('rid'))
+            if future is not None and not future.done():
+                future.set_result(message)
+            return
+        try:
+            self.on_message(self, message)
+        except Exception as e:
+            print(f"❌ Erreur de traitement du message {message.get('op')} sur {self.name}: {e}")
+
+
+class SocketTransport:
+    """Transport par socket : 'unix:/chemin' sur une machine, 'hôte:port' (TCP) entre machines"""
+
+    def __init__(self, address: str):
+        self.address = address
+        if address.startswith('unix:'):
+            self.family = socket.AF_UNIX
+            self.target = address[len('unix:'):]
+        else:
+            host, _, port = address.rpartition(':')
+            if not host or not port.isdigit():
+                raise ValueError(f"Adresse de coordinateur invalide: {address}")
+            self.family = socket.AF_INET
+            self.target = (host, int(port))
+        self._listener: Optional[socket.socket] = None
+
+    def serve(self, coordinator: 'QueueCoordinator'):
+        """Écoute et confie chaque nœud qui se connecte au coordinateur"""
+        self._listener = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(self.target)
+        self._listener.listen(64)
+        threading.Thread(target=self._accept_loop, args=(self._listener, coordinator),
+                         name="coordinator-accept", daemon=True).start()
+
+    def _accept_loop(self, listener: socket.socket, coordinator: 'QueueCoordinator'):
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except OSError:
+                break
+            if self.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            coordinator.attach(sock)
+
+    def connect(self) -> socket.socket:
+        """Ouvre la connexion d'un nœud vers le coordinateur"""
+        if self.family == socket.AF_INET:
+            sock = socket.create_connection(self.target)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return sock
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.target)
+        return sock
+
+    def close(self):
+        """Cesse d'écouter"""
+        if self._listener is None:
+            return
+        try:
+            self._listener.shutdown(socket.SHUT_RDWR)  # Débloque `accept`
+        except OSError:
+            pass
+        self._listener.close()
+        self._listener = None
+        if self.family == socket.AF_UNIX:
+            try:
+                os.unlink(self.target)
+            except OSError:
+                pass
+
+
+class LoopbackTransport:
+    """Transport en mémoire : les nœuds d'un même processus sont reliés au coordinateur
+    par des paires de sockets, sans port ni fichier (tests, démonstrations)"""
+
+    def __init__(self):
+        self._coordinator: Optional['QueueCoordinator'] = None
+
+    def serve(self, coordinator: 'QueueCoordinator'):
+        self._coordinator = coordinator
+
+    def connect(self) -> socket.socket:
+        if self._coordinator is None:
+            raise ConnectionRefusedError("Aucun coordinateur sur ce transport")
+        node_side, coordinator_side = socket.socketpair()
+        self._coordinator.attach(coordinator_side)
+        return node_side
+
+    def close(self):
+        self._coordinator = None
+
+
+class QueueCoordinator:
+    """Propriétaire des files d'attente du cluster.
+
+    Les nœuds lui transmettent les entrées et sorties de file de leurs
+    joueurs ; il tient l'unique QueueIndex, apparie les joueurs et confie
+    chaque match au nœud du premier joueur. Il tient aussi l'annuaire
+    joueur -> nœud et relaie les messages qui changent de nœud :
+    notifications d'un match, coups et resynchronisations d'un joueur dont le
+    match appartient à un autre nœud. Les classements ELO sont dans sa base :
+    un joueur peut jouer en classé depuis n'importe quel nœud.
+    """
+
+    def __init__(self, db_path: str, transport, matchmaking_interval: float = 2):
+        self.transport = transport
+        self.running = False
+        self._stopped = threading.Event()
+
+        # Créée avant les nœuds locaux : le schéma et ses migrations ne sont appliqués qu'une fois
+        self.db = MatchmakingDatabase(db_path)
+        self.db.clear_queues()  # Les entrées d'une exécution précédente sont orphelines
+        self.db_writer = WriteBehindWriter("queue-writer")
+        self.queue_index = QueueIndex()
+        self.ranking = RankingSystem()
+
+        self.nodes: Dict[str, ClusterChannel] = {}
+        self.players: Dict[int, str] = {}  # player_id -> nœud où il est connecté
+        self.match_owners: Dict[Tuple[int, str], str] = {}  # (player_id, jeu) -> nœud propriétaire du match
+        self._lock = threading.Lock()
+
+        self.matchmaking_interval = matchmaking_interval
+        self.matchmaking_event = threading.Event()
+        self._dirty_queues = set()
+        self._dirty_lock = threading.Lock()
+
+        # Statistiques
+        self.routed_messages = 0
+        self.forwarded_requests = 0
+
+        self._handlers = {
+            'register_node': self._on_register_node,
+            'player_online': self._on_player_online,
+            'player_offline': self._on_player_offline,
+            'queue_add': self._on_queue_add,
+            'queue_remove': self._on_queue_remove,
+            'route': self._on_route,
+            'forward': self._on_forward,
+            'match_ended': self._on_match_ended,
+            'queues': self._on_admin_queues,
+            'queue_depths': self._on_queue_depths,
+            'drain': self._on_drain,
+            'matchmake': self._on_matchmake,
+            'queue_ready': self._on_queue_ready,
+            'rating_get': self._on_rating_get,
+            'ranked_result': self._on_ranked_result,
+        }
+
+    def start(self):
+        """Accepte les nœuds et démarre l'appariement (non bloquant)"""
+        self.running = True
+        self._stopped.clear()
+        self.db_writer.start()
+        self.transport.serve(self)
+        threading.Thread(target=self._auto_matchmaking, name="coordinator-matchmaking", daemon=True).start()
+
+    def serve_forever(self):
+        """Démarre le coordinateur et bloque jusqu'à `stop`"""
+        self.start()
+        print(f"🧭 Coordinateur du cluster en écoute sur {getattr(self.transport, 'address', 'loopback')}")
+        self._stopped.wait()
+
+    def stop(self):
+        """Ferme les canaux et écrit les opérations de file restantes"""
+        if not self.running:
+            return
+        self.running = False
+        self.matchmaking_event.set()
+        self.transport.close()
+        with self._lock:
+            channels = list(self.nodes.values())
+        for channel in channels:
+            channel.close()
+        self.db_writer.stop()
+        self.db.close()
+        self._stopped.set()
+
+    def attach(self, sock: socket.socket):
+        """Prend en charge la connexion d'un nœud (appelé par le transport)"""
+        ClusterChannel(sock, "coordinator", self._on_node_message, self._on_node_closed).start()
+
+    def stats(self) -> Dict:
+        """Retourne l'état du cluster vu par le coordinateur"""
+        with self._lock:
+            nodes = {name: 0 for name in self.nodes}
+            for node in self.players.values():
+                nodes[node] = nodes.get(node, 0) + 1
+        return {
+            'nodes': nodes,  # nœud -> joueurs connectés
+            'players_in_queue': self.queue_index.total(),
+            'routed_messages': self.routed_messages,
+            'forwarded_requests': self.forwarded_requests
+        }
+
+    def _on_node_message(self, channel: ClusterChannel, message: Dict):
+        handler = self._handlers.get(message.get('op'))
+        if handler is None:
+            print(f"⚠️ Message inconnu du nœud {channel.node}: {message.get('op')}")
+            return
+        if channel.node is None and message.get('op') != 'register_node':
+            print(f"⚠️ Message {message.get('op')} d'un nœud non enregistré ignoré")
+            return
+        handler(channel, message)
+
+    def _on_register_node(self, channel: ClusterChannel, message: Dict):
+        node = message['node']
+        with self._lock:
+            current = self.nodes.get(node)
+            if current is not None and not current.closed:
+                duplicate = True
+            else:
+                duplicate = False
+                channel.node = node
+                channel.name = f"coordinator-{node}"
+                self.nodes[node] = channel
+        if duplicate:
+            print(f"⚠️ Nœud {node} déjà enregistré, connexion refusée")
+            channel.close()
+            return
+        print(f"🔗 Nœud {node} (pid {message.get('pid')}) connecté au coordinateur")
+
+    def _on_node_closed(self, channel: ClusterChannel):
+        """Un nœud arrêté emporte ses joueurs : ils quittent l'annuaire et les files"""
+        if channel.node is None:
+            return
+        with self._lock:
+            if self.nodes.get(channel.node) is channel:
+                del self.nodes[channel.node]
+            players = [player_id for player_id, node in self.players.items() if node == channel.node]
+        for player_id in players:
+            self._forget_player(channel.node, player_id)
+        if self.running:
+            print(f"⚠️ Nœud {channel.node} déconnecté du coordinateur ({len(players)} joueur(s) retirés)")
+
+    def _on_player_online(self, channel: ClusterChannel, message: Dict):
+        with self._lock:
+            self.players[message['player_id']] = channel.node
+
+    def _on_player_offline(self, channel: ClusterChannel, message: Dict):
+        self._forget_player(channel.node, message['player_id'])
+
+    def _forget_player(self, node: str, player_id: int):
+        """Retire un joueur déconnecté de l'annuaire et de toutes ses files ; il perd ses matchs distants"""
+        owned = []
+        with self._lock:
+            # Ne pas oublier un joueur reconnecté entre-temps à un autre nœud
+            if self.players.get(player_id) == node:
+                del self.players[player_id]
+                owned = [(key, owner) for key, owner in self.match_owners.items() if key[0] == player_id]
+                for key, _ in owned:
+                    del self.match_owners[key]
+        for entry in self.queue_index.remove_player(player_id):
+            self._persist_queue_removal(entry)
+        # Le nœud du joueur a déjà déclaré forfait pour ses matchs locaux
+        for (_, game_name), owner in owned:
+            channel = self._node_channel(owner)
+            if owner != node and channel is not None:
+                channel.send({'op': 'forfeit', 'player_id': player_id, 'game_name': game_name})
+
+    def _on_queue_add(self, channel: ClusterChannel, message: Dict):
+        player_id, game_name, ranked = message['player_id'], message['game_name'], message['ranked']
+        if (player_id, game_name) in self.match_owners:
+            channel.reply(message, ticket=None, playing=True)  # Match en cours sur un nœud
+            return
+        entry = self.queue_index.add(player_id, game_name, ranked, message['pseudo'], message.get('elo_rating'),
+                                     message.get('rating_key'))
+        if entry is None:
+            channel.reply(message, ticket=None)
+            return
+
+        # Copie différée dans la table `queues` ; l'appariement immédiat attend `queue_ready`
+        self.db_writer.submit(('queue', player_id, game_name), self.db.add_to_queue, player_id, game_name, ranked)
+        channel.reply(message, ticket=entry.ticket, depth=self.queue_index.depth(game_name, ranked))
+
+    def _on_queue_remove(self, channel: ClusterChannel, message: Dict):
+        entry = self.queue_index.remove(message['player_id'], message['game_name'])
+        if entry:
+            self._persist_queue_removal(entry)
+
+    def _on_match_ended(self, channel: ClusterChannel, message: Dict):
+        """Un match terminé libère ses joueurs (ils peuvent de nouveau entrer en file pour ce jeu)"""
+        with self._lock:
+            for player_id in message['players']:
+                key = (player_id, message['game_name'])
+                if self.match_owners.get(key) == channel.node:
+                    del self.match_owners[key]
+
+    def _on_route(self, channel: ClusterChannel, message: Dict):
+        """Relaie un message au nœud du joueur destinataire (ignoré s'il n'est plus connecté)"""
+        target = self._node_channel(self.players.get(message['player_id']))
+        if target is not None:
+            self.routed_messages += 1
+            target.send({'op': 'deliver', 'player_id': message['player_id'], 'message': message['message']})
+
+    def _on_forward(self, channel: ClusterChannel, message: Dict):
+        """Transmet un coup ou une resynchronisation au nœud propriétaire du match"""
+        owner = self._node_channel(self.match_owners.get((message['player_id'], message['game_name'])))
+        if owner is None:
+            channel.send({
+                'op': 'deliver',
+                'player_id': message['player_id'],
+                'message': {'type': 'error', 'message': 'Aucune partie en cours pour ce joueur'}
+            })
+            return
+        self.forwarded_requests += 1
+        owner.send({'op': 'handle', 'message': message['message']})
+
+    def _on_admin_queues(self, channel: ClusterChannel, message: Dict):
+        channel.reply(message, queues=self.queue_index.describe())
+
+    def _on_queue_depths(self, channel: ClusterChannel, message: Dict):
+        """Joueurs du nœud demandeur en file, par (jeu, classée) : la somme sur les nœuds donne tout le cluster"""
+        with self._lock:
+            local = {player_id for player_id, node in self.players.items() if node == channel.node}
+        depths = self.queue_index.depths(lambda entry: entry.player_id in local)
+        channel.reply(message, depths=[[game_name, ranked, depth] for (game_name, ranked), depth in depths.items()])
+
+    def _on_drain(self, channel: ClusterChannel, message: Dict):
+        channel.reply(message, removed=self.drain_queue(message['game_name'], message.get('ranked')))
+
+    def _on_queue_ready(self, channel: ClusterChannel, message: Dict):
+        """Le nœud a envoyé `queue_joined` : la file peut être appariée"""
+        self._request_matchmaking(message['game_name'], message['ranked'])
+
+    def _on_matchmake(self, channel: ClusterChannel, message: Dict):
+        channel.reply(message, matches_started=self._run_matchmaking_pass())
+
+    def _on_rating_get(self, channel: ClusterChannel, message: Dict):
+        channel.reply(message, rating=self.db.get_rating(message['rating_key'], message['game_name']))
+
+    def _on_ranked_result(self, channel: ClusterChannel, message: Dict):
+        """Résultat d'une partie classée d'un nœud.
+
+        Enregistré avant que le canal ne traite la suite, dont le `game_over`
+        à relayer : un joueur qui revient en file lit déjà son nouvel ELO.
+        """
+        players = [tuple(player) for player in message['players']]
+        record_ranked_result(self.db, self.ranking, message['game_name'], players, message['winner'])
+
+    def drain_queue(self, game_name: str, ranked: Optional[bool] = None) -> int:
+        """Vide la file d'un jeu (les deux files si `ranked` est None) et prévient les joueurs retirés"""
+        removed = self.queue_index.drain(game_name, ranked)
+        for entry in removed:
+            self._persist_queue_removal(entry)
+            channel = self._node_channel(self.players.get(entry.player_id))
+            if channel is not None:
+                channel.send({
+                    'op': 'deliver',
+                    'player_id': entry.player_id,
+                    'message': {
+                        'type': 'queue_left',
+                        'message': f"File d'attente de {game_name} vidée par l'administrateur"
+                    }
+                })
+        print(f"🧹 File {game_name} vidée par l'administrateur ({len(removed)} joueur(s))")
+        return len(removed)
+
+    def _node_channel(self, node: Optional[str]) -> Optional[ClusterChannel]:
+        return self.nodes.get(node) if node is not None else None
+
+    def _persist_queue_removal(self, entry: QueueEntry):
+        """Planifie la suppression d'une entrée de la table `queues`"""
+        self.db_writer.submit(
+            ('queue', entry.player_id, entry.game_name),
+            self._remove_queue_row, entry.player_id, entry.game_name
+        )
+
+    def _remove_queue_row(self, player_id: int, game_name: str):
+        """Supprime une entrée de la table `queues` (exécuté par le thread d'écriture)"""
+        game = self.db.get_game_by_name(game_name)
+        if game:
+            self.db.remove_from_queue(player_id, game['id'])
+
+    def _request_matchmaking(self, game_name: str, ranked: bool):
+        """Signale au thread d'appariement qu'une file a changé"""
+        with self._dirty_lock:
+            self._dirty_queues.add((game_name, ranked))
+        self.matchmaking_event.set()
+
+    def _auto_matchmaking(self):
+        """Thread d'appariement, réveillé à chaque entrée en file"""
+        while self.running:
+            try:
+                notified = self.matchmaking_event.wait(self.matchmaking_interval)
+                self.matchmaking_event.clear()
+                if not self.running:
+                    break
+
+                with self._dirty_lock:
+                    dirty, self._dirty_queues = self._dirty_queues, set()
+
+                self._run_matchmaking_pass(dirty if notified else None)
+
+            except Exception as e:
+                print(f"❌ Erreur dans le matchmaking automatique: {e}")
+
+    def _run_matchmaking_pass(self, queue_keys=None) -> int:
+        """Apparie les joueurs et confie chaque match au nœud de l'un d'eux ; retourne le nombre de matchs confiés"""
+        if queue_keys is None:
+            queue_keys = self.queue_index.keys()
+
+        started = 0
+        for game_name, ranked in queue_keys:
+            for entry1, entry2 in self.queue_index.pop_pairs(game_name, ranked):
+                with self._lock:
+                    present = [entry for entry in (entry1, entry2)
+                               if self._node_channel(self.players.get(entry.player_id)) is not None]
+                    if len(present) == 2:
+                        owner = self.players[entry1.player_id]
+                        self.match_owners[(entry1.player_id, game_name)] = owner
+                        self.match_owners[(entry2.player_id, game_name)] = owner
+                    else:
+                        # Pas de match contre un joueur parti : l'autre reprend sa place (sous le verrou,
+                        # pour qu'un départ simultané le retire bien de la file)
+                        for entry in present:
+                            self.queue_index.requeue(entry)
+                if len(present) < 2:
+                    for entry in (entry1, entry2):
+                        if entry not in present:
+                            self._persist_queue_removal(entry)
+                    if present:
+                        self._request_matchmaking(game_name, ranked)
+                    continue
+                self._persist_queue_removal(entry1)
+                self._persist_queue_removal(entry2)
+                self._node_channel(owner).send({
+                    'op': 'start_match',
+                    'game_name': game_name,
+                    'ranked': ranked,
+                    'entries': [dataclasses.asdict(entry1), dataclasses.asdict(entry2)]
+                })
+                started += 1
+        return started
+
+
+class ClusterMatchmakingServer(MatchmakingServer):
+    """Nœud du cluster : ses clients et les matchs qui lui sont confiés.
+
+    Les files d'attente sont déléguées au coordinateur. Un message pour un
+    joueur connecté à un autre nœud, ainsi qu'un coup ou une
+    resynchronisation pour un match qui n'est pas local, passent par lui.
+
+    Sans coordinateur, le nœud ne peut plus servir : il appelle
+    `on_coordinator_lost` (l'arrêt de ce qui le fait tourner, boucles asyncio
+    comprises), à défaut son propre `stop`, et lève `coordinator_lost` pour
+    que le lanceur sorte en erreur.
+    """
+
+    def __init__(self, node_name: str, transport, *args, node_index: int = 0,
+                 on_coordinator_lost: Optional[Callable[[], None]] = None, **kwargs):
+        self.node_name = node_name
+        self.transport = transport
+        self.link: Optional[ClusterChannel] = None
+        self.on_coordinator_lost = on_coordinator_lost
+        self.coordinator_lost = False
+        super().__init__(*args, **kwargs)
+        # Plusieurs nœuds peuvent partager une base (workers d'une machine) : la réservation est idempotente
+        self.db.reserve_id_range(node_index * CLUSTER_ID_RANGE + 1)
+
+    def _init_queue_table(self):
+        pass  # La table `queues` appartient au coordinateur
+
+    def stop(self):
+        super().stop()
+        if self.link:
+            self.link.close()
+
+    def _start_matchmaking(self):
+        """Se connecte au coordinateur, qui apparie les joueurs de tous les nœuds"""
+        self.link = ClusterChannel(self.transport.connect(), self.node_name, self._on_coordinator_message,
+                                   self._on_coordinator_closed)
+        self.link.start()
+        self.link.send({'op': 'register_node', 'node': self.node_name, 'pid': os.getpid()})
+
+    def _on_coordinator_closed(self, channel: ClusterChannel):
+        """Sans coordinateur, plus de matchmaking ni de relais : le nœud s'arrête proprement"""
+        if self.running:
+            print(f"❌ Nœud {self.node_name}: coordinateur perdu, arrêt")
+            self.coordinator_lost = True
+            # Hors du thread lecteur du canal, que l'arrêt referme
+            threading.Thread(target=self.on_coordinator_lost or self.stop, name="coordinator-lost",
+                             daemon=True).start()
+
+    def _on_coordinator_message(self, channel: ClusterChannel, message: Dict):
+        op = message.get('op')
+        if op == 'deliver':
+            MatchmakingServer._send_to_player(self, message['player_id'], message['message'])
+        elif op == 'start_match':
+            entries = [QueueEntry(**entry) for entry in message['entries']]
+            self._start_match(message['game_name'], message['ranked'], *entries)
+        elif op == 'handle':
+            self._handle_forwarded(message['message'])
+        elif op == 'forfeit':
+            match = self.match_store.get_for_player(message['player_id'], message['game_name'])
+            if match is not None:
+                self._forfeit_match(match, message['player_id'], 'forfeit')
+
+    def _handle_forwarded(self, message: Dict):
+        """Traite un message relayé pour un match local ; la réponse repart vers le joueur"""
+        handlers = {
+            'make_move': MatchmakingServer._handle_make_move,
+            'resync': MatchmakingServer._handle_resync,
+        }
+        handler = handlers.get(message.get('type'))
+        response = handler(self, message) if handler else None
+        if response:
+            self._send_to_player(message['player_id'], response)
+
+    def _forward_if_remote(self, message: Dict) -> bool:
+        """Relaie au coordinateur un message dont le match n'est pas sur ce nœud"""
+        player_id = message.get('player_id')
+        game_name = message.get('game_name')
+        if not player_id or not game_name or self.match_store.get_for_player(player_id, game_name):
+            return False
+        self.link.send({'op': 'forward', 'player_id': player_id, 'game_name': game_name, 'message': message})
+        return True
+
+    def _handle_make_move(self, message: Dict) -> Optional[Dict]:
+        if self._forward_if_remote(message):
+            return None  # Le nœud propriétaire répondra
+        return super()._handle_make_move(message)
+
+    def _handle_resync(self, message: Dict) -> Optional[Dict]:
+        if self._forward_if_remote(message):
+            return None
+        return super()._handle_resync(message)
+
+    def _register_client(self, player_id: int, connection):
+        super()._register_client(player_id, connection)
+        self.link.send({'op': 'player_online', 'player_id': player_id})
+
+    def _send_to_player(self, player_id: int, message: Dict):
+        if self.clients.get(player_id) is not None:
+            super()._send_to_player(player_id, message)
+        else:
+            with tracer.span('route') as span:
+                span.tag('player_id', player_id)
+                span.tag('message', message.get('type'))
+                self.link.send({'op': 'route', 'player_id': player_id, 'message': message})
+
+    def _coordinator_request(self, message: Dict) -> Dict:
+        """Requête au coordinateur ; RuntimeError s'il ne répond pas"""
+        reply = self.link.request(message) if self.link else None
+        if reply is None:
+            raise RuntimeError("Coordinateur des files injoignable")
+        return reply
+
+    def _enqueue(self, player_id: int, game_name: str, ranked: bool, pseudo: str,
+                 elo_rating: Optional[float], rating_key: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        reply = self._coordinator_request({
+            'op': 'queue_add', 'player_id': player_id, 'game_name': game_name, 'ranked': ranked,
+            'pseudo': pseudo, 'elo_rating': elo_rating, 'rating_key': rating_key
+        })
+        if reply.get('playing'):
+            raise ValueError("Partie en cours pour ce jeu")
+        if reply['ticket'] is None:
+            return None
+        return reply['ticket'], reply['depth']
+
+    def _request_matchmaking(self, game_name: str, ranked: bool):
+        self.link.send({'op': 'queue_ready', 'game_name': game_name, 'ranked': ranked})
+
+    def _complete_match(self, match, is_draw: bool = False):
+        super()._complete_match(match, is_draw)
+        self.link.send({'op': 'match_ended', 'game_name': match.game_name,
+                        'players': [match.player1_id, match.player2_id]})
+
+    def _dequeue(self, player_id: int, game_name: str):
+        self.link.send({'op': 'queue_remove', 'player_id': player_id, 'game_name': game_name})
+
+    def _dequeue_player(self, player_id: int):
+        self.link.send({'op': 'player_offline', 'player_id': player_id})
+
+    def _persist_queue_removal(self, entry: QueueEntry):
+        pass  # Fait par le coordinateur au moment de l'appariement
+
+    # Les files sont chez le coordinateur : `queue_index` est vide sur un nœud
+    def _queue_depths(self) -> Dict[Tuple[str, str], int]:
+        """Joueurs de ce nœud en file (la somme des jauges des nœuds donne les files du cluster)"""
+        try:
+            reply = self._coordinator_request({'op': 'queue_depths'})
+        except RuntimeError:
+            return {}
+        return {(game_name, 'true' if ranked else 'false'): depth for game_name, ranked, depth in reply['depths']}
+
+    def _admin_queues(self) -> List[Dict]:
+        return self._coordinator_request({'op': 'queues'})['queues']
+
+    def drain_queue(self, game_name: str, ranked: Optional[bool] = None) -> int:
+        return self._coordinator_request({'op': 'drain', 'game_name': game_name, 'ranked': ranked})['removed']
+
+    def _run_matchmaking_pass(self, queue_keys=None) -> int:
+        return self._coordinator_request({'op': 'matchmake'})['matches_started']
+
+    # Les classements sont chez le coordinateur, partagés par tous les nœuds
+    def _fetch_rating(self, rating_key: str, game_name: str) -> Optional[Dict]:
+        return self._coordinator_request({'op': 'rating_get', 'rating_key': rating_key,
+                                          'game_name': game_name})['rating']
+
+    def _record_ranked_result(self, match, is_draw: bool):
+        # Sans attendre de réponse : un forfait peut terminer le match depuis le thread lecteur du canal
+        winner_index = None if is_draw else (1 if match.winner_id == match.player2_id else 0)
+        self.link.send({'op': 'ranked_result', 'game_name': match.game_name,
+                        'players': [list(player) for player in match.ratings], 'winner': winner_index})
+
+    def get_server_stats(self) -> Dict:
+        stats = super().get_server_stats()
+        stats['cluster_node'] = self.node_name
+        stats['players_in_queue'] = sum(self._queue_depths().values())
+        return stats
@@ -0,0 +1,220 @@
+import asyncio
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, List, Optional
+
+from src.common.protocol import JSON_CODEC
+from src.server.flight_recorder import FlightRecorder
+
+# Politiques appliquées à un client dont la file d'envoi dépasse le seuil haut
+POLICY_DROP = 'drop'              # Les messages sont ignorés jusqu'au retour sous le seuil bas
+POLICY_DISCONNECT = 'disconnect'  # La connexion est fermée
+SEND_POLICIES = (POLICY_DROP, POLICY_DISCONNECT)
+
+WRITE_BATCH_BYTES = 64 * 1024  # Octets écrits par l'écrivain en une fois
+
+
+class ClientConnection(ABC):
+    """Connexion d'un client avec sa file d'envoi bornée.
+
+    `send` n'écrit jamais sur le socket : il met la trame en file et réveille
+    l'écrivain propre à la connexion. Un client lent ne bloque donc ni
+    l'appelant ni les autres clients. Les octets en attente (file et lot en
+    cours d'écriture) sont comparés aux seuils : au-delà du seuil haut, la
+    politique choisie s'applique ; les envois reprennent sous le seuil bas.
+    """
+
+    def __init__(self, address: tuple, high_watermark: int = 256 * 1024, low_watermark: int = 64 * 1024,
+                 policy: str = POLICY_DROP, recorder_size: int = 64):
+        if policy not in SEND_POLICIES:
+            raise ValueError(f"Politique d'envoi inconnue: {policy}")
+        self.address = address
+        self.high_watermark = high_watermark
+        self.low_watermark = min(low_watermark, high_watermark)
+        self.policy = policy
+
+        # Options négociées par `hello` (codec, mises à jour incrémentales)
+        self.options: Dict = {'codec': JSON_CODEC, 'delta': False}
+        self.player_id: Optional[int] = None
+        self.last_seen = time.monotonic()  # Dernière réception, pour la détection d'inactivité
+        self.recorder = FlightRecorder(recorder_size)  # Derniers messages reçus et envoyés
+
+        self._queue: deque = deque()
+        self._pending_bytes = 0  # En file + en cours d'écriture
+        self._lock = threading.Lock()
+        self.congested = False
+        self.closed = False
+
+        # Statistiques
+        self.sent_messages = 0
+        self.sent_bytes = 0
+        self.dropped_messages = 0
+        self.max_pending_bytes = 0
+
+    def send(self, data: bytes) -> bool:
+        """Met une trame en file d'envoi ; retourne False si elle est ignorée"""
+        with self._lock:
+            if self.closed:
+                return False
+
+            overflow_policy = None
+            if not self.congested and self._pending_bytes + len(data) > self.high_watermark:
+                self.congested = True
+                overflow_policy = self.policy
+
+            accepted = not self.congested
+            if accepted:
+                self._queue.append(data)
+                self._pending_bytes += len(data)
+                self.max_pending_bytes = max(self.max_pending_bytes, self._pending_bytes)
+            else:
+                self.dropped_messages += 1
+
+        if accepted:
+            self._wake_writer()
+        elif overflow_policy == POLICY_DISCONNECT:
+            print(f"🐢 Client {self.address} ne lit plus ses messages, déconnexion")
+            self.close()
+        elif overflow_policy == POLICY_DROP:
+            print(f"🐢 Client {self.address} saturé, messages ignorés jusqu'à résorption")
+        return accepted
+
+    def touch(self):
+        """Note une activité du client (appelé à chaque réception)"""
+        self.last_seen = time.monotonic()
+
+    def _take_batch(self) -> List[bytes]:
+        """Retire de la file un lot d'au plus WRITE_BATCH_BYTES (au moins une trame)"""
+        with self._lock:
+            batch = []
+            size = 0
+            while self._queue and (not batch or size + len(self._queue[0]) <= WRITE_BATCH_BYTES):
+                data = self._queue.popleft()
+                batch.append(data)
+                size += len(data)
+            return batch
+
+    def _batch_sent(self, batch: List[bytes]):
+        """Comptabilise un lot écrit ; lève la saturation sous le seuil bas"""
+        size = sum(len(data) for data in batch)
+        with self._lock:
+            self._pending_bytes -= size
+            self.sent_messages += len(batch)
+            self.sent_bytes += size
+            if self.congested and self._pending_bytes <= self.low_watermark:
+                self.congested = False
+
+    def pending_bytes(self) -> int:
+        """Octets en attente d'envoi"""
+        return self._pending_bytes
+
+    def close(self):
+        """Ferme la connexion (l'écrivain s'arrête, la lecture se termine)"""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        self._wake_writer()
+        self._close_transport()
+
+    def stats(self) -> Dict:
+        """Retourne l'état de la file d'envoi"""
+        with self._lock:
+            return {
+                'queued_messages': len(self._queue),
+                'pending_bytes': self._pending_bytes,
+                'max_pending_bytes': self.max_pending_bytes,
+                'congested': self.congested,
+                'sent_messages': self.sent_messages,
+                'sent_bytes': self.sent_bytes,
+                'dropped_messages': self.dropped_messages
+            }
+
+    @abstractmethod
+    def _wake_writer(self):
+        """Signale à l'écrivain de la connexion que la file d'envoi n'est plus vide"""
+        pass
+
+    @abstractmethod
+    def _close_transport(self):
+        """Ferme le transport sous-jacent (socket ou flux asyncio)"""
+        pass
+
+
+class ThreadedClientConnection(ClientConnection):
+    """Connexion du mode threadé : un thread écrivain vide la file avec `sendall`"""
+
+    def __init__(self, sock: socket.socket, address: tuple, **kwargs):
+        super().__init__(address, **kwargs)
+        self.socket = sock
+        self._ready = threading.Condition(self._lock)
+        self._writer = threading.Thread(target=self._write_loop, name=f"writer-{address}", daemon=True)
+        self._writer.start()
+
+    def _wake_writer(self):
+        with self._ready:
+            self._ready.notify()
+
+    def _write_loop(self):
+        while True:
+            with self._ready:
+                while not self._queue and not self.closed:
+                    self._ready.wait()
+                if self.closed:
+                    return
+            batch = self._take_batch()
+            try:
+                self.socket.sendall(b''.join(batch))
+            except OSError as e:
+                print(f"❌ Erreur d'envoi au client {self.address}: {e}")
+                self.close()
+                return
+            self._batch_sent(batch)
+
+    def _close_transport(self):
+        # Débloque aussi le `recv` du thread de lecture et un `sendall` en cours
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class AsyncClientConnection(ClientConnection):
+    """Connexion du mode asyncio : une tâche de la boucle vide la file, avec `drain`"""
+
+    def __init__(self, writer: asyncio.StreamWriter, loop: asyncio.AbstractEventLoop, address: tuple, **kwargs):
+        super().__init__(address, **kwargs)
+        self.writer = writer
+        self.loop = loop
+        self._ready = asyncio.Event()
+        self._task = loop.create_task(self._write_loop())
+
+    def _wake_writer(self):
+        # `send` peut être appelé depuis n'importe quel thread (matchmaking, pool DB)
+        try:
+            self.loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # Boucle déjà fermée
+
+    async def _write_loop(self):
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._queue and not self.closed:
+                    batch = self._take_batch()
+                    self.writer.write(b''.join(batch))
+                    await self.writer.drain()
+                    self._batch_sent(batch)
+        except (ConnectionError, OSError) as e:
+            print(f"❌ Erreur d'envoi au client {self.address}: {e}")
+            self.close()
+
+    def _close_transport(self):
+        try:
+            self.loop.call_soon_threadsafe(self.writer.close)
+        except RuntimeError:
+            pass
@@ -0,0 +1,77 @@
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Directions des événements enregistrés
+IN = 'in'             # Message reçu (avec sa durée de traitement)
+OUT = 'out'           # Message mis en file d'envoi
+DROPPED = 'dropped'   # Message ignoré (file d'envoi saturée)
+
+AUTO_DUMP_INTERVAL = 10.0  # Secondes minimum entre deux vidages automatiques d'un même enregistreur
+
+
+class FlightRecorder:
+    """Enregistreur circulaire des derniers messages d'une connexion ou d'un match.
+
+    Un événement est un tuple ajouté à un `deque` borné : pas de verrou
+    (`append` est atomique), pas de copie du message, et les plus anciens
+    événements sont oubliés d'eux-mêmes.
+    """
+
+    __slots__ = ('_events', 'last_dump')
+
+    def __init__(self, capacity: int = 64):
+        self._events: deque = deque(maxlen=capacity)
+        self.last_dump = 0.0
+
+    def record(self, direction: str, msg_type, player_id: Optional[int] = None, size: Optional[int] = None,
+               duration: Optional[float] = None):
+        self._events.append((time.monotonic(), direction, msg_type, player_id, size, duration))
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def snapshot(self, now: Optional[float] = None) -> List[Dict]:
+        """Événements du plus ancien au plus récent, datés en secondes avant `now`"""
+        now = time.monotonic() if now is None else now
+        return [
+            {
+                'age': round(now - timestamp, 6),
+                'direction': direction,
+                'type': msg_type if isinstance(msg_type, str) else repr(msg_type),
+                'player_id': player_id,
+                'bytes': size,
+                'duration_ms': round(duration * 1000, 3) if duration is not None else None
+            }
+            for timestamp, direction, msg_type, player_id, size, duration in list(self._events)
+        ]
+
+    def may_auto_dump(self, now: Optional[float] = None) -> bool:
+        """Limite les vidages automatiques (un client lent ne doit pas remplir le disque)"""
+        now = time.monotonic() if now is None else now
+        if now - self.last_dump < AUTO_DUMP_INTERVAL:
+            return False
+        self.last_dump = now
+        return True
+
+
+def write_dump(directory: str, reason: str, recorders: Dict[str, FlightRecorder],
+               details: Optional[Dict] = None) -> str:
+    """Écrit les enregistreurs dans un fichier JSON daté et retourne son chemin"""
+    os.makedirs(directory, exist_ok=True)
+    now = time.monotonic()
+    dumped_at = datetime.now()
+    report = {
+        'reason': reason,
+        'dumped_at': dumped_at.isoformat(),
+        **(details or {}),
+        'recorders': {name: recorder.snapshot(now) for name, recorder in recorders.items()}
+    }
+    filename = f"flight-{dumped_at:%Y%m%d-%H%M%S-%f}-{os.getpid()}.json"
+    path = os.path.join(directory, filename)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
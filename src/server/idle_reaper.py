@@ -0,0 +1,130 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+from src.server.connection import ClientConnection
+
+
+class TimingWheel:
+    """Roue temporelle hachée des échéances d'inactivité.
+
+    Chaque connexion (ou tout objet exposant `last_seen` et `closed`, comme
+    un match) est rangée dans la case de son échéance
+    (`last_seen + timeout`, arrondie au pas `tick`). Un message reçu ne fait
+    que mettre à jour `last_seen` ; l'échéance n'est recalculée que lorsque la
+    roue atteint la case : la connexion est alors expirée, ou replacée plus
+    loin si elle a été active entre-temps. Chaque pas ne parcourt donc que sa
+    case, jamais l'ensemble des connexions.
+    """
+
+    def __init__(self, timeout: float, tick: float = 1.0, now: Optional[float] = None):
+        self.timeout = timeout
+        self.tick = tick
+        # Une échéance est au plus à `timeout` du présent : un tour de roue suffit
+        self.size = int(math.ceil(timeout / tick)) + 1
+        self._slots: List[Set[ClientConnection]] = [set() for _ in range(self.size)]
+        self._slot_of: Dict[ClientConnection, int] = {}
+        self._cursor = self._tick_of(time.monotonic() if now is None else now)  # Dernier pas traité
+        self._lock = threading.Lock()
+
+    def _tick_of(self, instant: float) -> int:
+        return int(instant // self.tick)
+
+    def _schedule(self, connection: ClientConnection):
+        """Range une connexion dans la case de son échéance (à appeler sous `_lock`)"""
+        tick = max(self._tick_of(connection.last_seen + self.timeout), self._cursor + 1)
+        slot = tick % self.size
+        self._slots[slot].add(connection)
+        self._slot_of[connection] = slot
+
+    def add(self, connection: ClientConnection):
+        """Surveille une connexion"""
+        with self._lock:
+            self._schedule(connection)
+
+    def remove(self, connection: ClientConnection):
+        """Cesse de surveiller une connexion"""
+        with self._lock:
+            slot = self._slot_of.pop(connection, None)
+            if slot is not None:
+                self._slots[slot].discard(connection)
+
+    def advance(self, now: Optional[float] = None) -> List[ClientConnection]:
+        """Traite les cases écoulées jusqu'à `now` ; retourne les connexions expirées"""
+        now = time.monotonic() if now is None else now
+        target = self._tick_of(now)
+        expired = []
+        with self._lock:
+            # Après un long retard, un seul tour de roue couvre toutes les cases
+            for tick in range(max(self._cursor + 1, target - self.size + 1), target + 1):
+                self._cursor = tick
+                slot = tick % self.size
+                due, self._slots[slot] = self._slots[slot], set()
+                for connection in due:
+                    del self._slot_of[connection]
+                    if connection.closed:
+                        continue
+                    if now - connection.last_seen >= self.timeout:
+                        expired.append(connection)
+                    else:
+                        self._schedule(connection)
+            self._cursor = max(self._cursor, target)
+        return expired
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+
+class IdleReaper:
+    """Ferme les connexions (ou termine les matchs) restées silencieuses plus de `timeout` secondes.
+
+    Un thread fait avancer la roue tous les `tick` secondes et passe chaque
+    connexion expirée à `on_expire`. Un `timeout` nul désactive la surveillance.
+    """
+
+    def __init__(self, timeout: float, tick: float, on_expire: Callable[[ClientConnection], None],
+                 name: str = "idle-reaper"):
+        self.enabled = timeout > 0
+        self.name = name
+        self.wheel = TimingWheel(timeout, tick) if self.enabled else None
+        self.tick = tick
+        self.on_expire = on_expire
+        self.expired = 0
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Démarre le thread de surveillance"""
+        if not self.enabled:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête le thread de surveillance"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def watch(self, connection: ClientConnection):
+        """Surveille une nouvelle connexion"""
+        if self.enabled:
+            self.wheel.add(connection)
+
+    def unwatch(self, connection: ClientConnection):
+        """Cesse de surveiller une connexion fermée"""
+        if self.enabled:
+            self.wheel.remove(connection)
+
+    def _run(self):
+        while not self._stop_event.wait(self.tick):
+            for connection in self.wheel.advance():
+                self.expired += 1
+                try:
+                    self.on_expire(connection)
+                except Exception as e:
+                    print(f"❌ Erreur lors de la fermeture de {connection.address}: {e}")
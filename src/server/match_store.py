@@ -0,0 +1,155 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from src.common.games import BaseGame
+from src.database.database import MatchmakingDatabase
+from src.database.write_behind import WriteBehindWriter
+from src.server.flight_recorder import FlightRecorder
+
+
+@dataclass(eq=False)  # Identité : un match vivant sert de clé dans la roue d'inactivité
+class ActiveMatch:
+    """Match en cours, tenu en mémoire pendant toute sa durée"""
+    id: int
+    game_id: int
+    game_name: str
+    player1_id: int
+    player2_id: int
+    ranked: bool
+    board_state: Dict
+    current_turn_player_id: Optional[int]
+    winner_id: Optional[int] = None
+    status: str = 'active'
+    seq: int = 0  # Numéro du dernier coup, pour les mises à jour incrémentales
+    engine: Optional[BaseGame] = field(default=None, repr=False, compare=False)  # Partage board_state['board']
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    recorder: FlightRecorder = field(default_factory=FlightRecorder, repr=False, compare=False)  # Coups et événements
+    last_seen: float = field(default_factory=time.monotonic, repr=False, compare=False)  # Dernier coup joué
+    ratings: Tuple[Tuple[str, str], ...] = ()  # Partie classée : (clé de classement, pseudo) des joueurs 1 et 2
+
+    @property
+    def closed(self) -> bool:
+        """Match terminé (la roue d'inactivité l'oublie)"""
+        return self.status != 'active'
+
+    def opponent_of(self, player_id: int) -> int:
+        """Retourne l'adversaire d'un joueur du match"""
+        return self.player2_id if player_id == self.player1_id else self.player1_id
+
+    def snapshot_board(self) -> Dict:
+        """Copie du plateau pour l'écriture en base (à appeler sous `lock`)"""
+        board = self.board_state.get('board')
+        if isinstance(board, list):
+            return dict(self.board_state, board=[list(row) for row in board])
+        return dict(self.board_state)
+
+
+class MatchStore:
+    """Matchs actifs indexés par identifiant et par (joueur, jeu).
+
+    Un coup ne touche que la mémoire ; l'état est recopié dans SQLite par
+    l'écrivain différé, périodiquement pour les matchs modifiés et
+    immédiatement à la fin d'un match.
+    """
+
+    def __init__(self, db: MatchmakingDatabase, writer: WriteBehindWriter, checkpoint_interval: float = 5.0):
+        self.db = db
+        self.writer = writer
+        self.checkpoint_interval = checkpoint_interval
+
+        self._matches: Dict[int, ActiveMatch] = {}
+        self._by_player: Dict[Tuple[int, str], ActiveMatch] = {}
+        self._dirty: Dict[int, ActiveMatch] = {}
+        self._lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Démarre le thread de sauvegarde périodique"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._checkpoint_loop, name="match-checkpoint", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête la sauvegarde périodique après une dernière sauvegarde"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.checkpoint()
+
+    def add(self, match: ActiveMatch):
+        """Enregistre un nouveau match actif"""
+        with self._lock:
+            self._matches[match.id] = match
+            self._by_player[(match.player1_id, match.game_name)] = match
+            self._by_player[(match.player2_id, match.game_name)] = match
+
+    def get(self, match_id: int) -> Optional[ActiveMatch]:
+        """Retourne un match actif par son identifiant"""
+        return self._matches.get(match_id)
+
+    def get_for_player(self, player_id: int, game_name: str) -> Optional[ActiveMatch]:
+        """Retourne le match actif d'un joueur pour un jeu donné"""
+        return self._by_player.get((player_id, game_name))
+
+    def matches_for_player(self, player_id: int) -> List[ActiveMatch]:
+        """Retourne tous les matchs actifs d'un joueur"""
+        with self._lock:
+            return [match for (pid, _), match in self._by_player.items() if pid == player_id]
+
+    def all(self) -> List[ActiveMatch]:
+        """Copie de la liste des matchs actifs"""
+        with self._lock:
+            return list(self._matches.values())
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def mark_dirty(self, match: ActiveMatch):
+        """Signale un match modifié, à sauvegarder au prochain point de contrôle"""
+        with self._lock:
+            self._dirty[match.id] = match
+
+    def complete(self, match: ActiveMatch, is_draw: bool = False):
+        """Retire un match terminé et planifie immédiatement sa sauvegarde (à appeler sous `match.lock`)"""
+        match.status = 'completed'
+        with self._lock:
+            self._matches.pop(match.id, None)
+            for player_id in (match.player1_id, match.player2_id):
+                if self._by_player.get((player_id, match.game_name)) is match:
+                    del self._by_player[(player_id, match.game_name)]
+            self._dirty.pop(match.id, None)
+        self._submit(match, is_draw)
+
+    def checkpoint(self):
+        """Planifie la sauvegarde de tous les matchs modifiés"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        for match in dirty.values():
+            with match.lock:
+                if match.status == 'active':
+                    self._submit(match)
+
+    def _submit(self, match: ActiveMatch, is_draw: bool = False):
+        """Transmet l'état courant d'un match à l'écrivain différé"""
+        self.writer.submit(
+            ('match', match.id),
+            self.db.update_match_state,
+            match.id,
+            match.snapshot_board(),
+            match.current_turn_player_id,
+            match.winner_id,
+            is_draw
+        )
+
+    def _checkpoint_loop(self):
+        """Sauvegarde périodique des matchs modifiés"""
+        while not self._stop_event.wait(self.checkpoint_interval):
+            try:
+                self.checkpoint()
+            except Exception as e:
+                print(f"❌ Erreur lors de la sauvegarde des matchs: {e}")
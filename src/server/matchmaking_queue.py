@@ -0,0 +1,320 @@
+import bisect
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+QueueKey = Tuple[str, bool]  # (nom du jeu, classée)
+
+
+@dataclass
+class QueueEntry:
+    """Joueur en attente dans une file"""
+    ticket: int
+    player_id: int
+    pseudo: str
+    game_name: str
+    ranked: bool
+    elo_rating: Optional[float] = None
+    rating_key: Optional[str] = None  # Clé du classement (compte ou session) pour les parties classées
+    joined_at: float = field(default_factory=time.monotonic)
+
+    def to_player(self) -> Dict:
+        """Format joueur attendu par create_match et _notify_match_found"""
+        return {
+            'queue_id': self.ticket,
+            'player_id': self.player_id,
+            'pseudo': self.pseudo,
+            'elo_rating': self.elo_rating,
+            'joined_at': self.joined_at
+        }
+
+
+class RatedQueue:
+    """Index des joueurs d'une file classée trié par ELO (liste ordonnée par bisect).
+
+    Le plus proche voisin en ELO d'un joueur est toujours l'un de ses deux
+    voisins dans la liste : il se trouve en O(log n), sans parcours quadratique.
+
+    Seuls les joueurs dont la situation a pu changer sont réévalués : ceux
+    qui viennent d'arriver et leurs deux voisins (dont le plus proche voisin
+    a pu changer), et ceux dont la fenêtre a atteint l'écart avec leur plus
+    proche voisin (réveils planifiés). Un départ n'éloigne que des voisins :
+    il ne rend aucun appariement possible et ne marque personne.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[float, int]] = []  # (elo, ticket), trié
+        self._entries: Dict[int, QueueEntry] = {}  # ticket -> entrée
+        self._pending: Set[int] = set()  # Tickets à réévaluer à la prochaine passe
+        self._wakeups: List[Tuple[float, int]] = []  # Tas (instant, ticket) ; entrées périmées ignorées
+        self._wake_at: Dict[int, float] = {}  # ticket -> réveil planifié en vigueur
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, entry: QueueEntry) -> bool:
+        return entry.ticket in self._entries
+
+    @staticmethod
+    def _key(entry: QueueEntry) -> Tuple[float, int]:
+        return (entry.elo_rating or 0.0, entry.ticket)
+
+    def add(self, entry: QueueEntry):
+        key = self._key(entry)
+        index = bisect.bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._entries[entry.ticket] = entry
+        # Le nouveau venu et ses deux voisins, dont il est peut-être le plus proche
+        for _, ticket in self._keys[max(0, index - 1):index + 2]:
+            self._pending.add(ticket)
+
+    def remove(self, entry: QueueEntry):
+        key = self._key(entry)
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+            del self._entries[entry.ticket]
+            self._pending.discard(entry.ticket)
+            self._wake_at.pop(entry.ticket, None)
+
+    def nearest(self, entry: QueueEntry) -> Optional[QueueEntry]:
+        """Retourne le joueur le plus proche en ELO (hors le joueur lui-même)"""
+        rating, _ = key = self._key(entry)
+        index = bisect.bisect_left(self._keys, key)
+        candidates = []
+        if index > 0:
+            candidates.append(self._keys[index - 1])
+        if index + 1 < len(self._keys):
+            candidates.append(self._keys[index + 1])
+        if not candidates:
+            return None
+        _, ticket = min(candidates, key=lambda candidate: abs(candidate[0] - rating))
+        return self._entries[ticket]
+
+    def wake_at(self, entry: QueueEntry, at: Optional[float]):
+        """Planifie la réévaluation d'un joueur non apparié (None : seulement à l'arrivée d'un voisin)"""
+        if at is None:
+            self._wake_at.pop(entry.ticket, None)
+            return
+        self._wake_at[entry.ticket] = at
+        heapq.heappush(self._wakeups, (at, entry.ticket))
+
+    def due(self, now: float) -> List[QueueEntry]:
+        """Joueurs à réévaluer, dans l'ordre d'arrivée (les plus anciens choisissent en premier)"""
+        tickets, self._pending = self._pending, set()
+        while self._wakeups and self._wakeups[0][0] <= now:
+            at, ticket = heapq.heappop(self._wakeups)
+            if self._wake_at.get(ticket) == at:
+                del self._wake_at[ticket]
+                tickets.add(ticket)
+        return [self._entries[ticket] for ticket in sorted(tickets) if ticket in self._entries]
+
+
+class QueueIndex:
+    """Files d'attente en mémoire, une par (jeu, classée).
+
+    Les files non classées sont appariées par ordre d'arrivée en O(1). Les
+    files classées sont en plus indexées par ELO : chaque joueur est apparié à
+    son plus proche voisin si l'écart tient dans une fenêtre qui s'élargit avec
+    son temps d'attente. La table `queues` n'est plus qu'une copie écrite en différé.
+    """
+
+    def __init__(self, base_window: float = 100, window_growth_per_second: float = 10,
+                 max_window: float = 800):
+        self.base_window = base_window
+        self.window_growth_per_second = window_growth_per_second
+        self.max_window = max_window
+
+        self._queues: Dict[QueueKey, 'OrderedDict[int, QueueEntry]'] = {}
+        self._rated: Dict[QueueKey, RatedQueue] = {}
+        self._by_player: Dict[int, Dict[str, QueueEntry]] = {}  # player_id -> nom du jeu -> entrée
+        self._lock = threading.Lock()
+        self._tickets = itertools.count(1)
+
+    def search_window(self, entry: QueueEntry, now: Optional[float] = None) -> float:
+        """Écart d'ELO accepté pour un joueur, selon son temps d'attente"""
+        waited = (now if now is not None else time.monotonic()) - entry.joined_at
+        return min(self.max_window, self.base_window + self.window_growth_per_second * max(0.0, waited))
+
+    def widened_at(self, entry: QueueEntry, gap: float) -> Optional[float]:
+        """Instant où la fenêtre d'un joueur atteindra `gap` (None si elle ne l'atteindra jamais)"""
+        if gap > self.max_window or self.window_growth_per_second <= 0:
+            return None
+        return entry.joined_at + max(0.0, gap - self.base_window) / self.window_growth_per_second
+
+    def add(self, player_id: int, game_name: str, ranked: bool, pseudo: str,
+            elo_rating: Optional[float] = None, rating_key: Optional[str] = None) -> Optional[QueueEntry]:
+        """Ajoute un joueur ; retourne None s'il est déjà en file pour ce jeu"""
+        with self._lock:
+            player_queues = self._by_player.setdefault(player_id, {})
+            if game_name in player_queues:
+                return None
+
+            entry = QueueEntry(
+                ticket=next(self._tickets),
+                player_id=player_id,
+                pseudo=pseudo,
+                game_name=game_name,
+                ranked=ranked,
+                elo_rating=elo_rating,
+                rating_key=rating_key
+            )
+            self._queues.setdefault((game_name, ranked), OrderedDict())[player_id] = entry
+            if ranked:
+                self._rated.setdefault((game_name, ranked), RatedQueue()).add(entry)
+            player_queues[game_name] = entry
+            return entry
+
+    def requeue(self, entry: QueueEntry) -> bool:
+        """Remet en tête de file une entrée extraite dont le match n'a pas eu lieu (ticket et attente conservés)"""
+        with self._lock:
+            player_queues = self._by_player.setdefault(entry.player_id, {})
+            if entry.game_name in player_queues:
+                return False  # Revenu en file entre-temps
+            queue = self._queues.setdefault((entry.game_name, entry.ranked), OrderedDict())
+            queue[entry.player_id] = entry
+            queue.move_to_end(entry.player_id, last=False)
+            if entry.ranked:
+                self._rated.setdefault((entry.game_name, entry.ranked), RatedQueue()).add(entry)
+            player_queues[entry.game_name] = entry
+            return True
+
+    def remove(self, player_id: int, game_name: str) -> Optional[QueueEntry]:
+        """Retire un joueur de la file d'un jeu"""
+        with self._lock:
+            return self._remove_locked(player_id, game_name)
+
+    def remove_player(self, player_id: int) -> List[QueueEntry]:
+        """Retire un joueur de toutes ses files"""
+        with self._lock:
+            game_names = list(self._by_player.get(player_id, {}))
+            return [self._remove_locked(player_id, game_name) for game_name in game_names]
+
+    def _remove_locked(self, player_id: int, game_name: str) -> Optional[QueueEntry]:
+        player_queues = self._by_player.get(player_id)
+        if not player_queues or game_name not in player_queues:
+            return None
+
+        entry = player_queues.pop(game_name)
+        if not player_queues:
+            del self._by_player[player_id]
+        self._queues[(entry.game_name, entry.ranked)].pop(player_id, None)
+        if entry.ranked:
+            self._rated[(entry.game_name, entry.ranked)].remove(entry)
+        return entry
+
+    def pop_pairs(self, game_name: str, ranked: bool, now: Optional[float] = None) -> List[Tuple[QueueEntry, QueueEntry]]:
+        """Extrait les paires de joueurs prêtes à jouer"""
+        with self._lock:
+            if ranked:
+                return self._pop_rated_pairs_locked((game_name, ranked), now)
+
+            queue = self._queues.get((game_name, ranked))
+            pairs = []
+            while queue is not None and len(queue) >= 2:
+                _, first = queue.popitem(last=False)
+                _, second = queue.popitem(last=False)
+                for entry in (first, second):
+                    self._forget_locked(entry)
+                pairs.append((first, second))
+            return pairs
+
+    def _pop_rated_pairs_locked(self, key: QueueKey, now: Optional[float]) -> List[Tuple[QueueEntry, QueueEntry]]:
+        """Appariement par ELO des seuls joueurs à réévaluer (voir RatedQueue)"""
+        queue = self._queues.get(key)
+        rated = self._rated.get(key)
+        if queue is None or rated is None:
+            return []
+
+        now = now if now is not None else time.monotonic()
+        pairs = []
+        for entry in rated.due(now):
+            if entry not in rated:
+                continue  # Déjà apparié pendant cette passe
+
+            opponent = rated.nearest(entry)
+            if opponent is None:
+                continue  # Seul en file : réévalué à l'arrivée d'un voisin
+            gap = abs((opponent.elo_rating or 0.0) - (entry.elo_rating or 0.0))
+            if gap > self.search_window(entry, now):
+                rated.wake_at(entry, self.widened_at(entry, gap))
+                continue
+
+            for matched in (entry, opponent):
+                del queue[matched.player_id]
+                rated.remove(matched)
+                self._forget_locked(matched)
+            pairs.append((entry, opponent))
+        return pairs
+
+    def drain(self, game_name: str, ranked: Optional[bool] = None) -> List[QueueEntry]:
+        """Vide la file d'un jeu (les deux files si `ranked` est None) ; retourne les joueurs retirés"""
+        with self._lock:
+            removed = []
+            for queue_ranked in ((False, True) if ranked is None else (bool(ranked),)):
+                for player_id in list(self._queues.get((game_name, queue_ranked), {})):
+                    removed.append(self._remove_locked(player_id, game_name))
+            return removed
+
+    def _forget_locked(self, entry: QueueEntry):
+        player_queues = self._by_player.get(entry.player_id)
+        if player_queues is not None:
+            player_queues.pop(entry.game_name, None)
+            if not player_queues:
+                del self._by_player[entry.player_id]
+
+    def depth(self, game_name: str, ranked: bool) -> int:
+        """Nombre de joueurs dans une file"""
+        queue = self._queues.get((game_name, ranked))
+        return len(queue) if queue else 0
+
+    def oldest(self, game_name: str, ranked: bool) -> Optional[QueueEntry]:
+        """Joueur qui attend depuis le plus longtemps dans une file"""
+        with self._lock:
+            queue = self._queues.get((game_name, ranked))
+            return next(iter(queue.values())) if queue else None
+
+    def total(self) -> int:
+        """Nombre total de joueurs en file"""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def depths(self, include: Optional[Callable[[QueueEntry], bool]] = None) -> Dict[QueueKey, int]:
+        """Profondeur de chaque file non vide, en ne comptant que les entrées retenues par `include`"""
+        with self._lock:
+            if include is None:
+                return {key: len(queue) for key, queue in self._queues.items() if queue}
+            depths = {}
+            for key, queue in self._queues.items():
+                count = sum(1 for entry in queue.values() if include(entry))
+                if count:
+                    depths[key] = count
+            return depths
+
+    def describe(self, now: Optional[float] = None) -> List[Dict]:
+        """Files non vides : profondeur et attente du plus ancien joueur"""
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'game_name': game_name,
+                    'ranked': ranked,
+                    'depth': len(queue),
+                    'oldest_wait_s': round(now - next(iter(queue.values())).joined_at, 1)
+                }
+                for (game_name, ranked), queue in self._queues.items() if queue
+            ]
+
+    def keys(self) -> List[QueueKey]:
+        """Files non vides"""
+        with self._lock:
+            return [key for key, queue in self._queues.items() if queue]
+
+    def entries(self, game_name: str, ranked: bool) -> List[QueueEntry]:
+        """Copie du contenu d'une file, dans l'ordre d'arrivée"""
+        with self._lock:
+            return list(self._queues.get((game_name, ranked), {}).values())
@@ -1,64 +1,166 @@
-﻿import socket
+import socket
 import threading
 import json
+import hmac
 import sys
 import os
+import math
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import traceback
 
 # Ajouter le chemin pour importer la database
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from src.database.database import MatchmakingDatabase
+from src.database.database import MatchmakingDatabase, thaw
+from src.database.write_behind import WriteBehindWriter
+from src.common.games import create_game
+from src.common.metrics import MetricsServer, metrics
+from src.common.tracing import tracer
+from src.common.protocol import (
+    CODECS, FrameDecoder, PreEncodedMessage, decode_message, encode_message, negotiate_codec
+)
+from src.common.ranking import PlayerStats, RankingSystem
+from src.config.settings import ServerConfig, config
+from src.server.admin import AdminServer
+from src.server.admission import AdmissionController
+from src.server.client_registry import ClientRegistry
+from src.server.connection import ClientConnection, ThreadedClientConnection
+from src.server.flight_recorder import DROPPED, IN, OUT, FlightRecorder, write_dump
+from src.server.idle_reaper import IdleReaper
+from src.server.matchmaking_queue import QueueIndex, QueueEntry
+from src.server.match_store import ActiveMatch, MatchStore
+from src.server.memory_report import AllocationTracker, MemoryReport
+from src.server.profiler import RequestProfiler, SamplingProfiler
+from src.server.ratings import load_rating, record_ranked_result
+from src.server.rate_limiter import ConnectionRateLimits, RateLimiter
+
+# Options de protocole qu'un client peut demander dans son `hello`
+SERVER_CAPABILITIES = ('delta',)
+
+# Métriques du serveur ; les histogrammes par type sont résolus d'avance (types inconnus : `other`)
+MESSAGE_TYPES = ('register', 'login', 'guest_login', 'join_queue', 'leave_queue', 'get_games',
+                 'make_move', 'get_stats', 'hello', 'resync', 'ping', 'heartbeat', 'admin', 'other')
+REQUEST_SECONDS = metrics.histogram('matchmaking_request_seconds',
+                                    "Durée de traitement des requêtes, par type de message", ('type',))
+_REQUEST_TIMERS = {msg_type: REQUEST_SECONDS.labels(msg_type) for msg_type in MESSAGE_TYPES}
+MATCHES_CREATED = metrics.counter('matchmaking_matches_created_total', "Matchs créés")
+
 
 class MatchmakingServer:
-    def __init__(self, host: str = "localhost", port: int = 8080, db_path: str = "matchmaking.db"):
+    def __init__(self, host: str = "localhost", port: int = 8080, db_path: str = "matchmaking.db",
+                 server_config: Optional[ServerConfig] = None):
         self.host = host
         self.port = port
         self.socket = None
         self.running = False
+        self.reuse_port = False  # Plusieurs processus écoutent sur le même port (mode multi-processus)
+        self.config = server_config or config.server
         
         # Base de données
         self.db = MatchmakingDatabase(db_path)
         
         # Gestion des clients connectés
-        self.clients: Dict[int, Dict] = {}  # player_id -> {socket, thread, info}
-        self.clients_lock = threading.Lock()
+        self.clients = ClientRegistry(self.config.client_registry_shards)  # player_id -> connexion
+        
+        # Fermeture des connexions silencieuses depuis plus de `timeout` secondes
+        self.idle_reaper = IdleReaper(self.config.timeout, self.config.idle_check_interval,
+                                      self._expire_idle_connection)
+        # Matchs sans coup depuis `match_inactivity_timeout` : perdus par le joueur dont c'est le tour
+        self.match_reaper = IdleReaper(self.config.match_inactivity_timeout, self.config.idle_check_interval,
+                                       self._expire_idle_match, name="match-reaper")
+        
+        # Contrôle d'admission : plafond global et par adresse des connexions simultanées
+        self.admission = AdmissionController(self.config.max_connections, self.config.max_connections_per_ip,
+                                             self.config.admission_retry_after_ms)
+        
+        # Limitation de débit des requêtes par connexion et par adresse
+        self.rate_limiter = RateLimiter(self.config.rate_limits)
+        
+        # Métriques lues à la demande et point de collecte HTTP (si `metrics_port`)
+        self.started_at: Optional[float] = None
+        self.metrics_server: Optional[MetricsServer] = None
+        self._tracing = False
+        self.flight_recorder_dumps = 0
+        
+        # Profilage à chaud, piloté par les commandes d'administration
+        self.sampling_profiler = SamplingProfiler(self.config.profile_dir)
+        self.request_profiler = RequestProfiler(self.config.profile_dir)
+        self._request_profiler_timer: Optional[threading.Timer] = None
+        self.admin_server: Optional[AdminServer] = None  # Canal d'administration local (si `admin_socket`)
+        
+        # Comptabilité mémoire des structures et suivi des allocations, à la demande
+        self.memory_report = MemoryReport()
+        self.allocation_tracker = AllocationTracker()
+        
+        # Réponse `games_list` pré-encodée, reconstruite quand le catalogue change
+        self._games_response: Optional[PreEncodedMessage] = None
+        self._games_response_catalog = None
+        
+        # Paramètres ELO ; les classements (clé : compte, ou session pour les invités) sont en base, table `ratings`
+        self.ranking = RankingSystem()
+        
+        # Files d'attente en mémoire, copiées en différé dans la table `queues`
+        self.queue_index = QueueIndex()
+        self.db_writer = WriteBehindWriter("db-writer")
+        self._init_queue_table()
+        
+        # Matchs actifs en mémoire, sauvegardés en différé dans la table `matches`
+        self.match_store = MatchStore(self.db, self.db_writer)
         
-        # Gestionnaire de matchmaking automatique
+        # Gestionnaire de matchmaking automatique (réveillé à chaque entrée en file)
         self.matchmaking_thread = None
-        self.matchmaking_interval = 2  # Vérification toutes les 2 secondes
+        self.matchmaking_interval = 2  # Passe complète de secours toutes les 2 secondes
+        self.matchmaking_event = threading.Event()
+        self._dirty_queues = set()
+        self._dirty_lock = threading.Lock()
+        
+        self._register_metrics()
+        self._register_memory_structures()
         
         print(f"Serveur de matchmaking initialisé sur {host}:{port}")
     
     def start(self):
-        """Démarre le serveur"""
+        """Démarre le serveur (mode threadé : un thread par client)"""
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
             self.socket.bind((self.host, self.port))
-            self.socket.listen(10)  # Max 10 connexions en attente
+            self.socket.listen(self.config.accept_backlog)
             
             self.running = True
             print(f"🚀 Serveur démarré et en écoute sur {self.host}:{self.port}")
             
-            # Démarrer le thread de matchmaking automatique
-            self.matchmaking_thread = threading.Thread(target=self._auto_matchmaking, daemon=True)
-            self.matchmaking_thread.start()
+            # Démarrer le matchmaking automatique et les écritures différées
+            self._start_background_tasks()
             
             # Boucle principale d'acceptation des connexions
             while self.running:
                 try:
                     client_socket, client_address = self.socket.accept()
+                    
+                    # Serveur plein : refus immédiat, sans créer de thread
+                    reason = self.admission.try_admit(client_address[0])
+                    if reason:
+                        self.admission.reject(client_socket, reason)
+                        continue
                     print(f"🔗 Nouvelle connexion de {client_address}")
                     
                     # Créer un thread pour gérer ce client
                     client_thread = threading.Thread(
                         target=self._handle_client,
                         args=(client_socket, client_address),
+                        name="client",
                         daemon=True
                     )
-                    client_thread.start()
+                    try:
+                        client_thread.start()
+                    except RuntimeError as e:
+                        print(f"❌ Impossible de créer un thread pour {client_address}: {e}")
+                        self.admission.release(client_address[0])
+                        client_socket.close()
                     
                 except socket.error as e:
                     if self.running:
@@ -70,19 +172,89 @@ class MatchmakingServer:
         finally:
             self.stop()
     
+    def _register_metrics(self):
+        """Déclare les jauges lues sur l'état du serveur à chaque collecte"""
+        metrics.gauge_callback('matchmaking_active_connections', "Connexions ouvertes",
+                               lambda: self.admission.active)
+        metrics.gauge_callback('matchmaking_connected_players', "Joueurs connectés",
+                               lambda: len(self.clients))
+        metrics.gauge_callback('matchmaking_active_matches', "Matchs en cours",
+                               lambda: len(self.match_store))
+        metrics.gauge_callback('matchmaking_queue_depth', "Joueurs en file d'attente, par jeu",
+                               self._queue_depths, ('game', 'ranked'))
+        metrics.gauge_callback('matchmaking_uptime_seconds', "Secondes depuis le démarrage",
+                               lambda: self.uptime())
+    
+    def _register_memory_structures(self):
+        """Déclare les structures du serveur mesurées par le rapport mémoire"""
+        self.memory_report.register('clients', lambda: self.clients)
+        self.memory_report.register('active_matches', self.match_store.all)
+        self.memory_report.register('queues', lambda: self.queue_index, self.queue_index.total)
+        self.memory_report.register('ranking_players', lambda: self.ranking.players)
+        self.memory_report.register('rate_limiter', lambda: self.rate_limiter,
+                                    lambda: self.rate_limiter.stats()['tracked_addresses'])
+        self.memory_report.register('admission', lambda: self.admission, lambda: self.admission.active)
+    
+    def _queue_depths(self) -> Dict[Tuple[str, str], int]:
+        """Profondeur de chaque file non vide, par (jeu, classée)"""
+        return {
+            (game_name, 'true' if ranked else 'false'): depth
+            for (game_name, ranked), depth in self.queue_index.depths().items()
+        }
+    
+    def uptime(self) -> float:
+        """Secondes écoulées depuis le démarrage (0 avant)"""
+        return time.monotonic() - self.started_at if self.started_at is not None else 0.0
+    
+    def _start_background_tasks(self):
+        """Démarre le thread de matchmaking automatique et les écritures différées"""
+        self.started_at = time.monotonic()
+        if self.config.metrics_port:
+            self.metrics_server = MetricsServer(metrics, self.config.metrics_host, self.config.metrics_port)
+            self.metrics_server.start()
+        if self.config.trace_sample_rate > 0:
+            tracer.start(self.config.trace_file, self.config.trace_sample_rate,
+                         self.config.trace_file_max_bytes, self.config.trace_file_backups)
+            self._tracing = True
+        if self.config.admin_socket:
+            self.admin_server = AdminServer(self, self.config.admin_socket)
+            self.admin_server.start()
+        self.db_writer.start()
+        self.match_store.start()
+        self.idle_reaper.start()
+        self.match_reaper.start()
+        self._start_matchmaking()
+    
+    def _start_matchmaking(self):
+        """Démarre le thread de matchmaking automatique"""
+        self.matchmaking_thread = threading.Thread(target=self._auto_matchmaking, name="matchmaking", daemon=True)
+        self.matchmaking_thread.start()
+    
+    def _init_queue_table(self):
+        """Vide la table `queues` : les entrées d'une exécution précédente sont orphelines"""
+        self.db.clear_queues()
+    
     def stop(self):
         """Arrête le serveur"""
         print("🛑 Arrêt du serveur...")
         self.running = False
+        self.matchmaking_event.set()
+        self.idle_reaper.stop()
+        self.match_reaper.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self._tracing:
+            tracer.stop()
+        if self.admin_server:
+            self.admin_server.stop()
+        self._stop_profilers()
         
         # Fermer toutes les connexions clients
-        with self.clients_lock:
-            for player_id, client_data in self.clients.items():
-                try:
-                    client_data['socket'].close()
-                except:
-                    pass
-            self.clients.clear()
+        for connection in self.clients.clear():
+            try:
+                connection.close()
+            except:
+                pass
         
         # Fermer le socket principal
         if self.socket:
@@ -91,79 +263,58 @@ class MatchmakingServer:
             except:
                 pass
         
+        # Sauvegarder les matchs et les opérations de file encore en attente
+        self.match_store.stop()
+        self.db_writer.stop()
+        
         print("✅ Serveur arrêté")
     
     def _handle_client(self, client_socket: socket.socket, client_address: tuple):
         """Gère un client connecté"""
         player_id = None
+        decoder = FrameDecoder()  # Tampon de lecture propre à la connexion
+        connection = ThreadedClientConnection(client_socket, client_address, **self._connection_settings())
+        rate_limits = self.rate_limiter.open(client_address[0])
+        self.idle_reaper.watch(connection)
         
         try:
-            while self.running:
-                # Recevoir le message
-                data = client_socket.recv(4096)
+            while self.running and not connection.closed:
+                # Recevoir les données (une lecture peut contenir plusieurs trames ou une trame partielle)
+                data = client_socket.recv(65536)
                 if not data:
                     break
+                connection.touch()
                 
-                try:
-                    message = json.loads(data.decode('utf-8'))
-                    
-                    # Traitement spécifique pour 'make_move' avec traceback complète
-                    if message.get('type') == 'make_move':
-                        try:
-                            response = self._process_message(message, client_socket, client_address)
-                        except Exception as e:
-                            print(f"❌ Erreur lors du traitement de make_move pour {client_address}:")
-                            traceback.print_exc()
-                            response = {
-                                'type': 'error',
-                                'message': f'Erreur serveur lors du coup: {str(e)}'
-                            }
-                    else:
-                        # Traitement standard pour les autres messages
-                        response = self._process_message(message, client_socket, client_address)
+                for payload in decoder.feed(data):
+                    response = self._handle_request(payload, client_socket, client_address, rate_limits, connection)
                     
                     # Si c'est une connexion réussie, enregistrer le client
-                    if response.get('type') in ['login_success', 'guest_success'] and response.get('player_id'):
+                    if response and response.get('type') in ['login_success', 'guest_success'] and response.get('player_id'):
                         player_id = response['player_id']
-                        with self.clients_lock:
-                            self.clients[player_id] = {
-                                'socket': client_socket,
-                                'thread': threading.current_thread(),
-                                'address': client_address,
-                                'last_seen': datetime.now()
-                            }
+                        self._register_client(player_id, connection)
                     
-                    # Envoyer la réponse (si elle existe et n'a pas déjà été envoyée par un handler spécifique)
+                    # Mettre la réponse en file d'envoi (l'écrivain de la connexion l'envoie)
                     if response:
-                        try:
-                            response_json = json.dumps(response)
-                            client_socket.send(response_json.encode('utf-8'))
-                        except Exception as e:
-                             print(f"❌ Erreur lors de l'envoi de la réponse au client {client_address}: {e}")
-                        
-                except json.JSONDecodeError:
-                    error_response = {
-                        'type': 'error',
-                        'message': 'Format JSON invalide'
-                    }
-                    client_socket.send(json.dumps(error_response).encode('utf-8'))
-                except Exception as e: # Gestion générique pour les erreurs non liées à 'make_move'
-                    print(f"❌ Erreur lors du traitement du message (générique) pour {client_address}: {e}")
-                    error_response = {
-                        'type': 'error',
-                        'message': 'Erreur serveur générique'
-                    }
-                    client_socket.send(json.dumps(error_response).encode('utf-8'))
+                        self._send_to_connection(connection, response)
+                    
+                    # L'accusé `hello_ack` part encore dans l'ancien codec, la suite dans le nouveau
+                    self._apply_hello_ack(response, connection)
+                    self._after_response(response)
         
         except ConnectionResetError:
             print(f"🔌 Connexion fermée par le client {client_address}")
         except Exception as e:
             print(f"❌ Erreur avec le client {client_address}: {e}")
+            self.dump_flight_recorder(connection, f"exception: {e!r}")
         finally:
             # Nettoyer lors de la déconnexion
             if player_id:
-                self._handle_client_disconnect(player_id)
+                self._handle_client_disconnect(player_id, connection)
             
+            self.idle_reaper.unwatch(connection)
+            connection.close()
+            self.rate_limiter.close(rate_limits)
+            self.admission.release(client_address[0])
             try:
                 client_socket.close()
             except:
@@ -171,10 +322,149 @@ class MatchmakingServer:
             
             print(f"👋 Client {client_address} déconnecté")
     
-    def _process_message(self, message: Dict, client_socket: socket.socket, client_address: tuple) -> Dict:
-        """Traite un message reçu d'un client"""
+    def _handle_request(self, payload: bytes, client_socket: socket.socket, client_address: tuple,
+                        rate_limits: Optional[ConnectionRateLimits] = None,
+                        connection: Optional[ClientConnection] = None) -> Optional[Dict]:
+        """Décode une trame reçue et retourne la réponse à envoyer (commun aux modes threadé et asyncio)"""
+        start = time.perf_counter()
+        try:
+            message = decode_message(payload)
+        except ValueError:  # JSON ou binaire invalide (ProtocolError, JSONDecodeError)
+            return {
+                'type': 'error',
+                'message': 'Format de message invalide'
+            }
+        if not isinstance(message, dict):  # Trame valide mais pas un objet (`[1]`, `"x"`, `3`)
+            return {
+                'type': 'error',
+                'message': 'Format de message invalide'
+            }
+        
+        response = self._handle_message(message, client_socket, client_address, rate_limits)
+        if connection is not None:
+            self._record_request(connection, message.get('type'), len(payload), time.perf_counter() - start)
+        return response
+    
+    def _record_request(self, connection: ClientConnection, msg_type, size: int, duration: float):
+        """Note la requête dans l'enregistreur de vol ; une requête trop lente déclenche un vidage"""
+        connection.recorder.record(IN, msg_type, connection.player_id, size, duration)
+        slow_ms = self.config.flight_recorder_slow_ms
+        if slow_ms and duration * 1000 >= slow_ms and connection.recorder.may_auto_dump():
+            self.dump_flight_recorder(connection, f"requête lente: {msg_type} ({duration * 1000:.0f} ms)")
+    
+    def _handle_message(self, message: Dict, client_socket: socket.socket, client_address: tuple,
+                        rate_limits: Optional[ConnectionRateLimits]) -> Optional[Dict]:
+        """Applique la limitation de débit puis traite le message"""
+        # Limitation de débit, avant tout accès à la base
         msg_type = message.get('type')
+        retry_after = self.rate_limiter.check(rate_limits, msg_type if isinstance(msg_type, str) else '')
+        if retry_after:
+            retry_after_ms = math.ceil(retry_after * 1000)
+            return {
+                'type': 'rate_limited',
+                'request_type': msg_type,
+                'retry_after_ms': retry_after_ms,
+                'message': f'Trop de requêtes, réessayez dans {retry_after_ms} ms'
+            }
         
+        # Traitement spécifique pour 'make_move' avec traceback complète
+        if message.get('type') == 'make_move':
+            try:
+                return self._process_message(message, client_socket, client_address)
+            except Exception as e:
+                print(f"❌ Erreur lors du traitement de make_move pour {client_address}:")
+                traceback.print_exc()
+                return {
+                    'type': 'error',
+                    'message': f'Erreur serveur lors du coup: {str(e)}'
+                }
+        
+        # Traitement standard pour les autres messages
+        try:
+            return self._process_message(message, client_socket, client_address)
+        except Exception as e: # Gestion générique pour les erreurs non liées à 'make_move'
+            print(f"❌ Erreur lors du traitement du message (générique) pour {client_address}: {e}")
+            return {
+                'type': 'error',
+                'message': 'Erreur serveur générique'
+            }
+    
+    def _register_client(self, player_id: int, connection: ClientConnection):
+        """Enregistre la connexion d'un client authentifié"""
+        connection.player_id = player_id
+        self.clients.register(player_id, connection)
+    
+    def _expire_idle_connection(self, connection: ClientConnection):
+        """Ferme une connexion inactive ; son gestionnaire appelle ensuite `_handle_client_disconnect`"""
+        print(f"⏱️ Client {connection.address} inactif depuis {self.config.timeout}s, déconnexion")
+        connection.close()
+    
+    def _connection_settings(self) -> Dict:
+        """Réglages des nouvelles connexions : file d'envoi et enregistreur de vol"""
+        return {
+            'high_watermark': self.config.send_queue_high_watermark,
+            'low_watermark': self.config.send_queue_low_watermark,
+            'policy': self.config.send_queue_policy,
+            'recorder_size': self.config.flight_recorder_size
+        }
+    
+    def dump_flight_recorder(self, connection: ClientConnection, reason: str) -> Optional[str]:
+        """Écrit l'enregistreur de vol d'une connexion et de ses matchs ; retourne le chemin du fichier"""
+        recorders = {'connection': connection.recorder}
+        if connection.player_id is not None:
+            for match in self.match_store.matches_for_player(connection.player_id):
+                recorders[f"match {match.id}"] = match.recorder
+        details = {'address': list(connection.address), 'player_id': connection.player_id}
+        return self._write_flight_dump(reason, recorders, details)
+    
+    def dump_flight_recorders(self, reason: str = 'à la demande') -> Optional[str]:
+        """Écrit les enregistreurs de toutes les connexions authentifiées et de tous les matchs actifs"""
+        recorders = {f"player {connection.player_id}": connection.recorder for connection in self.clients.connections()}
+        for match in self.match_store.all():
+            recorders[f"match {match.id}"] = match.recorder
+        return self._write_flight_dump(reason, recorders)
+    
+    def _write_flight_dump(self, reason: str, recorders: Dict[str, FlightRecorder],
+                           details: Optional[Dict] = None) -> Optional[str]:
+        try:
+            path = write_dump(self.config.flight_recorder_dir, reason, recorders, details)
+        except OSError as e:
+            print(f"❌ Impossible d'écrire l'enregistreur de vol: {e}")
+            return None
+        self.flight_recorder_dumps += 1
+        print(f"🛩️ Enregistreur de vol écrit dans {path} ({reason})")
+        return path
+    
+    @staticmethod
+    def _apply_hello_ack(response: Optional[Dict], connection: ClientConnection):
+        """Applique à la connexion les options acceptées dans un `hello_ack`"""
+        if not response or response.get('type') != 'hello_ack':
+            return
+        connection.options['codec'] = CODECS[response['codec']]
+        connection.options['delta'] = 'delta' in response['capabilities']
+    
+    def _process_message(self, message: Dict, client_socket: socket.socket, client_address: tuple) -> Optional[Dict]:
+        """Traite un message reçu d'un client (durée enregistrée et trace échantillonnée, par type)"""
+        msg_type = message.get('type')
+        label = msg_type if isinstance(msg_type, str) and msg_type in _REQUEST_TIMERS else 'other'
+        start = time.perf_counter()
+        with tracer.trace(label) as span:
+            span.tag('client', client_address)
+            span.tag('player_id', message.get('player_id'))
+            try:
+                if self.request_profiler.active and self.request_profiler.should_profile():
+                    response = self.request_profiler.run(label, self._dispatch_message, msg_type, message,
+                                                         client_address)
+                else:
+                    response = self._dispatch_message(msg_type, message, client_address)
+                if response:
+                    span.tag('response', response.get('type'))
+                return response
+            finally:
+                _REQUEST_TIMERS[label].observe(time.perf_counter() - start)
+    
+    def _dispatch_message(self, msg_type: str, message: Dict, client_address: tuple) -> Optional[Dict]:
+        """Appelle le gestionnaire du type de message"""
         if msg_type == 'register':
             return self._handle_register(message)
         elif msg_type == 'login':
@@ -191,14 +481,34 @@ class MatchmakingServer:
             return self._handle_make_move(message)
         elif msg_type == 'get_stats':
             return self._handle_get_stats(message)
+        elif msg_type == 'hello':
+            return self._handle_hello(message)
+        elif msg_type == 'resync':
+            return self._handle_resync(message)
         elif msg_type == 'ping':
             return {'type': 'pong', 'timestamp': datetime.now().isoformat()}
+        elif msg_type == 'heartbeat':
+            return None  # Seule la réception compte (voir `idle_reaper`)
+        elif msg_type == 'admin':
+            return self._handle_admin(message, client_address)
         else:
             return {
                 'type': 'error',
                 'message': f'Type de message inconnu: {msg_type}'
             }
     
+    def _handle_hello(self, message: Dict) -> Dict:
+        """Négocie le codec et les options de la connexion (à envoyer avant login ou guest_login)"""
+        codec = negotiate_codec(message.get('codecs'))
+        requested = message.get('capabilities') or []
+        return {
+            'type': 'hello_ack',
+            'codec': codec.name,
+            'codecs': list(CODECS),
+            'capabilities': [name for name in SERVER_CAPABILITIES if name in requested],
+            'idle_timeout': self.config.timeout
+        }
+    
     def _handle_register(self, message: Dict) -> Dict:
         """Gère l'inscription d'un nouveau compte"""
         try:
@@ -312,15 +622,37 @@ class MatchmakingServer:
                     'message': 'ID joueur et nom du jeu requis'
                 }
             
-            queue_id = self.db.add_to_queue(player_id, game_name, ranked)
+            if not self.db.get_game_by_name(game_name):
+                raise ValueError(f"Jeu '{game_name}' introuvable dans la base de données")
+            
+            player_info = self.db.get_player_info(player_id)
+            if not player_info:
+                return {
+                    'type': 'queue_error',
+                    'message': 'Joueur inconnu'
+                }
+            if self.match_store.get_for_player(player_id, game_name):
+                return {
+                    'type': 'queue_error',
+                    'message': 'Partie en cours pour ce jeu'
+                }
+            pseudo = player_info['account_display_name'] or player_info['session_pseudo']
+            
+            # En classé, l'appariement se fait par proximité d'ELO (classement relu en base à chaque entrée)
+            rating_key = elo_rating = None
+            if ranked:
+                rating_key = self._rating_key(player_info)
+                elo_rating = self._load_rating(rating_key, game_name, pseudo).elo_rating
             
-            if queue_id > 0:
-                queue_count = len(self.db.get_queue_for_game(game_name, ranked))
+            queued = self._enqueue(player_id, game_name, ranked, pseudo, elo_rating, rating_key)
+            
+            if queued:
+                ticket, queue_count = queued
                 mode = "classée" if ranked else "non classée"
                 
                 return {
                     'type': 'queue_joined',
-                    'queue_id': queue_id,
+                    'queue_id': ticket,
                     'game_name': game_name,
                     'ranked': ranked,
                     'queue_position': queue_count,
@@ -352,7 +684,7 @@ class MatchmakingServer:
             
             game = self.db.get_game_by_name(game_name)
             if game:
-                self.db.remove_from_queue(player_id, game['id'])
+                self._dequeue(player_id, game_name)
                 return {
                     'type': 'queue_left',
                     'message': f'Retiré de la file d\'attente de {game_name}'
@@ -369,14 +701,73 @@ class MatchmakingServer:
                 'message': f'Erreur lors de la sortie de file: {str(e)}'
             }
     
+    def _enqueue(self, player_id: int, game_name: str, ranked: bool, pseudo: str,
+                 elo_rating: Optional[float], rating_key: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        """Met un joueur en file ; retourne (ticket, taille de la file), ou None s'il y est déjà"""
+        entry = self.queue_index.add(player_id, game_name, ranked, pseudo, elo_rating, rating_key)
+        if entry is None:
+            return None
+        
+        # Copie différée dans la table `queues` ; l'appariement immédiat attend l'envoi de `queue_joined`
+        self.db_writer.submit(('queue', player_id, game_name), self.db.add_to_queue, player_id, game_name, ranked)
+        return entry.ticket, self.queue_index.depth(game_name, ranked)
+    
+    def _dequeue(self, player_id: int, game_name: str):
+        """Retire un joueur de la file d'un jeu"""
+        entry = self.queue_index.remove(player_id, game_name)
+        if entry:
+            self._persist_queue_removal(entry)
+    
+    def _dequeue_player(self, player_id: int):
+        """Retire un joueur de toutes ses files"""
+        for entry in self.queue_index.remove_player(player_id):
+            self._persist_queue_removal(entry)
+    
+    @staticmethod
+    def _rating_key(player_info: Dict) -> str:
+        """Clé de classement d'un joueur : son compte, ou sa session s'il est invité"""
+        if player_info['account_id']:
+            return f"account:{player_info['account_id']}"
+        return f"session:{player_info['id']}"
+    
+    def _fetch_rating(self, rating_key: str, game_name: str) -> Optional[Dict]:
+        """Ligne de la table `ratings` d'un joueur (None s'il n'a jamais joué en classé)"""
+        return self.db.get_rating(rating_key, game_name)
+    
+    def _load_rating(self, rating_key: str, game_name: str, pseudo: str) -> PlayerStats:
+        """Classement d'un joueur pour un jeu, lu en base (ELO initial s'il n'a jamais joué en classé)"""
+        ranking = RankingSystem(self.ranking.k_factor, self.ranking.initial_elo)
+        return load_rating(ranking, rating_key, pseudo, self._fetch_rating(rating_key, game_name))
+    
+    def _record_ranked_result(self, match: ActiveMatch, is_draw: bool):
+        """Met à jour l'ELO des deux joueurs d'une partie classée terminée et l'enregistre en base"""
+        winner_index = None if is_draw else (1 if match.winner_id == match.player2_id else 0)
+        record_ranked_result(self.db, self.ranking, match.game_name, match.ratings, winner_index)
+    
+    def _persist_queue_removal(self, entry: QueueEntry):
+        """Planifie la suppression d'une entrée de la table `queues`"""
+        self.db_writer.submit(
+            ('queue', entry.player_id, entry.game_name),
+            self._remove_queue_row, entry.player_id, entry.game_name
+        )
+    
+    def _remove_queue_row(self, player_id: int, game_name: str):
+        """Supprime une entrée de la table `queues` (exécuté par le thread d'écriture)"""
+        game = self.db.get_game_by_name(game_name)
+        if game:
+            self.db.remove_from_queue(player_id, game['id'])
+    
     def _handle_get_games(self) -> Dict:
         """Retourne la liste des jeux disponibles"""
         try:
-            games = self.db.get_all_games()
-            return {
-                'type': 'games_list',
-                'games': games
-            }
+            catalog = self.db.get_catalog()
+            if self._games_response_catalog is not catalog:
+                self._games_response = PreEncodedMessage({
+                    'type': 'games_list',
+                    'games': thaw(catalog.games)
+                })
+                self._games_response_catalog = catalog
+            return self._games_response
         except Exception as e:
             return {
                 'type': 'error',
@@ -387,16 +778,16 @@ class MatchmakingServer:
         """Gère un coup joué par un joueur"""
         player_id = message.get('player_id')
         game_name = message.get('game_name')
-        move_index = message.get('move')
+        move = message.get('move')
 
-        if not all([player_id, game_name, isinstance(move_index, int) and 0 <= move_index < 9]):
+        if not all([player_id, game_name]) or move is None:
             return {
                 'type': 'error',
                 'message': 'Données de coup invalides'
             }
 
-        # 1. Récupérer l'état du match
-        match = self.db.get_player_current_match(player_id, game_name)
+        # 1. Récupérer l'état du match (en mémoire)
+        match = self.match_store.get_for_player(player_id, game_name)
 
         if not match:
             return {
@@ -404,119 +795,95 @@ class MatchmakingServer:
                 'message': 'Aucune partie en cours pour ce joueur'
             }
 
-        match_id = match['id']
-        # match['board_state'] contient le dictionnaire complet du plateau (e.g. {'board': [[...]], ...})
-        board_config = match['board_state'] # Récupère le dictionnaire complet
-        board_data = board_config.get('board') # Extraire la liste de listes du plateau
-        current_turn_player_id = match['current_turn_player_id']
-        player1_id = match['player1_id']
-        player2_id = match['player2_id']
-
-        # Vérifier si c'est bien le tour du joueur
-        if player_id != current_turn_player_id:
-            return {
-                'type': 'error',
-                'message': "Ce n'est pas votre tour"
-            }
-
-        # Vérifier si board_data a le bon format pour TicTacToe (liste de listes)
-        if not isinstance(board_data, list) or len(board_data) != 3 or any(not isinstance(row, list) or len(row) != 3 for row in board_data):
-             return {
-                'type': 'error',
-                'message': 'Format de plateau invalide reçu du serveur'
-            }
-
-        # Déterminer le symbole du joueur (X ou O)
-        player_symbol_value = 1 if player_id == player1_id else 2 # 1 pour X, 2 pour O
-
-        # Convertir l'index 0-8 en (ligne, colonne)
-        row = move_index // 3
-        col = move_index % 3
-
-        # 2. Valider le coup
-        if board_data[row][col] != 0: # 0 signifie case vide
-            return {
-                'type': 'error',
-                'message': "Cette case est déjà occupée"
-            }
-
-        # 3. Appliquer le coup et mettre à jour l'état
-        board_data[row][col] = player_symbol_value
-
-        # 4. Vérifier la fin de partie (Victoire ou Nul) - Logique TicTacToe
-        winner_id = None
-        is_draw = False
+        with match.lock:
+            match.recorder.record(IN, 'make_move', player_id)
+            if match.status != 'active':
+                return {
+                    'type': 'error',
+                    'message': 'Aucune partie en cours pour ce joueur'
+                }
+            
+            match_id = match.id
+            engine = match.engine  # Son plateau est celui de match.board_state
+            player1_id = match.player1_id
+            player2_id = match.player2_id
 
-        # Vérifier les lignes
-        for r in range(3):
-            if board_data[r][0] == player_symbol_value and board_data[r][1] == player_symbol_value and board_data[r][2] == player_symbol_value:
-                winner_id = player_id
-                break
+            if engine is None:
+                return {
+                    'type': 'error',
+                    'message': f"Jeu '{game_name}' non pris en charge"
+                }
 
-        # Vérifier les colonnes
-        if winner_id is None:
-            for c in range(3):
-                if board_data[0][c] == player_symbol_value and board_data[1][c] == player_symbol_value and board_data[2][c] == player_symbol_value:
-                    winner_id = player_id
-                    break
+            # Vérifier si c'est bien le tour du joueur
+            if player_id != match.current_turn_player_id:
+                return {
+                    'type': 'error',
+                    'message': "Ce n'est pas votre tour"
+                }
 
-        # Vérifier les diagonales
-        if winner_id is None:
-            # Diagonale principale
-            if board_data[0][0] == player_symbol_value and board_data[1][1] == player_symbol_value and board_data[2][2] == player_symbol_value:
-                winner_id = player_id
-            # Diagonale secondaire
-            elif board_data[0][2] == player_symbol_value and board_data[1][1] == player_symbol_value and board_data[2][0] == player_symbol_value:
-                 winner_id = player_id
+            # 2. Valider le coup avec le moteur du jeu (1 pour le joueur 1, 2 pour le joueur 2)
+            player_number = 1 if player_id == player1_id else 2
+            engine.state.current_player = player_number
+            game_move = engine.parse_move(move)
+            if game_move is None or not engine.is_valid_move(game_move):
+                return {
+                    'type': 'error',
+                    'message': 'Coup invalide'
+                }
 
-        # Vérifier match nul
-        if winner_id is None and all(cell != 0 for row in board_data for cell in row):
-            is_draw = True
+            # 3. Appliquer le coup ; victoire et nul sont vérifiés depuis le dernier coup
+            engine.apply_move(game_move)
+            winner_id = player_id if engine.state.winner == player_number else None
+            is_draw = engine.state.is_draw
 
-        # Déterminer le prochain joueur ou terminer la partie
-        next_turn_player_id = None
-        if winner_id is None and not is_draw:
-            next_turn_player_id = player2_id if player_id == player1_id else player1_id
+            # Déterminer le prochain joueur ou terminer la partie
+            next_turn_player_id = None
+            if winner_id is None and not is_draw:
+                next_turn_player_id = player2_id if player_id == player1_id else player1_id
 
-        # 5. Mettre à jour la DB
-        # Mettre à jour le dictionnaire complet board_config avec l'état modifié du plateau
-        board_config['board'] = board_data
-        self.db.update_match_state(
-            match_id,
-            board_config, # Passer le dictionnaire complet mis à jour
-            next_turn_player_id,
-            winner_id,
-            is_draw
-        )
+            # 4. Mettre à jour l'état en mémoire ; la sauvegarde en base est différée
+            match.seq += 1
+            seq = match.seq
+            match.current_turn_player_id = next_turn_player_id
+            match.winner_id = winner_id
+            match.last_seen = time.monotonic()
+            if winner_id is not None or is_draw:
+                self._complete_match(match, is_draw)
+            else:
+                self.match_store.mark_dirty(match)
+            
+            # Copie du plateau (hors verrou pour les notifications), seulement si un joueur reçoit des instantanés
+            opponent_id = player2_id if player_id == player1_id else player1_id
+            recipients = (player_id, opponent_id)
+            board_data = None
+            if not all(self._wants_delta(pid) for pid in recipients):
+                board_data = [list(r) for r in engine.state.board]
+            row, col = engine.state.last_move
 
-        # 6. Notifier les deux joueurs
-        opponent_id = player2_id if player_id == player1_id else player1_id
+        # 5. Notifier les deux joueurs : le coup seul (delta) ou le plateau complet
+        delta = {'match_id': match_id, 'seq': seq, 'row': row, 'col': col, 'player': player_number}
         
         if winner_id is not None or is_draw:
             # Envoyer message game_over
             winner_symbol = "X" if winner_id == player1_id else ("O" if winner_id == player2_id else None)
-            game_over_message = {
-                'type': 'game_over',
-                'match_id': match_id,
-                'winner_id': winner_id,
-                'winner_symbol': winner_symbol,
-                'board': board_data # Envoyer uniquement les données du plateau dans game_over
-            }
-            self._send_to_player(player_id, game_over_message)
-            self._send_to_player(opponent_id, game_over_message)
+            result = {'winner_id': winner_id, 'winner_symbol': winner_symbol}
+            self._send_match_event(
+                recipients,
+                lambda: {'type': 'game_over', 'match_id': match_id, 'seq': seq, **result, 'board': board_data},
+                lambda: {'type': 'game_over', **delta, **result}
+            )
             
-            # TODO: Gérer la fin de partie dans la DB (stats, etc.)
+            match.recorder.record(OUT, 'game_over')
             
         else:
-            # Envoyer message game_update
-            game_update_message = {
-                'type': 'game_update',
-                'match_id': match_id,
-                'board': board_data, # Envoyer uniquement les données du plateau
-                'current_turn_player_id': next_turn_player_id
-            }
-            self._send_to_player(player_id, game_update_message)
-            self._send_to_player(opponent_id, game_update_message)
+            # Envoyer message game_update (ou game_delta)
+            self._send_match_event(
+                recipients,
+                lambda: {'type': 'game_update', 'match_id': match_id, 'seq': seq, 'board': board_data,
+                         'current_turn_player_id': next_turn_player_id},
+                lambda: {'type': 'game_delta', **delta, 'current_turn_player_id': next_turn_player_id}
+            )
+            match.recorder.record(OUT, 'game_update')
 
         # Retourner une réponse vide ou simple confirmation au joueur qui a joué
         return {
@@ -524,6 +891,228 @@ class MatchmakingServer:
             'message': 'Coup traité par le serveur'
         }
     
+    def _complete_match(self, match: ActiveMatch, is_draw: bool = False):
+        """Termine un match : il quitte la mémoire et son état final part en base (à appeler sous `match.lock`)"""
+        self.match_store.complete(match, is_draw)
+        self.match_reaper.unwatch(match)
+        if match.ranked and match.ratings:
+            # Avant les notifications : un joueur qui revient aussitôt en file lit son nouvel ELO
+            try:
+                self._record_ranked_result(match, is_draw)
+            except Exception as e:
+                print(f"❌ Erreur lors de la mise à jour du classement du match {match.id}: {e}")
+    
+    def _forfeit_match(self, match: ActiveMatch, loser_id: int, reason: str) -> bool:
+        """Termine un match au profit de l'adversaire de `loser_id` (`reason` : 'forfeit' ou 'timeout')"""
+        with match.lock:
+            if match.status != 'active':
+                return False
+            winner_id = match.opponent_of(loser_id)
+            match.seq += 1
+            seq = match.seq
+            match.current_turn_player_id = None
+            match.winner_id = winner_id
+            self._complete_match(match)
+            board_data = [list(r) for r in match.board_state['board']]
+            match.recorder.record(OUT, 'game_over')
+        
+        game_over = {
+            'type': 'game_over',
+            'match_id': match.id,
+            'seq': seq,
+            'winner_id': winner_id,
+            'winner_symbol': "X" if winner_id == match.player1_id else "O",
+            'reason': reason,
+            'board': board_data
+        }
+        for player_id in (match.player1_id, match.player2_id):
+            self._send_to_player(player_id, game_over)
+        print(f"🏳️ Match {match.id} perdu par le joueur {loser_id} ({reason})")
+        return True
+    
+    def _expire_idle_match(self, match: ActiveMatch):
+        """Match sans coup depuis trop longtemps : le joueur dont c'est le tour le perd"""
+        loser_id = match.current_turn_player_id
+        if loser_id is not None:
+            self._forfeit_match(match, loser_id, 'timeout')
+    
+    def _handle_admin(self, message: Dict, client_address: tuple) -> Dict:
+        """Exécute une commande d'administration si le jeton est valide"""
+        token = self.config.admin_token
+        provided = message.get('token')
+        if not token or not isinstance(provided, str) or not hmac.compare_digest(provided.encode(), token.encode()):
+            print(f"🚫 Commande d'administration refusée pour {client_address}")
+            return {
+                'type': 'error',
+                'message': "Commande d'administration non autorisée"
+            }
+        return self.handle_admin_command(message.get('command'), message)
+    
+    def handle_admin_command(self, command: str, params: Dict) -> Dict:
+        """Commandes d'administration (état, actions, profilage, mémoire) ; l'appelant est déjà authentifié"""
+        max_duration = self.config.profile_max_duration
+        try:
+            if command == 'players':
+                result = {'players': self._admin_players()}
+            elif command == 'queues':
+                result = {'queues': self._admin_queues()}
+            elif command == 'matches':
+                result = {'matches': self._admin_matches()}
+            elif command == 'pool':
+                result = {'pool': self.db.get_pool_stats(), 'write_behind': self.db_writer.stats()}
+            elif command == 'stats':
+                result = self.get_server_stats()
+            elif command == 'kick':
+                result = {'kicked': self.kick_player(int(params['player_id']))}
+            elif command == 'drain_queue':
+                result = {'removed': self.drain_queue(params['game_name'], params.get('ranked'))}
+            elif command == 'matchmaking_pass':
+                result = {'matches_started': self._run_matchmaking_pass()}
+            elif command == 'profile_start':
+                duration = min(float(params.get('duration', 30)), max_duration)
+                interval = max(float(params.get('interval', 0.01)), 0.001)
+                result = {'path': self.sampling_profiler.start(duration, interval), 'duration': duration}
+            elif command == 'profile_stop':
+                result = {'path': self.sampling_profiler.stop(), **self.sampling_profiler.status()}
+            elif command == 'profile_requests':
+                every = int(params.get('every', 100))
+                duration = min(float(params.get('duration', 60)), max_duration)
+                self._start_request_profiler(every, duration)
+                result = {'every': self.request_profiler.every, 'duration': duration}
+            elif command == 'profile_requests_stop':
+                result = {'paths': self._stop_request_profiler()}
+            elif command == 'profile_status':
+                result = {'sampling': self.sampling_profiler.status(), 'requests': self.request_profiler.status()}
+            elif command == 'flight_dump':
+                result = {'path': self.dump_flight_recorders(params.get('reason') or 'commande admin')}
+            elif command == 'memory_report':
+                result = {**self.memory_report.report(int(params.get('top_types', 15))),
+                          'allocations': self.allocation_tracker.status()}
+            elif command == 'memory_trace_start':
+                self.allocation_tracker.start(min(max(int(params.get('frames', 1)), 1), 25))
+                result = self.allocation_tracker.status()
+            elif command == 'memory_trace_diff':
+                result = {'top': self.allocation_tracker.diff(int(params.get('limit', 20)),
+                                                              params.get('group_by', 'lineno'))}
+            elif command == 'memory_trace_stop':
+                self.allocation_tracker.stop()
+                result = self.allocation_tracker.status()
+            else:
+                return {
+                    'type': 'error',
+                    'message': f"Commande d'administration inconnue: {command}"
+                }
+        except KeyError as e:
+            return {
+                'type': 'error',
+                'message': f'Paramètre {e} requis pour la commande {command}'
+            }
+        except (OSError, RuntimeError, TypeError, ValueError) as e:
+            return {
+                'type': 'error',
+                'message': f'Commande {command} impossible: {e}'
+            }
+        return {'type': 'admin_result', 'command': command, **result}
+    
+    def _admin_players(self) -> List[Dict]:
+        """Joueurs connectés, du plus récemment actif au moins actif"""
+        now = time.monotonic()
+        players = [
+            {
+                'player_id': connection.player_id,
+                'address': list(connection.address),
+                'last_seen_s': round(now - connection.last_seen, 1),
+                'codec': connection.options['codec'].name,
+                'pending_bytes': connection.pending_bytes(),
+                'congested': connection.congested
+            }
+            for connection in self.clients.connections()
+        ]
+        return sorted(players, key=lambda player: player['last_seen_s'])
+    
+    def _admin_queues(self) -> List[Dict]:
+        """Files non vides : profondeur et attente du plus ancien joueur"""
+        return self.queue_index.describe()
+    
+    def _admin_matches(self) -> List[Dict]:
+        """Matchs en cours"""
+        return [
+            {
+                'match_id': match.id,
+                'game_name': match.game_name,
+                'ranked': match.ranked,
+                'players': [match.player1_id, match.player2_id],
+                'current_turn_player_id': match.current_turn_player_id,
+                'moves': match.seq
+            }
+            for match in self.match_store.all()
+        ]
+    
+    def kick_player(self, player_id: int) -> bool:
+        """Ferme la connexion d'un joueur ; son gestionnaire fait ensuite le ménage habituel"""
+        connection = self.clients.get(player_id)
+        if connection is None:
+            return False
+        print(f"👢 Déconnexion du joueur {player_id} demandée par l'administrateur")
+        connection.close()
+        return True
+    
+    def drain_queue(self, game_name: str, ranked: Optional[bool] = None) -> int:
+        """Vide la file d'un jeu (les deux files si `ranked` est None) et prévient les joueurs retirés"""
+        removed = self.queue_index.drain(game_name, ranked)
+        for entry in removed:
+            self._persist_queue_removal(entry)
+            self._send_to_player(entry.player_id, {
+                'type': 'queue_left',
+                'message': f"File d'attente de {game_name} vidée par l'administrateur"
+            })
+        print(f"🧹 File {game_name} vidée par l'administrateur ({len(removed)} joueur(s))")
+        return len(removed)
+    
+    def _start_request_profiler(self, every: int, duration: float):
+        """Profile une requête sur `every` pendant `duration` secondes, puis écrit les profils"""
+        if self._request_profiler_timer:
+            self._request_profiler_timer.cancel()
+        self.request_profiler.start(every)
+        self._request_profiler_timer = threading.Timer(duration, self._stop_request_profiler)
+        self._request_profiler_timer.daemon = True
+        self._request_profiler_timer.start()
+    
+    def _stop_request_profiler(self) -> List[str]:
+        if self._request_profiler_timer:
+            self._request_profiler_timer.cancel()
+            self._request_profiler_timer = None
+        return self.request_profiler.stop()
+    
+    def _stop_profilers(self):
+        """Arrête les profilages en cours (leurs fichiers sont écrits) et le suivi des allocations"""
+        self.sampling_profiler.stop()
+        if self.request_profiler.active:
+            self._stop_request_profiler()
+        self.allocation_tracker.stop()
+    
+    def _handle_resync(self, message: Dict) -> Dict:
+        """Renvoie un instantané complet du match (le client a détecté un trou dans les séquences)"""
+        player_id = message.get('player_id')
+        game_name = message.get('game_name')
+        match = self.match_store.get_for_player(player_id, game_name) if player_id and game_name else None
+        
+        if match is None:
+            return {
+                'type': 'error',
+                'message': 'Aucune partie en cours pour ce joueur'
+            }
+        
+        with match.lock:
+            match.recorder.record(IN, 'resync', player_id)
+            return {
+                'type': 'game_update',
+                'match_id': match.id,
+                'seq': match.seq,
+                'board': [list(r) for r in match.board_state['board']],
+                'current_turn_player_id': match.current_turn_player_id
+            }
+    
     def _handle_get_stats(self, message: Dict) -> Dict:
         """Retourne les statistiques d'un joueur"""
         try:
@@ -558,40 +1147,90 @@ class MatchmakingServer:
                 'message': f'Erreur lors de la récupération des stats: {str(e)}'
             }
     
+    def _after_response(self, response: Optional[Dict]):
+        """Suite d'une réponse mise en file d'envoi : l'appariement immédiat d'une entrée en file.
+
+        Déclenché seulement ici, `match_found` ne peut pas précéder le
+        `queue_joined` du joueur qui vient d'entrer. Il peut encore le
+        précéder si une autre passe (entrée d'un autre joueur, passe
+        périodique, autre nœud) l'apparie entre-temps : les clients acceptent
+        les deux ordres.
+        """
+        if response and response.get('type') == 'queue_joined':
+            self._request_matchmaking(response['game_name'], response['ranked'])
+    
+    def _request_matchmaking(self, game_name: str, ranked: bool):
+        """Signale au thread de matchmaking qu'une file a changé"""
+        with self._dirty_lock:
+            self._dirty_queues.add((game_name, ranked))
+        self.matchmaking_event.set()
+    
     def _auto_matchmaking(self):
         """Thread de matchmaking automatique"""
         print("🤖 Matchmaking automatique démarré")
         
         while self.running:
             try:
-                # Récupérer tous les jeux
-                games = self.db.get_all_games()
+                # Réveil immédiat à chaque entrée en file, passe complète à défaut
+                notified = self.matchmaking_event.wait(self.matchmaking_interval)
+                self.matchmaking_event.clear()
+                if not self.running:
+                    break
                 
-                for game in games:
-                    # Vérifier les files classées et non classées
-                    for ranked in [True, False]:
-                        match_found = self.db.find_match_in_queue(game['name'], ranked)
-                        
-                        if match_found:
-                            player1, player2 = match_found
-                            
-                            # Créer le match
-                            match_id = self.db.create_match(game['name'], player1, player2, ranked)
-                            
-                            # Retirer les joueurs de la file
-                            game_info = self.db.get_game_by_name(game['name'])
-                            self.db.remove_from_queue(player1['player_id'], game_info['id'])
-                            self.db.remove_from_queue(player2['player_id'], game_info['id'])
-                            
-                            # Notifier les joueurs
-                            self._notify_match_found(match_id, player1, player2, game, ranked)
+                with self._dirty_lock:
+                    dirty, self._dirty_queues = self._dirty_queues, set()
                 
-                # Attendre avant la prochaine vérification
-                threading.Event().wait(self.matchmaking_interval)
+                self._run_matchmaking_pass(dirty if notified else None)
                 
             except Exception as e:
                 print(f"❌ Erreur dans le matchmaking automatique: {e}")
-                threading.Event().wait(self.matchmaking_interval)
+    
+    def _run_matchmaking_pass(self, queue_keys=None) -> int:
+        """Apparie les joueurs des files indiquées (toutes les files non vides par défaut) ; retourne le nombre de matchs créés"""
+        if queue_keys is None:
+            queue_keys = self.queue_index.keys()
+        
+        started = 0
+        for game_name, ranked in queue_keys:
+            for entry1, entry2 in self.queue_index.pop_pairs(game_name, ranked):
+                try:
+                    self._start_match(game_name, ranked, entry1, entry2)
+                    started += 1
+                except Exception as e:
+                    print(f"❌ Erreur lors de la création du match {entry1.pseudo} vs {entry2.pseudo}: {e}")
+        return started
+    
+    def _start_match(self, game_name: str, ranked: bool, entry1: QueueEntry, entry2: QueueEntry):
+        """Crée le match de deux joueurs sortis de la file et les notifie"""
+        game = self.db.get_game_by_name(game_name)
+        player1, player2 = entry1.to_player(), entry2.to_player()
+        
+        # Créer le match (en base pour obtenir son identifiant, puis en mémoire)
+        match_id = self.db.create_match(game_name, player1, player2, ranked)
+        MATCHES_CREATED.inc()
+        board_config = json.loads(self.db.get_catalog().initial_board_json[game_name])
+        match = ActiveMatch(
+            id=match_id,
+            game_id=game['id'],
+            game_name=game_name,
+            player1_id=player1['player_id'],
+            player2_id=player2['player_id'],
+            ranked=ranked,
+            board_state=board_config,
+            current_turn_player_id=player1['player_id'],  # Player 1 commence
+            engine=create_game(game_name, board_config),  # Moteur vivant pendant tout le match
+            ratings=((entry1.rating_key, entry1.pseudo), (entry2.rating_key, entry2.pseudo)) if ranked else (),
+            recorder=FlightRecorder(self.config.flight_recorder_size)
+        )
+        self.match_store.add(match)
+        self.match_reaper.watch(match)
+        
+        # Retirer les joueurs de la table des files (écriture différée)
+        self._persist_queue_removal(entry1)
+        self._persist_queue_removal(entry2)
+        
+        # Notifier les joueurs
+        self._notify_match_found(match_id, player1, player2, game, ranked)
     
     def _notify_match_found(self, match_id: int, player1: Dict, player2: Dict, game: Dict, ranked: bool):
         """Notifie les joueurs qu'un match a été trouvé"""
@@ -606,7 +1245,8 @@ class MatchmakingServer:
                 'elo_rating': player2['elo_rating'] if ranked else None
             },
             'your_turn': True,  # Joueur 1 commence
-            'board': json.dumps(game['initial_board_config'])
+            'board': self.db.get_catalog().initial_board_json[game['name']],
+            'seq': 0  # Les mises à jour incrémentales partent de cet instantané
         }
         
         # Notification pour joueur 1
@@ -622,7 +1262,8 @@ class MatchmakingServer:
         initial_game_update = {
             'type': 'game_update',
             'match_id': match_id,
-            'board': game['initial_board_config']['board'], # Envoyer le plateau extrait
+            'seq': 0,
+            'board': thaw(game['initial_board_config']['board']), # Envoyer le plateau extrait
             'current_turn_player_id': player1['player_id'] # C'est le tour du joueur 1
         }
         self._send_to_player(player1['player_id'], initial_game_update)
@@ -631,27 +1272,53 @@ class MatchmakingServer:
         print(f"🎮 Match {mode} créé: {player1['pseudo']} vs {player2['pseudo']} ({game['display_name']})")
     
     def _send_to_player(self, player_id: int, message: Dict):
-        """Envoie un message à un joueur spécifique"""
-        with self.clients_lock:
-            if player_id in self.clients:
-                try:
-                    client_socket = self.clients[player_id]['socket']
-                    message_json = json.dumps(message)
-                    client_socket.send(message_json.encode('utf-8'))
-                except Exception as e:
-                    print(f"❌ Erreur envoi message au joueur {player_id}: {e}")
+        """Met un message en file d'envoi pour un joueur (sans attendre l'écriture)"""
+        connection = self.clients.get(player_id)
+        if connection is None:
+            return
+        try:
+            with tracer.span('send') as span:
+                span.tag('player_id', player_id)
+                span.tag('message', message.get('type'))
+                self._send_to_connection(connection, message)
+        except Exception as e:
+            print(f"❌ Erreur envoi message au joueur {player_id}: {e}")
     
-    def _handle_client_disconnect(self, player_id: int):
+    @staticmethod
+    def _send_to_connection(connection: ClientConnection, message: Dict) -> bool:
+        """Encode un message dans le codec de la connexion, le met en file et le note dans l'enregistreur"""
+        data = encode_message(message, connection.options['codec'])
+        accepted = connection.send(data)
+        connection.recorder.record(OUT if accepted else DROPPED, message.get('type'), connection.player_id, len(data))
+        return accepted
+    
+    def _wants_delta(self, player_id: int) -> bool:
+        """Vérifie si un joueur a négocié les mises à jour incrémentales"""
+        connection = self.clients.get(player_id)
+        return bool(connection and connection.options['delta'])
+    
+    def _send_match_event(self, player_ids, build_snapshot, build_delta):
+        """Envoie à chaque joueur la version delta ou complète d'un événement de match (construites une fois)"""
+        messages = {}
+        for player_id in player_ids:
+            wants_delta = self._wants_delta(player_id)
+            if wants_delta not in messages:
+                messages[wants_delta] = build_delta() if wants_delta else build_snapshot()
+            self._send_to_player(player_id, messages[wants_delta])
+    
+    def _handle_client_disconnect(self, player_id: int, connection: Optional[ClientConnection] = None):
         """Gère la déconnexion d'un client"""
-        with self.clients_lock:
-            if player_id in self.clients:
-                del self.clients[player_id]
+        # Ne pas retirer une connexion plus récente du même joueur
+        self.clients.unregister(player_id, connection)
+        
+        # Un joueur parti perd ses matchs en cours (sauf s'il s'est reconnecté entre-temps)
+        if player_id not in self.clients:
+            for match in self.match_store.matches_for_player(player_id):
+                self._forfeit_match(match, player_id, 'forfeit')
         
         # Retirer de toutes les files d'attente
         try:
-            games = self.db.get_all_games()
-            for game in games:
-                self.db.remove_from_queue(player_id, game['id'])
+            self._dequeue_player(player_id)
         except Exception as e:
             print(f"❌ Erreur lors du nettoyage pour le joueur {player_id}: {e}")
         
@@ -659,51 +1326,124 @@ class MatchmakingServer:
     
     def get_server_stats(self) -> Dict:
         """Retourne les statistiques du serveur"""
-        with self.clients_lock:
-            connected_players = len(self.clients)
-        
-        # Compter les files d'attente
-        total_in_queue = 0
-        games = self.db.get_all_games()
-        for game in games:
-            for ranked in [True, False]:
-                total_in_queue += len(self.db.get_queue_for_game(game['name'], ranked))
+        connections = self.clients.connections()
         
+        # Lu en mémoire (registre, files, catalogue) : aucune requête sur les tables
         return {
-            'connected_players': connected_players,
-            'players_in_queue': total_in_queue,
-            'available_games': len(games),
-            'server_uptime': 'TODO',  # À implémenter
+            'connected_players': len(connections),
+            'players_in_queue': self.queue_index.total(),
+            'active_matches': len(self.match_store),
+            'available_games': len(self.db.get_catalog().games),
+            'send_queues': self._send_queue_stats(connections),
+            'idle_disconnections': self.idle_reaper.expired,
+            'admission': self.admission.stats(),
+            'rate_limits': self.rate_limiter.stats(),
+            'flight_recorder_dumps': self.flight_recorder_dumps,
+            'server_uptime': round(self.uptime(), 1),  # Secondes
+        }
+    
+    @staticmethod
+    def _send_queue_stats(connections: List[ClientConnection]) -> Dict:
+        """Agrège la profondeur des files d'envoi des connexions"""
+        pending = [connection.pending_bytes() for connection in connections]
+        return {
+            'pending_bytes': sum(pending),
+            'max_pending_bytes': max(pending, default=0),
+            'congested_clients': sum(1 for connection in connections if connection.congested),
+            'dropped_messages': sum(connection.dropped_messages for connection in connections)
         }
 
 
 def main():
     """Point d'entrée principal du serveur"""
+    import argparse
     import signal
     
+    parser = argparse.ArgumentParser(description="Serveur de matchmaking")
+    parser.add_argument('--mode', choices=['asyncio', 'threaded'], default='asyncio',
+                        help="Mode de service : boucles asyncio (défaut) ou un thread par client")
+    parser.add_argument('--loops', type=int, default=None,
+                        help="Nombre de boucles asyncio (défaut : nombre de cœurs, 1 par worker)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Nombre de processus workers sur le même port (0 : un seul processus)")
+    parser.add_argument('--cluster', metavar='ADRESSE', default=None,
+                        help="Rejoint le coordinateur du cluster ('hôte:port' ou 'unix:/chemin')")
+    parser.add_argument('--serve-coordinator', metavar='ADRESSE', default=None,
+                        help="Lance uniquement le coordinateur du cluster sur cette adresse")
+    parser.add_argument('--node-name', default=None,
+                        help="Nom du nœud dans le cluster (défaut : nom de la machine)")
+    parser.add_argument('--node-index', type=int, default=0,
+                        help="Index du nœud : plage d'identifiants réservée dans sa base")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="Expose les métriques Prometheus sur ce port (workers : port + index)")
+    parser.add_argument('--trace-sample', type=float, default=None, metavar='PROPORTION',
+                        help="Trace cette proportion des requêtes (ex. 0.01) vers config.server.trace_file")
+    parser.add_argument('--admin-socket', metavar='CHEMIN', default=None,
+                        help="Ouvre le canal d'administration local sur ce socket Unix (workers : un par worker)")
+    args = parser.parse_args()
+    
     # Configuration
     HOST = "localhost"  # Modifier pour "0.0.0.0" pour accepter connexions externes
     PORT = 8080
     DB_PATH = "matchmaking.db"
+    if args.metrics_port is not None:
+        config.server.metrics_port = args.metrics_port
+    if args.trace_sample is not None:
+        config.server.trace_sample_rate = args.trace_sample
+    if args.admin_socket is not None:
+        config.server.admin_socket = args.admin_socket
+    
+    if args.workers > 0:
+        from src.server.prefork import PreforkMatchmakingServer, prefork_supported
+        if not prefork_supported():
+            print("⚠️ SO_REUSEPORT ou sockets Unix indisponibles, démarrage en un seul processus")
+            args.workers = 0
     
-    server = MatchmakingServer(HOST, PORT, DB_PATH)
+    node = None  # Nœud de cluster lancé seul, s'il y en a un
+    if args.serve_coordinator:
+        from src.server.cluster import QueueCoordinator, SocketTransport
+        runner = QueueCoordinator(DB_PATH, SocketTransport(args.serve_coordinator))
+    elif args.workers > 0:
+        runner = PreforkMatchmakingServer(HOST, PORT, DB_PATH, workers=args.workers, mode=args.mode, loops=args.loops,
+                                          coordinator_address=args.cluster, node_name=args.node_name,
+                                          node_index=args.node_index)
+    else:
+        if args.cluster:
+            from src.server.cluster import ClusterMatchmakingServer, SocketTransport
+            server = ClusterMatchmakingServer(args.node_name or socket.gethostname(), SocketTransport(args.cluster),
+                                              HOST, PORT, DB_PATH, node_index=args.node_index)
+        else:
+            server = MatchmakingServer(HOST, PORT, DB_PATH)
+        if args.mode == 'asyncio':
+            from src.server.async_server import AsyncMatchmakingServer
+            runner = AsyncMatchmakingServer(server, loops=args.loops)
+        else:
+            runner = server
+        if args.cluster:
+            node = server
+            node.on_coordinator_lost = runner.stop  # Arrêt propre si le coordinateur disparaît
     
     # Gestion propre de l'arrêt avec Ctrl+C
     def signal_handler(sig, frame):
         print("\n🛑 Arrêt demandé...")
-        server.stop()
+        runner.stop()
         sys.exit(0)
     
     signal.signal(signal.SIGINT, signal_handler)
     
     try:
-        server.start()
+        if args.serve_coordinator:
+            runner.serve_forever()
+        else:
+            runner.start()
     except KeyboardInterrupt:
         print("\n🛑 Arrêt par l'utilisateur")
-        server.stop()
+        runner.stop()
     except Exception as e:
         print(f"❌ Erreur fatale: {e}")
-        server.stop()
+        runner.stop()
+    if node is not None and node.coordinator_lost:
+        sys.exit(1)  # Nœud arrêté faute de coordinateur : au superviseur de le relancer
 
 
 if __name__ == "__main__":
@@ -0,0 +1,153 @@
+import asyncio
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+import types
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Objets partagés par tout le processus (ou menant à tout le processus) : on ne les suit pas
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+                 types.CodeType, types.FrameType, threading.Thread, asyncio.AbstractEventLoop)
+
+MAX_OBJECTS = 1_000_000  # Plafond du parcours d'une structure (le rapport l'indique comme tronqué)
+
+
+def deep_sizeof(root, max_objects: int = MAX_OBJECTS) -> Tuple[int, int, bool]:
+    """Taille en octets de `root` et de tout ce qu'il référence, chaque objet compté une fois.
+
+    Retourne (octets, objets parcourus, tronqué). Le parcours passe par
+    `gc.get_referents` (conteneurs, `__dict__`, `__slots__`) mais ne suit ni
+    les classes, ni les modules, ni les fonctions et méthodes liées, ni les
+    threads et boucles asyncio : une référence vers le serveur ne fait pas
+    compter tout le processus.
+    """
+    seen = {id(root)}
+    pending = [root]
+    size = 0
+    while pending:
+        if len(seen) > max_objects:
+            return size, len(seen), True
+        obj = pending.pop()
+        size += sys.getsizeof(obj, 0)
+        for child in gc.get_referents(obj):
+            if id(child) not in seen and not isinstance(child, _SHARED_TYPES):
+                seen.add(id(child))
+                pending.append(child)
+    return size, len(seen), False
+
+
+def _rss_bytes() -> Optional[int]:
+    """Mémoire résidente du processus (Linux), None ailleurs"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryReport:
+    """Comptabilité mémoire des structures d'un serveur.
+
+    Chaque structure est enregistrée sous un nom avec une fonction qui la
+    retourne et une fonction qui compte ses éléments ; le rapport est
+    calculé à la demande (rien n'est mesuré entre deux rapports). Les
+    tailles sont indépendantes : un objet référencé par deux structures
+    compte dans les deux.
+    """
+
+    def __init__(self):
+        self._structures: Dict[str, Tuple[Callable, Callable]] = {}
+
+    def register(self, name: str, root: Callable, count: Optional[Callable] = None):
+        """`root()` : objet à mesurer ; `count()` : nombre d'éléments (par défaut `len(root())`)"""
+        self._structures[name] = (root, count or (lambda: len(root())))
+
+    def structures(self, max_objects: int = MAX_OBJECTS) -> Dict[str, Dict]:
+        report = {}
+        for name, (root, count) in self._structures.items():
+            size, objects, truncated = deep_sizeof(root(), max_objects)
+            report[name] = {'count': count(), 'bytes': size, 'objects': objects}
+            if truncated:
+                report[name]['truncated'] = True
+        return report
+
+    def report(self, top_types: int = 15, max_objects: int = MAX_OBJECTS) -> Dict:
+        """Structures enregistrées, types d'objets les plus nombreux et état du ramasse-miettes"""
+        type_counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+        return {
+            'structures': self.structures(max_objects),
+            'top_types': [[name, count] for name, count in type_counts.most_common(top_types)],
+            'gc_objects': sum(type_counts.values()),
+            'gc_counts': list(gc.get_count()),
+            'rss_bytes': _rss_bytes()
+        }
+
+
+class AllocationTracker:
+    """Différences d'allocations entre deux instantanés tracemalloc.
+
+    `start` active tracemalloc et prend l'instantané de référence ; chaque
+    `diff` compare l'état courant au dernier instantané, qui devient la
+    nouvelle référence. tracemalloc ralentit les allocations : à n'activer
+    que le temps de l'enquête.
+    """
+
+    def __init__(self):
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_here = False
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self._baseline is not None
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+
+    def start(self, frames: int = 1):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._started_here = True
+            self._baseline = self._snapshot()
+        print(f"🧮 Suivi des allocations actif ({tracemalloc.get_traceback_limit()} cadre(s) par allocation)")
+
+    def diff(self, limit: int = 20, group_by: str = 'lineno') -> List[Dict]:
+        """Allocations ayant le plus varié depuis l'instantané précédent"""
+        with self._lock:
+            if self._baseline is None:
+                raise RuntimeError("Suivi des allocations inactif")
+            snapshot = self._snapshot()
+            stats = snapshot.compare_to(self._baseline, group_by)
+            self._baseline = snapshot
+        return [
+            {
+                'where': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                'size_diff': stat.size_diff,
+                'count_diff': stat.count_diff,
+                'size': stat.size,
+                'count': stat.count
+            }
+            for stat in stats[:limit]
+        ]
+
+    def stop(self):
+        with self._lock:
+            self._baseline = None
+            if self._started_here:
+                tracemalloc.stop()
+                self._started_here = False
+
+    def status(self) -> Dict:
+        if not tracemalloc.is_tracing():
+            return {'active': self.active}
+        current, peak = tracemalloc.get_traced_memory()
+        return {'active': self.active, 'traced_bytes': current, 'traced_peak_bytes': peak}
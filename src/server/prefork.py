@@ -0,0 +1,128 @@
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+from dataclasses import replace
+from typing import List, Optional
+
+from src.config.settings import ServerConfig, config
+from src.server.async_server import AsyncMatchmakingServer
+from src.server.cluster import ClusterMatchmakingServer, QueueCoordinator, SocketTransport
+
+
+def prefork_supported() -> bool:
+    """Vérifie que la plateforme offre SO_REUSEPORT et les sockets Unix"""
+    return hasattr(socket, 'SO_REUSEPORT') and hasattr(socket, 'AF_UNIX')
+
+
+def run_worker(node_name: str, host: str, port: int, db_path: str, coordinator_address: str,
+               mode: str = 'asyncio', loops: Optional[int] = None, node_index: int = 0,
+               server_config: Optional[ServerConfig] = None):
+    """Point d'entrée d'un processus worker (un nœud du cluster)"""
+    server = ClusterMatchmakingServer(node_name, SocketTransport(coordinator_address), host, port, db_path,
+                                      node_index=node_index, server_config=server_config)
+    server.reuse_port = True
+    runner = AsyncMatchmakingServer(server, loops=loops or 1) if mode == 'asyncio' else server
+    server.on_coordinator_lost = runner.stop
+
+    def handle_signal(sig, frame):
+        runner.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    runner.start()
+    if server.coordinator_lost:
+        sys.exit(1)
+
+
+def _worker_config(server_config: ServerConfig, node_name: str, index: int) -> ServerConfig:
+    """Configuration d'un worker : port de métriques, fichier de traces et socket d'administration qui lui sont propres"""
+    root, extension = os.path.splitext(server_config.trace_file)
+    admin_socket = server_config.admin_socket
+    if admin_socket:
+        admin_root, admin_extension = os.path.splitext(admin_socket)
+        admin_socket = f"{admin_root}-{node_name}{admin_extension}"
+    return replace(
+        server_config,
+        metrics_port=server_config.metrics_port + index if server_config.metrics_port else 0,
+        trace_file=f"{root}-{node_name}{extension}",  # La rotation n'est pas sûre entre processus
+        admin_socket=admin_socket
+    )
+
+
+class PreforkMatchmakingServer:
+    """Mode multi-processus : N workers sur le même port, chacun nœud du cluster.
+
+    Chaque worker est un processus avec son propre GIL qui accepte ses
+    connexions via SO_REUSEPORT (le noyau répartit les clients). Sans
+    coordinateur distant, le processus courant devient le coordinateur des
+    files d'attente, joint par un socket Unix.
+    """
+
+    def __init__(self, host: str, port: int, db_path: str, workers: Optional[int] = None,
+                 mode: str = 'asyncio', loops: Optional[int] = None, coordinator_address: Optional[str] = None,
+                 node_name: Optional[str] = None, node_index: int = 0, server_config: Optional[ServerConfig] = None):
+        self.host = host
+        self.port = port
+        self.db_path = db_path
+        self.worker_count = workers or os.cpu_count() or 1
+        self.mode = mode
+        self.loops = loops
+        self.node_name = node_name or socket.gethostname()
+        self.node_index = node_index
+        # Transmise aux workers : en `spawn`, ils rechargeraient sinon la configuration par défaut
+        self.server_config = server_config or config.server
+
+        self._ipc_dir = None
+        self.coordinator: Optional[QueueCoordinator] = None
+        if coordinator_address is None:
+            self._ipc_dir = tempfile.mkdtemp(prefix='matchmaking-')
+            coordinator_address = f"unix:{os.path.join(self._ipc_dir, 'coordinator.sock')}"
+            self.coordinator = QueueCoordinator(db_path, SocketTransport(coordinator_address))
+        self.coordinator_address = coordinator_address
+        self.processes: List[multiprocessing.Process] = []
+        self._stopped = False
+
+    def start(self):
+        """Démarre le coordinateur local et les workers (bloquant jusqu'à leur arrêt)"""
+        if self.coordinator:
+            self.coordinator.start()
+        # `spawn` : chaque worker part d'un interpréteur neuf, sans threads ni connexions SQLite hérités
+        context = multiprocessing.get_context('spawn')
+        for index in range(self.worker_count):
+            node_name = f"{self.node_name}-{index}"
+            process = context.Process(
+                target=run_worker,
+                args=(node_name, self.host, self.port, self.db_path, self.coordinator_address, self.mode,
+                      self.loops, self.node_index, _worker_config(self.server_config, node_name, index)),
+                name=f"matchmaking-worker-{index}",
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+
+        print(f"🚀 Serveur multi-processus sur {self.host}:{self.port} ({self.worker_count} worker(s), mode {self.mode})")
+        try:
+            for process in self.processes:
+                process.join()
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Arrête les workers (SIGTERM, arrêt propre) puis le coordinateur local"""
+        if self._stopped:
+            return
+        self._stopped = True
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join(timeout=10)
+        if self.coordinator:
+            self.coordinator.stop()
+        if self._ipc_dir:
+            shutil.rmtree(self._ipc_dir, ignore_errors=True)
+        print("✅ Serveur multi-processus arrêté")
@@ -0,0 +1,186 @@
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+def _thread_role(name: str) -> str:
+    """Nom de thread sans sa partie variable (numéro, adresse) : les piles se regroupent par rôle"""
+    name = re.sub(r"\s*\(.*\)$", "", name)
+    return re.sub(r"([-_ ]\d+)+$", "", name).rstrip("-_ ") or name
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Profileur par échantillonnage de tous les threads du processus.
+
+    Un thread relève la pile de chaque thread (`sys._current_frames`) toutes
+    les `interval` secondes, pendant au plus `duration` secondes ; les piles
+    sont comptées sous forme repliée (`racine;...;feuille N`), le format
+    attendu par flamegraph.pl ou speedscope. Rien n'est instrumenté : le coût
+    est celui du relevé, indépendant du trafic.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.started_at: Optional[float] = None
+        self.path: Optional[str] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float, interval: float = 0.01) -> str:
+        """Démarre un relevé de `duration` secondes ; retourne le fichier qui recevra les piles"""
+        with self._lock:
+            if self.running:
+                raise RuntimeError("Profilage déjà en cours")
+            os.makedirs(self.directory, exist_ok=True)
+            self.samples = Counter()
+            self.sample_count = 0
+            self.started_at = time.monotonic()
+            self.path = os.path.join(self.directory, f"profile-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.collapsed")
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, args=(duration, interval), name="sampling-profiler",
+                                            daemon=True)
+            self._thread.start()
+        print(f"🔬 Profilage par échantillonnage pendant {duration:g}s (toutes les {interval * 1000:g} ms)")
+        return self.path
+
+    def stop(self) -> Optional[str]:
+        """Arrête le relevé en cours et attend l'écriture du fichier"""
+        thread = self._thread
+        if thread is None:
+            return None
+        self._stop_event.set()
+        thread.join()
+        return self.path
+
+    def _run(self, duration: float, interval: float):
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + duration
+        while not self._stop_event.wait(interval) and time.monotonic() < deadline:
+            self._sample(own_ident)
+        self._write()
+
+    def _sample(self, own_ident: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(_thread_role(names.get(ident, 'inconnu')))
+            stack.reverse()
+            self.samples[';'.join(stack)] += 1
+        self.sample_count += 1
+
+    def _write(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"🔬 Profil écrit dans {self.path} ({self.sample_count} relevés)")
+
+    def status(self) -> Dict:
+        return {
+            'running': self.running,
+            'samples': self.sample_count,
+            'elapsed': round(time.monotonic() - self.started_at, 1) if self.started_at else 0,
+            'path': self.path
+        }
+
+
+class RequestProfiler:
+    """Profilage déterministe (cProfile) d'une requête sur `every`, cumulé par type de message.
+
+    Une seule requête est profilée à la fois (depuis Python 3.12, cProfile
+    est global à l'interpréteur) : une requête tirée pendant qu'une autre est
+    profilée est traitée normalement.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.every = 0  # 0 : désactivé
+        self._counter = itertools.count()
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._profiled: Counter = Counter()
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.every > 0
+
+    def start(self, every: int):
+        with self._lock:
+            self._stats = {}
+            self._profiled = Counter()
+            self._counter = itertools.count()
+            self.every = max(1, every)
+        print(f"🔬 Profilage cProfile d'une requête sur {self.every}")
+
+    def should_profile(self) -> bool:
+        return self.every > 0 and next(self._counter) % self.every == 0
+
+    def run(self, msg_type: str, handler: Callable, *args):
+        """Exécute `handler` sous cProfile et cumule le profil avec ceux du même type"""
+        if not self._busy.acquire(blocking=False):
+            return handler(*args)
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(handler, *args)
+        finally:
+            self._busy.release()
+            with self._lock:
+                if self.every > 0:
+                    if msg_type in self._stats:
+                        self._stats[msg_type].add(profile)
+                    else:
+                        self._stats[msg_type] = pstats.Stats(profile)
+                    self._profiled[msg_type] += 1
+
+    def stop(self) -> List[str]:
+        """Arrête le profilage et écrit, par type de message, le profil `.pstats` et son résumé texte"""
+        with self._lock:
+            self.every = 0
+            stats, self._stats = self._stats, {}
+            profiled = self._profiled
+        if not stats:
+            return []
+        os.makedirs(self.directory, exist_ok=True)
+        prefix = os.path.join(self.directory, f"requests-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}")
+        paths = []
+        for msg_type, type_stats in stats.items():
+            path = f"{prefix}-{msg_type}.pstats"
+            type_stats.dump_stats(path)
+            summary = io.StringIO()
+            type_stats.stream = summary
+            type_stats.sort_stats('cumulative').print_stats(25)
+            with open(f"{prefix}-{msg_type}.txt", 'w', encoding='utf-8') as f:
+                f.write(f"{profiled[msg_type]} requête(s) {msg_type} profilée(s)\n")
+                f.write(summary.getvalue())
+            paths.append(path)
+        print(f"🔬 Profils par type de message écrits dans {self.directory} ({len(paths)} fichier(s))")
+        return paths
+
+    def status(self) -> Dict:
+        return {'every': self.every, 'profiled': dict(self._profiled)}
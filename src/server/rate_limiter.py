@@ -0,0 +1,124 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from src.config.settings import RateLimitConfig
+
+
+class TokenBucket:
+    """Seau à jetons : `rate` (> 0) jetons par seconde, au plus `burst` en réserve"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def available(self, now: float) -> float:
+        """Remplit la réserve sans consommer ; retourne 0 si un jeton est disponible, sinon l'attente"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> float:
+        """Consomme un jeton ; retourne 0 si accordé, sinon les secondes avant le prochain jeton"""
+        wait = self.available(now)
+        if not wait:
+            self.tokens -= 1
+        return wait
+
+
+class _IpBucket(TokenBucket):
+    """Seau partagé par les connexions d'une adresse (d'où le verrou)"""
+
+    __slots__ = ('lock', 'connections')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        super().__init__(rate, burst, now)
+        self.lock = threading.Lock()
+        self.connections = 0
+
+
+class ConnectionRateLimits:
+    """Seaux d'une connexion, créés à l'ouverture : aucune allocation par requête.
+
+    Les seaux par type ne sont lus que par le gestionnaire de la connexion,
+    qui traite ses requêtes une à une : ils n'ont pas besoin de verrou.
+    """
+
+    __slots__ = ('ip', 'ip_bucket', 'buckets')
+
+    def __init__(self, ip: str, ip_bucket: _IpBucket, buckets: Dict[str, TokenBucket]):
+        self.ip = ip
+        self.ip_bucket = ip_bucket
+        self.buckets = buckets
+
+
+class RateLimiter:
+    """Limitation de débit des requêtes, par (connexion, type de message) et par adresse IP"""
+
+    def __init__(self, settings: RateLimitConfig):
+        self.settings = settings
+        self._ip_buckets: Dict[str, _IpBucket] = {}
+        self._lock = threading.Lock()
+        self.limited: Dict[str, int] = {}  # type de message -> requêtes refusées
+
+    def open(self, ip: str) -> Optional[ConnectionRateLimits]:
+        """Crée les seaux d'une nouvelle connexion (None si la limitation est désactivée)"""
+        if not self.settings.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            ip_bucket = self._ip_buckets.get(ip)
+            if ip_bucket is None:
+                ip_bucket = _IpBucket(self.settings.per_ip_rate, self.settings.per_ip_burst, now)
+                self._ip_buckets[ip] = ip_bucket
+            ip_bucket.connections += 1
+        buckets = {
+            msg_type: TokenBucket(rate, burst, now)
+            for msg_type, (rate, burst) in self.settings.per_message_type.items()
+        }
+        return ConnectionRateLimits(ip, ip_bucket, buckets)
+
+    def close(self, limits: Optional[ConnectionRateLimits]):
+        """Libère les seaux d'une connexion fermée (le seau de l'adresse part avec sa dernière connexion)"""
+        if limits is None:
+            return
+        with self._lock:
+            limits.ip_bucket.connections -= 1
+            if limits.ip_bucket.connections <= 0 and self._ip_buckets.get(limits.ip) is limits.ip_bucket:
+                del self._ip_buckets[limits.ip]
+
+    def check(self, limits: Optional[ConnectionRateLimits], msg_type: str) -> float:
+        """Retourne 0 si la requête passe, sinon le délai (secondes) avant de réessayer"""
+        if limits is None:
+            return 0.0
+        now = time.monotonic()
+        # Les deux seaux sont vérifiés avant d'en débiter un : une requête refusée ne coûte aucun jeton
+        bucket = limits.buckets.get(msg_type)
+        wait = bucket.available(now) if bucket is not None else 0.0
+        ip_bucket = limits.ip_bucket
+        with ip_bucket.lock:
+            wait = max(wait, ip_bucket.available(now))
+            if not wait:
+                ip_bucket.tokens -= 1
+        if wait:
+            return self._limited(msg_type, wait)
+        if bucket is not None:
+            bucket.tokens -= 1
+        return 0.0
+
+    def _limited(self, msg_type: str, wait: float) -> float:
+        """Compte une requête refusée (types inconnus regroupés : le client choisit le type)"""
+        key = msg_type if msg_type in self.settings.per_message_type else 'other'
+        self.limited[key] = self.limited.get(key, 0) + 1
+        return wait
+
+    def stats(self) -> Dict:
+        """Retourne les compteurs de requêtes refusées"""
+        return {
+            'tracked_addresses': len(self._ip_buckets),
+            'limited_requests': dict(self.limited)
+        }
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.common.ranking import PlayerStats, RankingSystem
+from src.database.database import RATING_FIELDS, MatchmakingDatabase
+
+
+def load_rating(ranking: RankingSystem, rating_key: str, pseudo: str, row: Optional[Dict]) -> PlayerStats:
+    """Ajoute un joueur à `ranking` depuis sa ligne de la table `ratings` (None : ELO initial)"""
+    stats = ranking.add_player(rating_key, pseudo, pseudo)
+    if row:
+        for name in RATING_FIELDS:
+            setattr(stats, name, row[name])
+        stats.last_game = datetime.fromisoformat(row['last_game']) if row['last_game'] else None
+    return stats
+
+
+def record_ranked_result(db: MatchmakingDatabase, ranking: RankingSystem, game_name: str,
+                         players: Sequence[Tuple[str, str]], winner_index: Optional[int]) -> List[PlayerStats]:
+    """Met à jour et enregistre l'ELO des deux joueurs d'une partie classée.
+
+    `players` : (clé de classement, pseudo) des joueurs 1 et 2 ; `winner_index` :
+    0 ou 1, None pour un nul. Les classements sont relus en base : un autre
+    processus a pu faire jouer ces joueurs depuis leur entrée en file.
+    """
+    scratch = RankingSystem(ranking.k_factor, ranking.initial_elo)
+    stats = [load_rating(scratch, rating_key, pseudo, db.get_rating(rating_key, game_name))
+             for rating_key, pseudo in players]
+    winner, loser = stats[::-1] if winner_index == 1 else stats
+    scratch.update_ratings(winner.player_id, loser.player_id, winner_index is None)
+    db.save_ratings(game_name, [
+        {
+            'rating_key': player.player_id,
+            'pseudo': player.username,
+            **{name: getattr(player, name) for name in RATING_FIELDS},
+            'last_game': player.last_game.isoformat() if player.last_game else None
+        }
+        for player in stats
+    ])
+    return stats
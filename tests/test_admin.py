@@ -0,0 +1,77 @@
+import sys
+import os
+import socket
+import stat
+from dataclasses import replace
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.settings import config
+from src.server.admin import AdminServer, admin_request
+from src.server.matchmaking_server import MatchmakingServer
+from tests.test_matchmaking import _CapturingConnection
+
+
+def _connect_players(server, count):
+    players = {}
+    for index in range(count):
+        player_id = server.db.create_player_session("127.0.0.1", 5000 + index, session_pseudo=f"J{index}")
+        players[player_id] = []
+        server._register_client(player_id, _CapturingConnection(('127.0.0.1', 5000 + index), players[player_id]))
+    return players
+
+
+def test_canal_d_administration(tmp_path):
+    path = str(tmp_path / "admin.sock")
+    server = MatchmakingServer(db_path=str(tmp_path / "admin.db"),
+                               server_config=replace(config.server, admin_socket=path))
+    admin = AdminServer(server, path)
+    admin.start()
+    try:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        p1, p2, p3 = players = _connect_players(server, 3)
+
+        server.clients.get(p1).last_seen -= 30
+        listed = admin_request(path, 'players')['players']
+        assert len(listed) == 3 and listed[-1]['player_id'] == p1 and listed[-1]['last_seen_s'] >= 30
+        assert listed[0]['codec'] == 'json' and listed[0]['address'] == ['127.0.0.1', listed[0]['address'][1]]
+
+        for player_id in players:
+            server.queue_index.add(player_id, 'tictactoe', False, f"J{player_id}")
+        queues = admin_request(path, 'queues')['queues']
+        assert queues == [{'game_name': 'tictactoe', 'ranked': False, 'depth': 3,
+                           'oldest_wait_s': queues[0]['oldest_wait_s']}]
+
+        # Passe forcée : une paire appariée, le troisième joueur reste en file
+        assert admin_request(path, 'matchmaking_pass')['matches_started'] == 1
+        match, = admin_request(path, 'matches')['matches']
+        assert sorted(match['players']) == [p1, p2] and match['moves'] == 0
+
+        assert admin_request(path, 'drain_queue', game_name='tictactoe')['removed'] == 1
+        assert players[p3][-1]['type'] == 'queue_left'
+        assert admin_request(path, 'queues')['queues'] == []
+
+        assert admin_request(path, 'kick', player_id=p3)['kicked']
+        assert server.clients.get(p3).closed
+        assert not admin_request(path, 'kick', player_id=999)['kicked']
+        assert admin_request(path, 'kick')['type'] == 'error'
+
+        pool = admin_request(path, 'pool')
+        assert pool['pool']['max_size'] >= 1 and 'pending' in pool['write_behind']
+        assert admin_request(path, 'stats')['active_matches'] == 1
+    finally:
+        admin.stop()
+    assert not os.path.exists(path)
+
+    # Socket laissé par un serveur arrêté brutalement : remplacé au démarrage
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    admin.start()
+    try:
+        assert admin_request(path, 'stats')['type'] == 'admin_result'
+    finally:
+        admin.stop()
+    server.db_writer.flush()
+    server.db.close()
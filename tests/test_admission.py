@@ -0,0 +1,79 @@
+import sys
+import os
+import socket
+import threading
+import time
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.protocol import FrameDecoder, decode_message
+from src.config.settings import ServerConfig
+from src.server.admission import REJECT_CAPACITY, REJECT_PER_IP, AdmissionController
+from src.server.matchmaking_server import MatchmakingServer
+
+
+def _read_message(sock: socket.socket):
+    decoder = FrameDecoder()
+    while True:
+        data = sock.recv(65536)
+        assert data, "Connexion fermée sans message"
+        for payload in decoder.feed(data):
+            return decode_message(payload)
+
+
+def test_plafonds_global_et_par_adresse():
+    admission = AdmissionController(max_connections=3, max_per_ip=2, retry_after_ms=250)
+    assert admission.try_admit('10.0.0.1') is None
+    assert admission.try_admit('10.0.0.1') is None
+    assert admission.try_admit('10.0.0.1') == REJECT_PER_IP
+    assert admission.try_admit('10.0.0.2') is None
+    assert admission.try_admit('10.0.0.3') == REJECT_CAPACITY
+
+    admission.release('10.0.0.1')
+    admission.release('10.0.0.9')  # Adresse inconnue : sans effet
+    assert admission.try_admit('10.0.0.3') is None
+
+    stats = admission.stats()
+    assert stats['active_connections'] == 3 and stats['admitted'] == 4
+    assert stats['rejected_capacity'] == 1 and stats['rejected_per_ip'] == 1
+
+    frame = admission.rejection_frame(REJECT_CAPACITY)
+    message = decode_message(frame[4:])
+    assert message['type'] == 'server_full' and message['retry_after_ms'] == 250
+
+
+def test_serveur_plein_refuse_sans_thread(tmp_path):
+    server_config = ServerConfig(host='127.0.0.1', port=0, max_connections=1, timeout=0, debug=False,
+                                 max_connections_per_ip=0)
+    server = MatchmakingServer('127.0.0.1', 0, str(tmp_path / "admission.db"), server_config=server_config)
+    threading.Thread(target=server.start, daemon=True).start()
+    deadline = time.monotonic() + 5
+    while not (server.running and server.socket):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    address = server.socket.getsockname()
+
+    try:
+        admitted = socket.create_connection(address)
+        while server.admission.stats()['active_connections'] < 1:
+            time.sleep(0.01)
+
+        rejected = socket.create_connection(address, timeout=5)
+        message = _read_message(rejected)
+        assert message['type'] == 'server_full' and message['reason'] == REJECT_CAPACITY
+        assert rejected.recv(1) == b''  # Fermée par le serveur
+        assert [thread.name for thread in threading.enumerate()].count('client') == 1  # Pas de thread créé
+        rejected.close()
+
+        # La place libérée est réattribuée
+        admitted.close()
+        while server.admission.stats()['active_connections']:
+            time.sleep(0.01)
+        again = socket.create_connection(address)
+        while server.admission.stats()['admitted'] < 2:
+            time.sleep(0.01)
+        again.close()
+        assert server.get_server_stats()['admission']['rejected_capacity'] == 1
+    finally:
+        server.stop()
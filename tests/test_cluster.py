@@ -0,0 +1,216 @@
+import sys
+import os
+import time
+
+import pytest
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.server.cluster import (
+    CLUSTER_ID_RANGE, ClusterMatchmakingServer, LoopbackTransport, QueueCoordinator, SocketTransport
+)
+from tests.test_matchmaking import _CapturingConnection
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition non atteinte")
+        time.sleep(0.01)
+
+
+def test_match_entre_deux_noeuds(tmp_path):
+    transport = LoopbackTransport()
+    coordinator = QueueCoordinator(str(tmp_path / "coordinator.db"), transport)
+    coordinator.start()
+    # Chaque nœud a sa propre base, comme sur deux machines
+    nodes = [
+        ClusterMatchmakingServer(f"node-{index}", transport, db_path=str(tmp_path / f"node-{index}.db"),
+                                 node_index=index)
+        for index in range(2)
+    ]
+    for node in nodes:
+        node.running = True
+        node._start_background_tasks()
+    _wait_for(lambda: len(coordinator.nodes) == 2)
+
+    try:
+        # Un joueur par nœud, avec des identifiants pris dans la plage de chaque nœud
+        received = {}
+        players = []
+        for node, pseudo in zip(nodes, ('A', 'B')):
+            player_id = node.db.create_player_session("127.0.0.1", 5000, session_pseudo=pseudo)
+            received[player_id] = []
+            node._register_client(player_id, _CapturingConnection(('127.0.0.1', player_id), received[player_id]))
+            players.append(player_id)
+        p1, p2 = players
+        assert p1 == 1 and p2 == CLUSTER_ID_RANGE + 1
+        _wait_for(lambda: len(coordinator.players) == 2)
+
+        for node, player_id in zip(nodes, players):
+            response = node._process_message(
+                {'type': 'join_queue', 'player_id': player_id, 'game_name': 'tictactoe', 'ranked': False},
+                None, ('127.0.0.1', player_id)
+            )
+            assert response['type'] == 'queue_joined'
+            node._after_response(response)  # Comme la boucle de connexion, une fois la réponse envoyée
+        _wait_for(lambda: all(any(m['type'] == 'match_found' for m in received[pid]) for pid in players))
+
+        # Le match appartient au nœud du premier joueur ; les coups de l'autre y sont relayés
+        owner, other = nodes
+        assert len(owner.match_store) == 1 and len(other.match_store) == 0
+        assert owner._handle_make_move({'type': 'make_move', 'player_id': p1, 'game_name': 'tictactoe', 'move': 4})
+        assert other._handle_make_move({'type': 'make_move', 'player_id': p2, 'game_name': 'tictactoe', 'move': 0}) is None
+        _wait_for(lambda: any(m['type'] == 'move_received' for m in received[p2]))
+
+        updates = [m for m in received[p2] if m['type'] == 'game_update']
+        assert updates[-1]['seq'] == 2 and updates[-1]['board'] == [[2, 0, 0], [0, 1, 0], [0, 0, 0]]
+        stats = coordinator.stats()
+        assert stats['nodes'] == {'node-0': 1, 'node-1': 1}
+        assert stats['forwarded_requests'] == 1 and stats['routed_messages'] > 0
+
+        # Un nœud arrêté emporte ses joueurs de l'annuaire ; leurs matchs distants sont perdus par forfait
+        other.stop()
+        _wait_for(lambda: coordinator.stats()['nodes'] == {'node-0': 1})
+        _wait_for(lambda: len(owner.match_store) == 0)
+        game_over, = [m for m in received[p1] if m['type'] == 'game_over']
+        assert game_over['winner_id'] == p1 and game_over['reason'] == 'forfeit'
+
+        # Le match terminé libère le joueur restant : il peut de nouveau entrer en file
+        _wait_for(lambda: not coordinator.match_owners)
+        response = owner._process_message(
+            {'type': 'join_queue', 'player_id': p1, 'game_name': 'tictactoe', 'ranked': False},
+            None, ('127.0.0.1', p1)
+        )
+        assert response['type'] == 'queue_joined'
+
+        # Les commandes d'administration d'un nœud portent sur les files du coordinateur
+        queues = owner.handle_admin_command('queues', {})['queues']
+        assert [(q['game_name'], q['ranked'], q['depth']) for q in queues] == [('tictactoe', False, 1)]
+        assert owner._queue_depths() == {('tictactoe', 'false'): 1}
+        assert owner.handle_admin_command('matchmaking_pass', {})['matches_started'] == 0
+        assert owner.handle_admin_command('drain_queue', {'game_name': 'tictactoe'})['removed'] == 1
+        _wait_for(lambda: received[p1][-1]['type'] == 'queue_left')
+        assert owner.handle_admin_command('queues', {})['queues'] == [] and owner._queue_depths() == {}
+    finally:
+        for node in nodes:
+            node.stop()
+        coordinator.stop()
+
+
+def test_partie_classee_entre_deux_noeuds(tmp_path):
+    transport = LoopbackTransport()
+    coordinator = QueueCoordinator(str(tmp_path / "coordinator.db"), transport)
+    coordinator.start()
+    nodes = [
+        ClusterMatchmakingServer(f"node-{index}", transport, db_path=str(tmp_path / f"node-{index}.db"),
+                                 node_index=index)
+        for index in range(2)
+    ]
+    for node in nodes:
+        node.running = True
+        node._start_background_tasks()
+    _wait_for(lambda: len(coordinator.nodes) == 2)
+
+    def join(node, player_id):
+        response = node._process_message(
+            {'type': 'join_queue', 'player_id': player_id, 'game_name': 'tictactoe', 'ranked': True},
+            None, ('127.0.0.1', player_id)
+        )
+        assert response['type'] == 'queue_joined'
+        node._after_response(response)
+
+    try:
+        received = {}
+        players = []
+        for node, pseudo in zip(nodes, ('A', 'B')):
+            player_id = node.db.create_player_session("127.0.0.1", 5000, session_pseudo=pseudo)
+            received[player_id] = []
+            node._register_client(player_id, _CapturingConnection(('127.0.0.1', player_id), received[player_id]))
+            players.append(player_id)
+        p1, p2 = players
+        _wait_for(lambda: len(coordinator.players) == 2)
+        for node, player_id in zip(nodes, players):
+            join(node, player_id)
+        _wait_for(lambda: all(any(m['type'] == 'match_found' for m in received[pid]) for pid in players))
+
+        # Le joueur 1 (nœud propriétaire) gagne ; les coups du joueur 2 sont relayés
+        owner, other = nodes
+        match = owner.match_store.get_for_player(p1, 'tictactoe')
+        for node, player_id, move in ((owner, p1, 0), (other, p2, 3), (owner, p1, 1), (other, p2, 4), (owner, p1, 2)):
+            seq = match.seq
+            node._handle_make_move({'type': 'make_move', 'player_id': player_id, 'game_name': 'tictactoe',
+                                    'move': move})
+            _wait_for(lambda: match.seq > seq)
+        _wait_for(lambda: any(m['type'] == 'game_over' for m in received[p2]))
+
+        # Les deux classements sont chez le coordinateur, aucun dans la base d'un nœud
+        winner = coordinator.db.get_rating(f"session:{p1}", 'tictactoe')
+        loser = coordinator.db.get_rating(f"session:{p2}", 'tictactoe')
+        assert (winner['pseudo'], winner['elo_rating'], winner['wins']) == ('A', 1016, 1)
+        assert (loser['pseudo'], loser['elo_rating'], loser['losses']) == ('B', 984, 1)
+        assert all(node.db.get_rating(f"session:{pid}", 'tictactoe') is None for node in nodes for pid in players)
+
+        # Le perdant revient en file depuis son nœud avec son nouvel ELO
+        _wait_for(lambda: not coordinator.match_owners)
+        join(other, p2)
+        entry, = coordinator.queue_index.entries('tictactoe', True)
+        assert entry.player_id == p2 and entry.elo_rating == 984
+    finally:
+        for node in nodes:
+            node.stop()
+        coordinator.stop()
+
+
+def test_appariement_avec_un_joueur_parti(tmp_path):
+    transport = LoopbackTransport()
+    coordinator = QueueCoordinator(str(tmp_path / "coordinator.db"), transport)
+    coordinator.start()
+    node = ClusterMatchmakingServer("node-0", transport, db_path=str(tmp_path / "node.db"))
+    node.running = True
+    node._start_background_tasks()
+    _wait_for(lambda: len(coordinator.nodes) == 1)
+
+    try:
+        received = []
+        player_id = node.db.create_player_session("127.0.0.1", 5000, session_pseudo='A')
+        node._register_client(player_id, _CapturingConnection(('127.0.0.1', player_id), received))
+        _wait_for(lambda: player_id in coordinator.players)
+
+        # L'adversaire a quitté le cluster : pas de match, le joueur restant garde sa place et son ticket
+        entry = coordinator.queue_index.add(player_id, 'tictactoe', False, 'A')
+        coordinator.queue_index.add(player_id + 1, 'tictactoe', False, 'Parti')
+        assert coordinator._run_matchmaking_pass([('tictactoe', False)]) == 0
+        assert coordinator.queue_index.entries('tictactoe', False) == [entry]
+        assert not coordinator.match_owners and len(node.match_store) == 0
+        assert not any(m['type'] == 'match_found' for m in received)
+    finally:
+        node.stop()
+        coordinator.stop()
+
+
+def test_noeud_arrete_proprement_sans_coordinateur(tmp_path):
+    transport = LoopbackTransport()
+    coordinator = QueueCoordinator(str(tmp_path / "coordinator.db"), transport)
+    coordinator.start()
+    node = ClusterMatchmakingServer("node-0", transport, db_path=str(tmp_path / "node.db"))
+    stopped = []
+    node.on_coordinator_lost = lambda: (node.stop(), stopped.append(True))
+    node.running = True
+    node._start_background_tasks()
+    _wait_for(lambda: len(coordinator.nodes) == 1)
+
+    # Coordinateur arrêté avant le nœud : le nœud s'arrête sans signaler le processus
+    coordinator.stop()
+    _wait_for(lambda: stopped)
+    assert not node.running
+    assert node.coordinator_lost and not node.db_writer.stats()['pending']
+
+
+def test_adresses_de_transport():
+    assert SocketTransport('10.0.0.5:9100').target == ('10.0.0.5', 9100)
+    assert SocketTransport('unix:/tmp/coordinateur.sock').target == '/tmp/coordinateur.sock'
+    with pytest.raises(ValueError):
+        SocketTransport('coordinateur')
@@ -0,0 +1,126 @@
+import sys
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.server.connection import (
+    POLICY_DISCONNECT, POLICY_DROP, ClientConnection, ThreadedClientConnection
+)
+
+
+class _StalledConnection(ClientConnection):
+    """Connexion dont l'écrivain ne vide la file que sur demande (client qui ne lit pas)"""
+
+    def __init__(self, **kwargs):
+        super().__init__(('127.0.0.1', 0), **kwargs)
+        self.transport_closed = False
+
+    def _wake_writer(self):
+        pass
+
+    def _close_transport(self):
+        self.transport_closed = True
+
+    def drain_one(self):
+        self._batch_sent(self._take_batch())
+
+
+def test_politique_drop_avec_seuils_haut_et_bas():
+    connection = _StalledConnection(high_watermark=100, low_watermark=40, policy=POLICY_DROP)
+    assert all(connection.send(b'x' * 30) for _ in range(3))
+    assert not connection.send(b'x' * 30)  # 120 octets > seuil haut
+    assert connection.congested and connection.stats()['dropped_messages'] == 1
+    assert not connection.send(b'x')  # Toujours saturé tant que le seuil bas n'est pas atteint
+
+    connection.drain_one()
+    assert not connection.congested and connection.pending_bytes() == 0
+    assert connection.send(b'x' * 30)
+
+
+def test_politique_disconnect_ferme_la_connexion():
+    connection = _StalledConnection(high_watermark=50, policy=POLICY_DISCONNECT)
+    assert connection.send(b'x' * 40)
+    assert not connection.send(b'x' * 40)
+    assert connection.closed and connection.transport_closed
+    assert not connection.send(b'x')
+
+
+def test_politique_inconnue_refusee():
+    with pytest.raises(ValueError):
+        _StalledConnection(policy='ignore')
+
+
+def test_transport_obligatoire():
+    class _SansTransport(ClientConnection):
+        def _wake_writer(self):
+            pass
+
+    with pytest.raises(TypeError):
+        _SansTransport(('127.0.0.1', 0))
+
+
+def test_ecrivain_threade_envoie_dans_l_ordre():
+    server_side, client_side = socket.socketpair()
+    connection = ThreadedClientConnection(server_side, ('local', 0))
+    for i in range(100):
+        assert connection.send(b'%03d' % i)
+
+    received = b''
+    client_side.settimeout(2)
+    while len(received) < 300:
+        received += client_side.recv(4096)
+    assert received == b''.join(b'%03d' % i for i in range(100))
+
+    deadline = time.monotonic() + 2
+    while connection.pending_bytes() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert connection.stats()['sent_messages'] == 100
+    connection.close()
+    assert client_side.recv(10) == b''  # Fermeture vue par le pair
+    client_side.close()
+    server_side.close()
+
+
+def test_registre_compartimente():
+    from src.server.client_registry import ClientRegistry
+    registry = ClientRegistry(shards=4)
+    first, second = object(), object()
+    assert registry.register(7, first) is None
+    assert registry.register(7, second) is first  # Reconnexion : remplace l'ancienne
+    assert registry.get(7) is second and 7 in registry
+
+    # Une déconnexion tardive de l'ancienne connexion ne retire pas la nouvelle
+    assert not registry.unregister(7, first)
+    assert registry.unregister(7, second)
+    assert registry.get(7) is None and len(registry) == 0
+
+    for player_id in range(1, 11):
+        registry.register(player_id, player_id)
+    assert sorted(registry.connections()) == list(range(1, 11))
+    assert len(registry.clear()) == 10 and len(registry) == 0
+
+
+def test_registre_acces_concurrents():
+    from src.server.client_registry import ClientRegistry
+    registry = ClientRegistry(shards=8)
+
+    def churn(offset):
+        connections = {player_id: object() for player_id in range(offset, offset + 500)}
+        for player_id, connection in connections.items():
+            registry.register(player_id, connection)
+            assert registry.get(player_id) is connection
+        for player_id in range(offset, offset + 500, 2):
+            assert registry.unregister(player_id, connections[player_id])
+
+    threads = [threading.Thread(target=churn, args=(i * 1000,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(registry) == 8 * 250
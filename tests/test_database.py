@@ -1 +1,127 @@
-
\ No newline at end of file
+import sys
+import os
+import threading
+
+import pytest
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.database import MatchmakingDatabase, thaw
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = MatchmakingDatabase(str(tmp_path / "test.db"), pool_size=2)
+    yield database
+    database.close()
+
+
+def test_pool_reutilise_les_connexions(db):
+    for _ in range(20):
+        db.get_player_info(1)
+    stats = db.get_pool_stats()
+    assert stats['open_connections'] == 1
+    assert stats['checkouts'] >= 20
+    assert stats['in_use'] == 0
+
+
+def test_pool_configure_wal(db):
+    with db.pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_pool_borne_sous_concurrence(db):
+    def worker():
+        for _ in range(50):
+            db.get_player_info(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = db.get_pool_stats()
+    assert stats['open_connections'] <= 2
+    assert stats['checkouts'] >= 400
+
+
+def test_creation_de_match_avec_appel_imbrique(db):
+    p1 = db.create_player_session("127.0.0.1", 5000, session_pseudo="A")
+    p2 = db.create_player_session("127.0.0.1", 5001, session_pseudo="B")
+    match_id = db.create_match("tictactoe", {'player_id': p1}, {'player_id': p2}, False)
+    match = db.get_player_current_match(p1, "tictactoe")
+    assert match['id'] == match_id
+    assert match['current_turn_player_id'] == p1
+
+
+def test_catalogue_en_cache_et_invalide_a_lecriture(db):
+    catalog = db.get_catalog()
+    checkouts = db.get_pool_stats()['checkouts']
+    assert db.get_game_by_name('connect4') is catalog.by_name['connect4']
+    assert db.get_game_by_id(catalog.by_name['tictactoe']['id'])['name'] == 'tictactoe'
+    assert db.get_pool_stats()['checkouts'] == checkouts  # Aucune requête SQL
+
+    db.add_game('morpion4', 'Morpion 4x4', 'Alignez 4 symboles', {'board': [[0] * 4 for _ in range(4)]})
+    assert db.get_catalog() is not catalog
+    assert 'morpion4' in db.get_catalog().by_name
+    assert db.get_catalog().initial_board_json['morpion4'].startswith('{"board"')
+
+
+def test_catalogue_en_lecture_seule(db):
+    game = db.get_game_by_name('tictactoe')
+    with pytest.raises(TypeError):
+        game['name'] = 'autre'
+    with pytest.raises(TypeError):
+        game['initial_board_config']['board'][0][0] = 1
+    board = thaw(game['initial_board_config']['board'])
+    board[0][0] = 1  # Copie modifiable : le catalogue partagé reste intact
+    assert db.get_game_by_name('tictactoe')['initial_board_config']['board'][0][0] == 0
+
+
+def _query_plan(db, call):
+    """Exécute `call` et retourne le plan de chaque requête SQL émise"""
+    statements = []
+    with db.pool.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+
+        plan = []
+        for sql in statements:
+            if sql.lstrip().upper().startswith(('SELECT', 'DELETE', 'UPDATE')):
+                plan.extend(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+        return plan
+
+
+def test_migrations_appliquees_une_seule_fois(tmp_path):
+    from src.database.database import MIGRATIONS
+    path = str(tmp_path / "migrations.db")
+    first = MatchmakingDatabase(path)
+    assert first.get_schema_version() == MIGRATIONS[-1][0]
+    first.close()
+
+    again = MatchmakingDatabase(path)
+    assert again.get_schema_version() == MIGRATIONS[-1][0]
+    with again.pool.connection() as conn:
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'idx_queues_game_ranked_joined', 'idx_queues_player_game',
+            'idx_matches_status_player1', 'idx_matches_active_player2'} <= indexes
+    again.close()
+
+
+@pytest.mark.parametrize("call, index_prefix", [
+    (lambda db: db.add_to_queue(1, 'connect4', True), 'idx_queues_player_game'),
+    (lambda db: db.remove_from_queue(1, 1), 'idx_queues_player_game'),
+    (lambda db: db.get_queue_for_game('connect4', True), 'idx_queues_game_ranked_joined'),
+    (lambda db: db.get_player_current_match(1, 'connect4'), 'idx_matches_'),
+])
+def test_plans_de_requete_sans_parcours_complet(db, call, index_prefix):
+    plan = _query_plan(db, lambda: call(db))
+    assert plan
+    assert not [detail for detail in plan if detail.startswith('SCAN')], plan
+    assert any(index_prefix in detail for detail in plan), plan
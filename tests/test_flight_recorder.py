@@ -0,0 +1,67 @@
+import sys
+import os
+import json
+from dataclasses import replace
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.protocol import encode_message
+from src.config.settings import config
+from src.server.flight_recorder import IN, OUT, FlightRecorder
+from src.server.matchmaking_server import MatchmakingServer
+from tests.test_matchmaking import _CapturingConnection
+
+
+def test_enregistreur_borne():
+    recorder = FlightRecorder(capacity=3)
+    for index in range(5):
+        recorder.record(IN, f"message-{index}", 1, 10, 0.002)
+    events = recorder.snapshot()
+    assert [event['type'] for event in events] == ['message-2', 'message-3', 'message-4']
+    assert events[-1]['duration_ms'] == 2.0 and events[0]['age'] >= events[-1]['age']
+
+    # Vidages automatiques espacés
+    assert recorder.may_auto_dump(now=100.0)
+    assert not recorder.may_auto_dump(now=105.0)
+    assert recorder.may_auto_dump(now=111.0)
+
+
+def test_vidage_sur_requete_lente(tmp_path):
+    # Seuil quasi nul : chaque requête est « lente »
+    server_config = replace(config.server, flight_recorder_slow_ms=0.000001,
+                            flight_recorder_dir=str(tmp_path / "flight"))
+    server = MatchmakingServer(db_path=str(tmp_path / "flight.db"), server_config=server_config)
+    p1 = server.db.create_player_session("127.0.0.1", 5000, session_pseudo="A")
+    p2 = server.db.create_player_session("127.0.0.1", 5001, session_pseudo="B")
+    connections = {}
+    for player_id in (p1, p2):
+        connections[player_id] = _CapturingConnection(('127.0.0.1', player_id), [])
+        server._register_client(player_id, connections[player_id])
+    server.queue_index.add(p1, 'tictactoe', False, 'A')
+    server.queue_index.add(p2, 'tictactoe', False, 'B')
+    (entry1, entry2), = server.queue_index.pop_pairs('tictactoe', False)
+    server._start_match('tictactoe', False, entry1, entry2)
+
+    payload = encode_message({'type': 'make_move', 'player_id': p1, 'game_name': 'tictactoe', 'move': 4})[4:]
+    response = server._handle_request(payload, None, ('127.0.0.1', p1), None, connections[p1])
+    assert response['type'] == 'move_received'
+
+    dumps = os.listdir(tmp_path / "flight")
+    assert len(dumps) == 1 and server.flight_recorder_dumps == 1
+    with open(tmp_path / "flight" / dumps[0], encoding='utf-8') as f:
+        report = json.load(f)
+    assert report['reason'].startswith('requête lente: make_move') and report['player_id'] == p1
+    connection_events = report['recorders']['connection']
+    assert [(e['direction'], e['type']) for e in connection_events] == [
+        (OUT, 'match_found'), (OUT, 'game_update'), (OUT, 'game_update'), (IN, 'make_move')
+    ]
+    match_id = server.match_store.get_for_player(p1, 'tictactoe').id
+    assert [e['type'] for e in report['recorders'][f"match {match_id}"]] == ['make_move', 'game_update']
+
+    # Vidage à la demande de toutes les connexions
+    path = server.dump_flight_recorders()
+    with open(path, encoding='utf-8') as f:
+        assert set(json.load(f)['recorders']) == {f"player {p1}", f"player {p2}", f"match {match_id}"}
+    server.db_writer.flush()
+    server.db.close()
@@ -1 +1,78 @@
-
\ No newline at end of file
+import sys
+import os
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.bitboard import BitBoard
+from src.common.games import Connect4, TicTacToe
+
+
+def test_bitboard_aller_retour_liste():
+    board = [
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 2, 0, 0, 0],
+        [0, 0, 1, 2, 0, 0, 0],
+        [0, 1, 1, 2, 1, 0, 0],
+    ]
+    bitboard = BitBoard.from_board(board, 4, gravity=True)
+    assert bitboard.to_board() == board
+    assert bitboard.heights == [0, 1, 2, 3, 1, 0, 0]
+    assert bitboard.drop(2, 3) == (2, 3)
+    assert bitboard.is_win(2)
+    assert not bitboard.is_win(1)
+
+
+def test_bitboard_pas_d_alignement_entre_colonnes():
+    # Jetons en haut d'une colonne et en bas de la suivante : aucun alignement
+    bitboard = BitBoard(6, 7, 4, gravity=True)
+    for _ in range(3):
+        bitboard.drop(1, 0)
+    for _ in range(3):
+        bitboard.drop(2, 0)
+    bitboard.drop(2, 1)
+    assert not bitboard.is_win(2)
+
+
+def test_puissance4_diagonale_et_hauteurs():
+    game = Connect4({})
+    # Diagonale montante du joueur 1 : colonnes 0 à 3
+    for column in (0, 1, 1, 2, 2, 3, 2, 3, 3, 6):
+        game.apply_move(column)
+    assert not game.state.game_over
+    game.apply_move(3)
+    assert game.state.game_over and game.state.winner == 1
+    assert game.get_column_height(3) == 4
+    assert game.bitboard.to_board() == game.state.board
+
+
+def test_morpion_victoire_nul_et_coups_gagnants():
+    game = TicTacToe({})
+    for move in ((0, 0), (1, 0), (0, 1)):
+        game.apply_move(move)
+    assert game.get_winning_moves() == []  # Le joueur 2 n'a pas de coup gagnant
+    game.apply_move((1, 1))
+    assert game.get_winning_moves() == [(0, 2)]  # Le joueur 1 peut compléter sa ligne
+    game.apply_move((0, 2))
+    assert game.state.winner == 1
+
+    game.reset()
+    for move in ((0, 0), (0, 1), (0, 2), (1, 1), (1, 0), (1, 2), (2, 1), (2, 0), (2, 2)):
+        assert game.apply_move(move)
+    assert game.state.is_draw and game.state.winner is None
+    assert not game.is_valid_move((0, 0))
+
+
+def test_registre_des_moteurs():
+    from src.common.games import GAME_ENGINES, create_game
+    assert set(GAME_ENGINES) == {'connect4', 'tictactoe'}
+    assert create_game('echecs') is None
+
+    board = [[0] * 3 for _ in range(3)]
+    game = create_game('tictactoe', {'board': board, 'win_length': 3})
+    assert game.parse_move(5) == (1, 2)
+    assert game.parse_move(9) is None and game.parse_move(True) is None
+    game.apply_move(game.parse_move(4))
+    assert board[1][1] == 1  # Le plateau fourni est repris, pas copié
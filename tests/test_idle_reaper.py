@@ -0,0 +1,77 @@
+import sys
+import os
+import threading
+import time
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.server.idle_reaper import IdleReaper, TimingWheel
+
+
+class _FakeConnection:
+    """Connexion réduite à ce que lit la roue"""
+
+    def __init__(self, last_seen: float):
+        self.address = ('127.0.0.1', 0)
+        self.last_seen = last_seen
+        self.closed = False
+
+
+def test_roue_expire_les_connexions_silencieuses():
+    wheel = TimingWheel(timeout=30, tick=1.0, now=1000.0)
+    idle = _FakeConnection(1000.0)
+    active = _FakeConnection(1000.0)
+    closed = _FakeConnection(1000.0)
+    for connection in (idle, active, closed):
+        wheel.add(connection)
+
+    assert wheel.advance(1020.0) == []
+    active.last_seen = 1020.0  # Message reçu : seul `last_seen` change
+    closed.closed = True
+
+    assert wheel.advance(1031.0) == [idle]
+    assert len(wheel) == 1  # `active` a été replacée, `closed` oubliée
+    assert wheel.advance(1049.0) == []
+    assert wheel.advance(1051.0) == [active]
+    assert len(wheel) == 0
+
+
+def test_roue_retard_et_retrait():
+    wheel = TimingWheel(timeout=5, tick=1.0, now=0.0)
+    connections = [_FakeConnection(float(i)) for i in range(4)]
+    for connection in connections:
+        wheel.add(connection)
+    wheel.remove(connections[0])
+
+    # Un seul avancement après un long retard traite toute la roue
+    assert sorted(c.last_seen for c in wheel.advance(500.0)) == [1.0, 2.0, 3.0]
+
+
+def test_roue_sans_parcours_complet():
+    wheel = TimingWheel(timeout=30, tick=1.0, now=0.0)
+    # 100 000 connexions réparties sur 30 secondes d'activité
+    connections = [_FakeConnection(i % 30 + 0.5) for i in range(100_000)]
+    for connection in connections:
+        wheel.add(connection)
+
+    # Chaque pas ne traite que les connexions arrivées à échéance
+    expired = wheel.advance(31.0)
+    assert len(expired) == 100_000 // 30 + 1
+    assert len(wheel) == 100_000 - len(expired)
+
+
+def test_reaper_ferme_via_le_callback():
+    expired = threading.Event()
+    reaper = IdleReaper(timeout=0.2, tick=0.05, on_expire=lambda connection: expired.set())
+    reaper.watch(_FakeConnection(time.monotonic()))
+    reaper.start()
+    try:
+        assert expired.wait(2)
+        assert reaper.expired == 1
+    finally:
+        reaper.stop()
+
+    disabled = IdleReaper(timeout=0, tick=1.0, on_expire=lambda connection: None)
+    disabled.watch(_FakeConnection(0.0))  # Sans effet
+    assert disabled.wheel is None
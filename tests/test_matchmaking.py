@@ -0,0 +1,318 @@
+import sys
+import os
+import time
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.protocol import FrameDecoder, decode_message
+from src.database.database import MatchmakingDatabase
+from src.server.connection import ClientConnection
+from src.database.write_behind import WriteBehindWriter
+from src.server.match_store import ActiveMatch, MatchStore
+from src.server.matchmaking_queue import QueueIndex
+
+
+def test_file_fifo_et_doublons():
+    index = QueueIndex()
+    assert index.add(1, 'connect4', False, 'A')
+    assert index.add(1, 'connect4', True, 'A') is None  # Déjà en file pour ce jeu
+    assert index.add(2, 'connect4', False, 'B')
+    assert index.add(3, 'connect4', False, 'C')
+
+    pairs = index.pop_pairs('connect4', False)
+    assert [(p1.player_id, p2.player_id) for p1, p2 in pairs] == [(1, 2)]
+    assert index.depth('connect4', False) == 1
+    assert index.add(1, 'connect4', False, 'A')  # Peut revenir en file après le match
+
+
+def test_retrait_joueur_de_toutes_les_files():
+    index = QueueIndex()
+    index.add(1, 'connect4', False, 'A')
+    index.add(1, 'tictactoe', True, 'A')
+    removed = index.remove_player(1)
+    assert sorted(entry.game_name for entry in removed) == ['connect4', 'tictactoe']
+    assert index.total() == 0
+    assert index.keys() == []
+
+
+def test_remise_en_file_d_une_entree_extraite():
+    index = QueueIndex()
+    index.add(1, 'connect4', False, 'A')
+    index.add(2, 'connect4', False, 'B')
+    index.add(3, 'connect4', False, 'C')
+    (entry1, entry2), = index.pop_pairs('connect4', False)
+
+    # Remis en tête, avec son ticket et son attente
+    assert index.requeue(entry1)
+    assert [entry.player_id for entry in index.entries('connect4', False)] == [1, 3]
+    assert index.oldest('connect4', False) is entry1
+    index.add(2, 'connect4', False, 'B')
+    assert not index.requeue(entry2)  # Revenu en file entre-temps
+    assert index.depth('connect4', False) == 3
+
+
+def test_ecriture_differee_garde_le_dernier_etat():
+    writes = []
+    writer = WriteBehindWriter()
+    writer.submit(('queue', 1), writes.append, 'add')
+    writer.submit(('queue', 1), writes.append, 'remove')
+    writer.submit(('queue', 2), writes.append, 'add2')
+    writer.flush()
+    assert writes == ['remove', 'add2']
+    assert writer.stats()['coalesced'] == 1
+
+
+def test_appariement_classe_par_plus_proche_elo():
+    index = QueueIndex(base_window=100, window_growth_per_second=0)
+    index.add(1, 'connect4', True, 'A', 1000)
+    index.add(2, 'connect4', True, 'B', 1500)
+    index.add(3, 'connect4', True, 'C', 1050)
+    index.add(4, 'connect4', True, 'D', 1480)
+
+    pairs = index.pop_pairs('connect4', True)
+    assert sorted((p1.player_id, p2.player_id) for p1, p2 in pairs) == [(1, 3), (2, 4)]
+
+
+def test_fenetre_elo_selargit_avec_lattente():
+    index = QueueIndex(base_window=100, window_growth_per_second=10, max_window=800)
+    first = index.add(1, 'connect4', True, 'A', 1000)
+    index.add(2, 'connect4', True, 'B', 1300)
+
+    assert index.pop_pairs('connect4', True, now=first.joined_at) == []
+    pairs = index.pop_pairs('connect4', True, now=first.joined_at + 25)
+    assert [(p1.player_id, p2.player_id) for p1, p2 in pairs] == [(1, 2)]
+    assert index.total() == 0
+
+
+def test_appariement_classe_ne_reevalue_que_les_joueurs_concernes():
+    index = QueueIndex(base_window=100, window_growth_per_second=10, max_window=300)
+    first = index.add(1, 'connect4', True, 'A', 1000)
+    index.add(2, 'connect4', True, 'B', 1250)
+    index.add(3, 'connect4', True, 'C', 2000)  # Hors de portée de toute fenêtre
+    rated = index._rated[('connect4', True)]
+
+    now = first.joined_at
+    assert index.pop_pairs('connect4', True, now=now) == []
+    assert rated.due(now) == []  # Personne n'a changé : rien à réévaluer
+    # A et B se réveillent quand leur fenêtre atteint 250 ; C n'attend qu'un voisin
+    assert rated.due(now + 14) == [] and set(rated._wake_at) == {1, 2}
+
+    index.add(4, 'connect4', True, 'D', 1990)
+    pairs = index.pop_pairs('connect4', True, now=now)
+    assert [(p1.player_id, p2.player_id) for p1, p2 in pairs] == [(3, 4)]
+    pairs = index.pop_pairs('connect4', True, now=now + 15)
+    assert [(p1.player_id, p2.player_id) for p1, p2 in pairs] == [(1, 2)]
+
+
+def test_match_en_memoire_sauvegarde_en_differe(tmp_path):
+    db = MatchmakingDatabase(str(tmp_path / "test.db"))
+    writer = WriteBehindWriter()
+    store = MatchStore(db, writer)
+    p1 = db.create_player_session("127.0.0.1", 5000, session_pseudo="A")
+    p2 = db.create_player_session("127.0.0.1", 5001, session_pseudo="B")
+    match_id = db.create_match("tictactoe", {'player_id': p1}, {'player_id': p2}, False)
+    match = ActiveMatch(match_id, 2, 'tictactoe', p1, p2, False,
+                        {'board': [[0] * 3 for _ in range(3)]}, p1)
+    store.add(match)
+    assert store.get_for_player(p2, 'tictactoe') is match
+
+    match.board_state['board'][0][0] = 1
+    match.current_turn_player_id = p2
+    store.mark_dirty(match)
+    store.checkpoint()
+    writer.flush()
+    assert db.get_player_current_match(p1, 'tictactoe')['board_state']['board'][0][0] == 1
+
+    match.winner_id = p1
+    store.complete(match)
+    writer.flush()
+    assert store.get_for_player(p1, 'tictactoe') is None
+    assert db.get_player_current_match(p1, 'tictactoe') is None
+    db.close()
+
+
+def test_coups_puissance4_routes_vers_le_moteur(tmp_path):
+    from src.server.matchmaking_server import MatchmakingServer
+    server = MatchmakingServer(db_path=str(tmp_path / "server.db"))
+    p1 = server.db.create_player_session("127.0.0.1", 5000, session_pseudo="A")
+    p2 = server.db.create_player_session("127.0.0.1", 5001, session_pseudo="B")
+    server.queue_index.add(p1, 'connect4', False, 'A')
+    server.queue_index.add(p2, 'connect4', False, 'B')
+    (entry1, entry2), = server.queue_index.pop_pairs('connect4', False)
+    server._start_match('connect4', False, entry1, entry2)
+
+    def play(player_id, column):
+        return server._handle_make_move({'type': 'make_move', 'player_id': player_id,
+                                         'game_name': 'connect4', 'move': column})
+
+    assert play(p2, 0)['message'] == "Ce n'est pas votre tour"
+    assert play(p1, 7)['message'] == 'Coup invalide'
+    match = server.match_store.get_for_player(p1, 'connect4')
+    for column in (0, 1, 0, 1, 0, 1):
+        assert play(match.current_turn_player_id, column)['type'] == 'move_received'
+    assert match.board_state['board'][3][0] == 1  # Le moteur partage le plateau du match
+    play(p1, 0)
+    assert match.status == 'completed' and match.winner_id == p1
+    assert server.match_store.get_for_player(p1, 'connect4') is None
+    server.db_writer.flush()
+    server.db.close()
+
+
+class _CapturingConnection(ClientConnection):
+    """Connexion de test : les trames mises en file sont décodées immédiatement"""
+
+    def __init__(self, address, received):
+        super().__init__(address)
+        self.received = received
+        self.decoder = FrameDecoder()
+
+    def _wake_writer(self):
+        batch = self._take_batch()
+        for data in batch:
+            self.received.extend(map(decode_message, self.decoder.feed(data)))
+        self._batch_sent(batch)
+
+    def _close_transport(self):
+        pass
+
+
+def test_mises_a_jour_delta_et_resynchronisation(tmp_path):
+    from src.common.protocol import BINARY_CODEC
+    from src.server.matchmaking_server import MatchmakingServer
+    server = MatchmakingServer(db_path=str(tmp_path / "server.db"))
+    p1 = server.db.create_player_session("127.0.0.1", 5000, session_pseudo="A")
+    p2 = server.db.create_player_session("127.0.0.1", 5001, session_pseudo="B")
+
+    received = {p1: [], p2: []}
+    for player_id, delta in ((p1, True), (p2, False)):
+        connection = _CapturingConnection(('127.0.0.1', player_id), received[player_id])
+        connection.options = {'codec': BINARY_CODEC, 'delta': delta}
+        server._register_client(player_id, connection)
+
+    server.queue_index.add(p1, 'tictactoe', False, 'A')
+    server.queue_index.add(p2, 'tictactoe', False, 'B')
+    server._start_match('tictactoe', False, *server.queue_index.pop_pairs('tictactoe', False)[0])
+    for player_id, cell in ((p1, 4), (p2, 0)):
+        server._handle_make_move({'type': 'make_move', 'player_id': player_id, 'game_name': 'tictactoe', 'move': cell})
+
+    deltas = [m for m in received[p1] if m['type'] == 'game_delta']
+    assert [(m['seq'], m['row'], m['col'], m['player']) for m in deltas] == [(1, 1, 1, 1), (2, 0, 0, 2)]
+    snapshots = [m for m in received[p2] if m['type'] == 'game_update']
+    assert [m['seq'] for m in snapshots] == [1, 2]
+    assert snapshots[-1]['board'] == [[2, 0, 0], [0, 1, 0], [0, 0, 0]]
+
+    resync = server._handle_resync({'type': 'resync', 'player_id': p1, 'game_name': 'tictactoe'})
+    assert resync['seq'] == 2 and resync['board'] == snapshots[-1]['board']
+    server.db.close()
+
+
+def test_queue_joined_precede_match_found(tmp_path):
+    from src.server.matchmaking_server import MatchmakingServer
+    server = MatchmakingServer(db_path=str(tmp_path / "server.db"))
+    received = {}
+    for port, pseudo in ((5000, "A"), (5001, "B")):
+        player_id = server.db.create_player_session("127.0.0.1", port, session_pseudo=pseudo)
+        received[player_id] = []
+        server._register_client(player_id, _CapturingConnection(('127.0.0.1', port), received[player_id]))
+
+    for player_id in received:
+        response = server._process_message({'type': 'join_queue', 'player_id': player_id, 'game_name': 'tictactoe',
+                                            'ranked': False}, None, ('127.0.0.1', player_id))
+        assert not server._dirty_queues  # Rien n'est signalé au matchmaking avant l'envoi de la réponse
+        server._send_to_connection(server.clients.get(player_id), response)
+        server._after_response(response)
+        assert server._dirty_queues == {('tictactoe', False)}
+        server._dirty_queues.clear()
+
+    server._run_matchmaking_pass()
+    for messages in received.values():
+        assert [message['type'] for message in messages][:2] == ['queue_joined', 'match_found']
+    server.db_writer.flush()
+    server.db.close()
+
+
+def test_partie_classee_met_a_jour_et_enregistre_l_elo(tmp_path):
+    from src.server.matchmaking_server import MatchmakingServer
+    server = MatchmakingServer(db_path=str(tmp_path / "server.db"))
+    received = {}
+    for port, pseudo in ((5000, "A"), (5001, "B")):
+        player_id = server.db.create_player_session("127.0.0.1", port, session_pseudo=pseudo)
+        received[player_id] = []
+        server._register_client(player_id, _CapturingConnection(('127.0.0.1', port), received[player_id]))
+    p1, p2 = received
+
+    def join(player_id):
+        return server._process_message({'type': 'join_queue', 'player_id': player_id, 'game_name': 'tictactoe',
+                                        'ranked': True}, None, ('127.0.0.1', player_id))
+
+    assert join(p1)['type'] == 'queue_joined' and join(p2)['type'] == 'queue_joined'
+    server._run_matchmaking_pass()
+    match = server.match_store.get_for_player(p1, 'tictactoe')
+    for cell in (0, 3, 1, 4, 2):  # Le joueur 1 aligne la première ligne
+        server._handle_make_move({'type': 'make_move', 'player_id': match.current_turn_player_id,
+                                  'game_name': 'tictactoe', 'move': cell})
+    assert received[p1][-1]['type'] == 'game_over' and received[p1][-1]['winner_id'] == match.player1_id
+
+    winner_key, loser_key = (f"session:{player_id}" for player_id in (match.player1_id, match.player2_id))
+    winner = server.db.get_rating(winner_key, 'tictactoe')
+    loser = server.db.get_rating(loser_key, 'tictactoe')
+    assert winner['elo_rating'] == 1016 and winner['wins'] == 1 and winner['win_streak'] == 1
+    assert loser['elo_rating'] == 984 and loser['losses'] == 1 and loser['games_played'] == 1
+    assert server.db.get_rating(winner_key, 'connect4') is None  # Un classement par jeu
+
+    # Le nouvel ELO sert à l'appariement suivant, y compris après un redémarrage
+    server.db_writer.flush()
+    server.db.close()
+    server = MatchmakingServer(db_path=str(tmp_path / "server.db"))
+    join(match.player1_id)
+    entry, = server.queue_index.entries('tictactoe', True)
+    assert entry.elo_rating == 1016 and entry.rating_key == winner_key
+    server.db_writer.flush()
+    server.db.close()
+
+
+def test_deconnexion_et_inactivite_liberent_le_match(tmp_path):
+    from src.server.matchmaking_server import MatchmakingServer
+    server = MatchmakingServer(db_path=str(tmp_path / "server.db"))
+    received = {}
+    connections = {}
+    for port, pseudo in ((5000, "A"), (5001, "B"), (5002, "C")):
+        player_id = server.db.create_player_session("127.0.0.1", port, session_pseudo=pseudo)
+        received[player_id] = []
+        connections[player_id] = _CapturingConnection(('127.0.0.1', port), received[player_id])
+        server._register_client(player_id, connections[player_id])
+    p1, p2, p3 = received
+
+    def join(player_id):
+        return server._process_message({'type': 'join_queue', 'player_id': player_id, 'game_name': 'tictactoe',
+                                        'ranked': False}, None, ('127.0.0.1', player_id))
+
+    assert join(p1)['type'] == 'queue_joined' and join(p2)['type'] == 'queue_joined'
+    server._run_matchmaking_pass()
+    match = server.match_store.get_for_player(p1, 'tictactoe')
+    assert match is not None and len(server.match_reaper.wheel) == 1
+
+    # Pas de nouvelle file pour un jeu en cours
+    refused = join(p2)
+    assert refused['type'] == 'queue_error' and 'Partie en cours' in refused['message']
+
+    # Le joueur qui part perd le match ; l'autre est libéré et peut rejouer
+    server._handle_client_disconnect(p1, connections[p1])
+    assert len(server.match_store) == 0 and server.match_store.get_for_player(p2, 'tictactoe') is None
+    game_over = received[p2][-1]
+    assert game_over['type'] == 'game_over' and game_over['winner_id'] == p2 and game_over['reason'] == 'forfeit'
+    server.db_writer.flush()
+    assert server.db.get_player_current_match(p2, 'tictactoe') is None
+
+    # Match sans coup : le joueur dont c'est le tour perd par dépassement du temps
+    assert join(p2)['type'] == 'queue_joined' and join(p3)['type'] == 'queue_joined'
+    server._run_matchmaking_pass()
+    match = server.match_store.get_for_player(p3, 'tictactoe')
+    expired = server.match_reaper.wheel.advance(time.monotonic() + server.config.match_inactivity_timeout + 2)
+    assert expired == [match]
+    server._expire_idle_match(match)
+    assert len(server.match_store) == 0
+    assert received[p3][-1]['reason'] == 'timeout' and received[p3][-1]['winner_id'] == match.opponent_of(match.player1_id)
+    server.db_writer.flush()
+    server.db.close()
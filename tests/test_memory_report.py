@@ -0,0 +1,62 @@
+import sys
+import os
+from dataclasses import replace
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.protocol import encode_message
+from src.config.settings import config
+from src.server.matchmaking_server import MatchmakingServer
+from src.server.memory_report import AllocationTracker, deep_sizeof
+
+
+class _Holder:
+    def __init__(self, items):
+        self.items = items
+
+    def method(self):
+        return self.items
+
+
+def test_taille_profonde():
+    payload = [bytes([index]) * 1000 for index in range(10)]
+    size, objects, truncated = deep_sizeof(_Holder(payload))
+    assert size > 10 * 1000 and objects >= 12 and not truncated
+
+    # Un objet partagé n'est compté qu'une fois ; les méthodes liées ne sont pas suivies
+    shared = b'y' * 10000
+    assert deep_sizeof([shared, shared])[0] < 2 * 10000
+    assert deep_sizeof([_Holder(payload).method])[0] < 1000
+
+    assert deep_sizeof(list(range(100)), max_objects=10)[2]
+
+
+def test_differences_d_allocations():
+    tracker = AllocationTracker()
+    tracker.start()
+    try:
+        retained = [bytearray(1024) for _ in range(2000)]
+        top = tracker.diff(limit=5)
+        assert top[0]['size_diff'] >= 2000 * 1024
+        assert 'test_memory_report.py' in top[0]['where'][0]
+        assert tracker.status()['active']
+    finally:
+        tracker.stop()
+    assert not tracker.status()['active'] and len(retained) == 2000
+
+
+def test_rapport_memoire_par_commande_admin(tmp_path):
+    server_config = replace(config.server, admin_token='secret')
+    server = MatchmakingServer(db_path=str(tmp_path / "memory.db"), server_config=server_config)
+    for index in range(3):
+        server.ranking.add_player(f"joueur-{index}", f"joueur-{index}", f"Joueur {index}")
+
+    message = {'type': 'admin', 'token': 'secret', 'command': 'memory_report', 'top_types': 5}
+    report = server._handle_request(encode_message(message)[4:], None, ('127.0.0.1', 1))
+    assert report['type'] == 'admin_result' and len(report['top_types']) == 5
+    structures = report['structures']
+    assert structures['ranking_players']['count'] == 3 and structures['ranking_players']['bytes'] > 0
+    assert structures['clients']['count'] == 0 and structures['active_matches']['count'] == 0
+    assert report['allocations'] == {'active': False}
+    server.db.close()
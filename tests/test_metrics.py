@@ -0,0 +1,73 @@
+import sys
+import os
+import urllib.request
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.metrics import BUCKET_BOUNDS, MetricsRegistry, MetricsServer, instrument_methods, metrics
+from src.common.protocol import encode_message
+from src.server.matchmaking_server import MatchmakingServer
+
+
+def test_seaux_logarithmiques():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('latence_seconds', "Latence")
+    for seconds in (0.0000004, 0.0000015, 0.003, 1000.0):
+        histogram.observe(seconds)
+
+    # < 1 µs, [1 µs, 2 µs), [2048 µs, 4096 µs), au-delà de la dernière borne
+    assert histogram.counts[0] == 1 and histogram.counts[1] == 1
+    assert histogram.counts[12] == 1 and BUCKET_BOUNDS[12] == 0.004096
+    assert histogram.counts[-1] == 1
+
+    text = registry.render()
+    assert '# TYPE latence_seconds histogram' in text
+    assert 'latence_seconds_bucket{le="1e-06"} 1' in text
+    assert 'latence_seconds_bucket{le="0.004096"} 3' in text
+    assert 'latence_seconds_bucket{le="+Inf"} 4' in text
+    assert 'latence_seconds_count 4' in text
+
+
+def test_etiquettes_jauges_et_instrumentation():
+    registry = MetricsRegistry()
+    requests = registry.counter('requetes_total', "Requêtes", ('type',))
+    requests.labels('ping').inc()
+    requests.labels('say "hi"').inc(2)
+    registry.gauge_callback('file_attente', "Profondeur", lambda: {('tictactoe', 'true'): 3}, ('game', 'ranked'))
+
+    class Service:
+        def travail(self, valeur):
+            return valeur * 2
+
+        def _interne(self):
+            return None
+
+    calls = registry.histogram('appels_seconds', "Appels", ('method',))
+    instrument_methods(Service, calls)
+    assert Service().travail(21) == 42
+    assert calls.labels('travail').counts and sum(calls.labels('travail').counts) == 1
+    assert ('_interne',) not in calls._children
+
+    text = registry.render()
+    assert 'requetes_total{type="ping"} 1.0' in text
+    assert 'requetes_total{type="say \\"hi\\""} 2.0' in text
+    assert 'file_attente{game="tictactoe",ranked="true"} 3.0' in text
+
+
+def test_metriques_du_serveur(tmp_path):
+    server = MatchmakingServer(db_path=str(tmp_path / "metrics.db"))
+    server.started_at = 0.0  # Démarré il y a longtemps
+    assert server._handle_request(encode_message({'type': 'get_games'})[4:], None, ('127.0.0.1', 1))
+    assert server.get_server_stats()['server_uptime'] > 0
+
+    endpoint = MetricsServer(metrics, port=0)
+    endpoint.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{endpoint.port}/metrics", timeout=5) as response:
+            text = response.read().decode('utf-8')
+    finally:
+        endpoint.stop()
+    assert 'matchmaking_request_seconds_count{type="get_games"}' in text
+    assert 'matchmaking_db_call_seconds_count{method="get_all_games"}' in text
+    assert 'matchmaking_active_connections 0.0' in text
@@ -0,0 +1,96 @@
+import sys
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.protocol import FrameDecoder, decode_message, encode_message
+from src.config.settings import ServerConfig
+from src.server.prefork import PreforkMatchmakingServer, _worker_config, prefork_supported
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition non atteinte")
+        time.sleep(0.05)
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def _connect(port: int, timeout: float = 20.0) -> socket.socket:
+    """Connexion au serveur dès qu'un worker écoute"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return socket.create_connection(('127.0.0.1', port), timeout=5)
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _read_message(sock: socket.socket):
+    decoder = FrameDecoder()
+    while True:
+        data = sock.recv(65536)
+        assert data, "Connexion fermée sans message"
+        for payload in decoder.feed(data):
+            return decode_message(payload)
+
+
+def test_configuration_propre_a_chaque_worker():
+    server_config = ServerConfig(host='127.0.0.1', port=5555, max_connections=0, timeout=0, debug=False,
+                                 metrics_port=9100, trace_file='logs/traces.jsonl',
+                                 admin_socket='/run/matchmaking/admin.sock')
+    worker = _worker_config(server_config, 'hote-1', 1)
+    assert worker.metrics_port == 9101
+    assert worker.trace_file == 'logs/traces-hote-1.jsonl'
+    assert worker.admin_socket == '/run/matchmaking/admin-hote-1.sock'
+    assert worker.port == 5555 and server_config.metrics_port == 9100  # Copie, l'original est intact
+
+    # Métriques et canal d'administration désactivés le restent
+    disabled = _worker_config(ServerConfig(host='127.0.0.1', port=5555, max_connections=0, timeout=0,
+                                           debug=False), 'hote-0', 0)
+    assert disabled.metrics_port == 0 and disabled.admin_socket is None
+
+
+@pytest.mark.skipif(not prefork_supported(), reason="SO_REUSEPORT ou sockets Unix indisponibles")
+def test_deux_workers_servent_puis_s_arretent(tmp_path):
+    port = _free_port()
+    server_config = ServerConfig(host='127.0.0.1', port=port, max_connections=0, timeout=0, debug=False,
+                                 trace_file=str(tmp_path / "traces.jsonl"),
+                                 flight_recorder_dir=str(tmp_path / "flight"),
+                                 profile_dir=str(tmp_path / "profiles"))
+    server = PreforkMatchmakingServer('127.0.0.1', port, str(tmp_path / "prefork.db"), workers=2,
+                                      mode='threaded', node_name='test', server_config=server_config)
+    coordinator_socket = server.coordinator_address[len('unix:'):]
+    thread = threading.Thread(target=server.start, daemon=True)
+    thread.start()
+
+    try:
+        _wait_for(lambda: len(server.coordinator.nodes) == 2, timeout=30)
+        client = _connect(port)
+        try:
+            client.sendall(encode_message({'type': 'get_games'}))
+            assert _read_message(client)['type'] == 'games_list'
+        finally:
+            client.close()
+    finally:
+        server.stop()
+        thread.join(timeout=10)
+
+    assert len(server.processes) == 2
+    assert not any(process.is_alive() for process in server.processes)
+    assert [process.exitcode for process in server.processes] == [0, 0]  # Arrêt propre sur SIGTERM
+    assert not os.path.exists(coordinator_socket)
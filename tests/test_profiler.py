@@ -0,0 +1,64 @@
+import sys
+import os
+import threading
+import time
+from dataclasses import replace
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.protocol import encode_message
+from src.config.settings import config
+from src.server.matchmaking_server import MatchmakingServer
+from src.server.profiler import SamplingProfiler, _thread_role
+
+
+def _busy_handler(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profil_par_echantillonnage(tmp_path):
+    assert _thread_role("writer-('127.0.0.1', 5000)") == 'writer'
+    assert _thread_role("ThreadPoolExecutor-0_3") == 'ThreadPoolExecutor'
+    assert _thread_role("asyncio-loop-2") == 'asyncio-loop'
+
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_handler, args=(stop,), name="client", daemon=True)
+    worker.start()
+    profiler = SamplingProfiler(str(tmp_path))
+    try:
+        path = profiler.start(duration=5, interval=0.002)
+        time.sleep(0.2)
+        assert profiler.stop() == path
+    finally:
+        stop.set()
+
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert profiler.status()['samples'] > 0 and not profiler.status()['running']
+    client_stacks = [line for line in lines if line.startswith('client;')]
+    assert client_stacks and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any('_busy_handler (test_profiler.py:' in line for line in client_stacks)
+
+
+def test_profilage_des_requetes_par_commande_admin(tmp_path):
+    server_config = replace(config.server, admin_token='secret', profile_dir=str(tmp_path / "profiles"))
+    server = MatchmakingServer(db_path=str(tmp_path / "profiler.db"), server_config=server_config)
+
+    def request(message):
+        return server._handle_request(encode_message(message)[4:], None, ('127.0.0.1', 1))
+
+    refused = request({'type': 'admin', 'token': 'devine', 'command': 'profile_status'})
+    assert refused['type'] == 'error'
+
+    started = request({'type': 'admin', 'token': 'secret', 'command': 'profile_requests', 'every': 1})
+    assert started['type'] == 'admin_result' and started['every'] == 1
+    for _ in range(3):
+        assert request({'type': 'get_games'})['type'] == 'games_list'
+
+    stopped = request({'type': 'admin', 'token': 'secret', 'command': 'profile_requests_stop'})
+    get_games_path, = [path for path in stopped['paths'] if path.endswith('-get_games.pstats')]
+    with open(get_games_path.replace('.pstats', '.txt'), encoding='utf-8') as f:
+        assert f.readline().startswith('3 requête(s) get_games')
+    assert not server.request_profiler.active
@@ -0,0 +1,56 @@
+import sys
+import os
+
+import pytest
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.protocol import (
+    BINARY_CODEC, JSON_CODEC, FrameDecoder, ProtocolError, decode_message, encode_message, negotiate_codec
+)
+
+
+def test_messages_colles_dans_une_lecture():
+    data = encode_message({'type': 'game_update', 'match_id': 1}) + encode_message({'type': 'match_found'})
+    frames = FrameDecoder().feed(data)
+    assert [decode_message(f)['type'] for f in frames] == ['game_update', 'match_found']
+
+
+def test_message_decoupe_en_plusieurs_lectures():
+    data = encode_message({'type': 'pong', 'timestamp': 'x' * 100})
+    decoder = FrameDecoder()
+    frames = []
+    for i in range(0, len(data), 7):
+        frames.extend(decoder.feed(data[i:i + 7]))
+    assert len(frames) == 1
+    assert decode_message(frames[0])['type'] == 'pong'
+    assert not decoder.buffer
+
+
+def test_trame_trop_grande_rejetee():
+    decoder = FrameDecoder(max_frame_size=16)
+    with pytest.raises(ProtocolError):
+        decoder.feed(encode_message({'type': 'x' * 32}))
+
+
+def test_codec_binaire_aller_retour_et_repli_json():
+    board = [[0] * 7 for _ in range(5)] + [[1, 2, 0, 0, 0, 0, 1]]
+    update = {'type': 'game_update', 'match_id': 7, 'seq': 3, 'board': board, 'current_turn_player_id': None}
+    payload = BINARY_CODEC.encode(update)
+    assert len(payload) < len(JSON_CODEC.encode(update)) // 5
+    assert decode_message(payload) == update
+
+    # Champ en plus, type inconnu ou valeur hors format : le message reste en JSON
+    for message in ({**update, 'extra': 1}, {'type': 'match_found', 'match_id': 7},
+                    {'type': 'make_move', 'player_id': 1, 'game_name': 'tictactoe', 'move': [1, 2]}):
+        assert BINARY_CODEC.encode(message) == JSON_CODEC.encode(message)
+        assert decode_message(BINARY_CODEC.encode(message)) == message
+
+
+def test_negociation_et_message_binaire_invalide():
+    assert negotiate_codec(['msgpack', 'binary', 'json']) is BINARY_CODEC
+    assert negotiate_codec(['msgpack']) is JSON_CODEC
+    assert negotiate_codec(None) is JSON_CODEC
+    with pytest.raises(ProtocolError):
+        decode_message(b'\x00\x05\x00')  # game_update tronqué
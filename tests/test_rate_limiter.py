@@ -0,0 +1,86 @@
+import sys
+import os
+
+import pytest
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.protocol import encode_message
+from src.config.settings import Config, RateLimitConfig, ServerConfig
+from src.server.matchmaking_server import MatchmakingServer
+from src.server.rate_limiter import RateLimiter, TokenBucket
+
+
+def test_seau_a_jetons():
+    bucket = TokenBucket(rate=2, burst=3, now=0.0)
+    assert [bucket.take(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(0.0) == 0.5  # Un jeton toutes les 0,5 s
+    assert bucket.take(0.25) == 0.25
+    assert bucket.take(0.5) == 0.0
+    # La réserve ne dépasse jamais la rafale
+    assert [bucket.take(100.0) for _ in range(4)][-1] > 0
+
+
+def test_limites_par_type_et_par_adresse():
+    limiter = RateLimiter(RateLimitConfig(per_message_type={'get_stats': [0.001, 2]}, per_ip_rate=0.001, per_ip_burst=5))
+    first = limiter.open('10.0.0.1')
+    second = limiter.open('10.0.0.1')
+
+    # Par connexion et par type : la deuxième connexion a son propre seau
+    assert limiter.check(first, 'get_stats') == 0 and limiter.check(first, 'get_stats') == 0
+    assert limiter.check(first, 'get_stats') > 0
+    assert limiter.check(second, 'get_stats') == 0
+    # Par adresse, tous types confondus : 5 requêtes accordées au total
+    assert limiter.check(second, 'ping') == 0 and limiter.check(first, 'ping') == 0
+    assert limiter.check(second, 'ping') > 0
+    assert limiter.stats()['limited_requests'] == {'get_stats': 1, 'other': 1}
+
+    limiter.close(first)
+    assert limiter.stats()['tracked_addresses'] == 1
+    limiter.close(second)
+    assert limiter.stats()['tracked_addresses'] == 0
+
+
+def test_requete_refusee_ne_debite_aucun_seau():
+    limiter = RateLimiter(RateLimitConfig(per_message_type={'get_stats': [0.001, 2]}, per_ip_rate=0.001, per_ip_burst=1))
+    first = limiter.open('10.0.0.1')
+    second = limiter.open('10.0.0.1')
+    assert limiter.check(second, 'ping') == 0
+    # Adresse épuisée : le seau par type de la connexion garde ses jetons
+    assert limiter.check(first, 'get_stats') > 0
+    assert first.buckets['get_stats'].tokens == 2
+    assert RateLimiter(RateLimitConfig(enabled=False)).open('10.0.0.1') is None
+
+
+def test_reponse_rate_limited(tmp_path):
+    # Limites prises dans la configuration injectée, pas dans la configuration globale
+    server_config = ServerConfig(host='127.0.0.1', port=0, max_connections=0, timeout=0, debug=False,
+                                 rate_limits=RateLimitConfig(per_message_type={'get_games': [0.5, 1]}))
+    server = MatchmakingServer(db_path=str(tmp_path / "rate.db"), server_config=server_config)
+    limits = server.rate_limiter.open('127.0.0.1')
+    payload = encode_message({'type': 'get_games'})[4:]
+
+    assert server._handle_request(payload, None, ('127.0.0.1', 1), limits)['type'] == 'games_list'
+    response = server._handle_request(payload, None, ('127.0.0.1', 1), limits)
+    assert response['type'] == 'rate_limited' and response['request_type'] == 'get_games'
+    assert 1900 <= response['retry_after_ms'] <= 2000
+    # Sans seaux (appel interne), pas de limitation
+    assert server._handle_request(payload, None, ('127.0.0.1', 1))['type'] == 'games_list'
+
+
+def test_configuration_des_limites(tmp_path):
+    # Débits nuls ou négatifs refusés : un seau à jetons divise par son débit
+    with pytest.raises(ValueError):
+        RateLimitConfig(per_ip_rate=0)
+    with pytest.raises(ValueError):
+        RateLimitConfig(per_message_type={'ping': [-1, 5]})
+
+    # Section `rate_limits` du fichier, rattachée à la configuration du serveur
+    config = Config()
+    config.server.rate_limits = RateLimitConfig(per_message_type={'ping': [2, 4]}, per_ip_rate=10)
+    path = str(tmp_path / "config.json")
+    config.save(path)
+    loaded = Config.load(path)
+    assert loaded.server.rate_limits == config.server.rate_limits
+    assert loaded.server.port == config.server.port
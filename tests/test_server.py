@@ -16,4 +16,17 @@ try:
     import socket, threading, json
     print("Imports standard OK!")
 except Exception as e:
-    print(f"Erreur imports standard: {e}")
\ No newline at end of file
+    print(f"Erreur imports standard: {e}")
+
+
+def test_trame_qui_n_est_pas_un_objet(tmp_path):
+    from src.common.protocol import encode_message
+    from src.server.matchmaking_server import MatchmakingServer
+
+    server = MatchmakingServer(db_path=str(tmp_path / "server.db"))
+    for message in ([1], "x", 3, None):
+        response = server._handle_request(encode_message(message)[4:], None, ('127.0.0.1', 1))
+        assert response == {'type': 'error', 'message': 'Format de message invalide'}
+    # La connexion reste utilisable : la requête suivante est traitée normalement
+    assert server._handle_request(encode_message({'type': 'get_games'})[4:], None, ('127.0.0.1', 1))['type'] == 'games_list'
+    server.db.close()
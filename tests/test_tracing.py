@@ -0,0 +1,59 @@
+import sys
+import os
+import json
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.protocol import encode_message
+from src.common.tracing import NOOP_SPAN, Tracer, tracer
+from src.server.matchmaking_server import MatchmakingServer
+from tests.test_matchmaking import _CapturingConnection
+
+
+def _read_spans(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_spans_zipkin_et_echantillonnage(tmp_path):
+    local = Tracer('test')
+    assert local.trace('ping') is NOOP_SPAN  # Traçage inactif
+    assert local.span('enfant') is NOOP_SPAN  # Hors trace
+
+    path = str(tmp_path / "traces" / "spans.jsonl")
+    local.start(path, sample_rate=1.0)
+    with local.trace('make_move') as root:
+        root.tag('player_id', 7)
+        with local.span('db.update_match_state', 'CLIENT'):
+            pass
+    local.stop()
+
+    child, parent = _read_spans(path)
+    assert parent['name'] == 'make_move' and parent['kind'] == 'SERVER' and 'parentId' not in parent
+    assert parent['tags'] == {'player_id': '7'}
+    assert child['traceId'] == parent['traceId'] and child['parentId'] == parent['id']
+    assert len(parent['traceId']) == 32 and len(parent['id']) == 16
+    assert parent['duration'] >= child['duration'] >= 1
+    assert parent['localEndpoint'] == {'serviceName': 'test'}
+
+
+def test_trace_d_une_requete(tmp_path):
+    server = MatchmakingServer(db_path=str(tmp_path / "tracing.db"))
+    player_id = server.db.create_player_session("127.0.0.1", 5000, session_pseudo='A')
+    server._register_client(player_id, _CapturingConnection(('127.0.0.1', 5000), []))
+
+    path = str(tmp_path / "spans.jsonl")
+    tracer.start(path, sample_rate=1.0)
+    try:
+        payload = encode_message({'type': 'join_queue', 'player_id': player_id, 'game_name': 'tictactoe'})[4:]
+        assert server._handle_request(payload, None, ('127.0.0.1', 5000))['type'] == 'queue_joined'
+    finally:
+        tracer.stop()
+
+    spans = _read_spans(path)
+    root = next(span for span in spans if span['name'] == 'join_queue')
+    assert root['tags']['response'] == 'queue_joined'
+    children = [span for span in spans if span.get('parentId') == root['id']]
+    assert {span['traceId'] for span in spans} == {root['traceId']}
+    assert any(span['name'] == 'db.get_player_info' for span in children)